@@ -1,4 +1,7 @@
-from .transit_data_object import TransitData, UnknownFile
+from .load_filter import LoadFilter
+from .load_stats import LoadStats
+from .transit_data_object import ReadOnlyError, TransitData, UnknownFile
 from .transit_data_utils import *
+from .validation import ValidationError, ValidationReport, Violation
 
 from . import utils
\ No newline at end of file
@@ -10,4 +10,6 @@ from .stop import *
 from .stop_time import *
 from .translator import *
 from .trip import *
+from .trip_pattern import *
 from .unknown_file import *
+from .stop_time_table import *
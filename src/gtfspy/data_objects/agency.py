@@ -149,7 +149,7 @@ class AgencyCollection(BaseGtfsObjectCollection):
             if condition is not None and not condition(agency):
                 return None
 
-            self._transit_data._changed()
+            self._transit_data._changed("agencies", agency)
 
             assert agency.id not in self._objects
             self._objects[agency.id] = agency
@@ -174,6 +174,8 @@ class AgencyCollection(BaseGtfsObjectCollection):
         else:
             assert self[agency.id] is agency
 
+        self._transit_data._changed("agencies", agency)
+
         if recursive:
             for line in list(agency.lines):
                 agency.lines.remove(line, recursive=True, clean_after=False)
@@ -2,9 +2,25 @@ import csv
 import io
 import sys
 from abc import abstractmethod
-from zipfile import ZipExtFile
 
-from ..utils.parsing import decode_file
+from ..utils.parsing import decode_stream
+
+
+def collect_csv_fields(objects, fields=()):
+    """
+    The union of the csv fields of the objects, in the order they first appear, collected in a single pass.
+
+    :type objects: collections.Iterable
+    :param fields: fields which come first
+    :type fields: collections.Iterable[str]
+    :rtype: list[str]
+    """
+
+    result = dict.fromkeys(fields)
+    for obj in objects:
+        for field in obj.get_csv_fields():
+            result[field] = None
+    return list(result)
 
 
 class BaseGtfsObjectCollection(object):
@@ -26,25 +42,34 @@ class BaseGtfsObjectCollection(object):
             with open(csv_file, "w", encoding='utf-8') as f:
                 self.save(f)
         else:
-            fields = []
-            for obj in self:
-                fields += (field for field in obj.get_csv_fields() if field not in fields)
+            fields = collect_csv_fields(self)
 
             writer = csv.DictWriter(csv_file, fieldnames=fields, restval=None)
             writer.writeheader()
             writer.writerows(obj.to_csv_line() for obj in self)
 
-    def _load_file(self, csv_file, ignore_errors=False, filter=None):
+    def _load_file(self, csv_file, ignore_errors=False, filter=None, encoding=None):
+        """
+        :type csv_file: str | io.BufferedIOBase | io.TextIOBase
+        :type encoding: str | gtfspy.utils.parsing.EncodingDetector | None
+        """
+
         if isinstance(csv_file, str):
-            with open(csv_file, "r") as f:
-                self._load_file(f, ignore_errors=ignore_errors, filter=filter)
-        elif isinstance(csv_file, ZipExtFile):
-            csv_file = decode_file(csv_file)
+            with open(csv_file, "rb") as f:
+                self._load_file(f, ignore_errors=ignore_errors, filter=filter, encoding=encoding)
+        elif isinstance(csv_file, io.BufferedIOBase):
+            csv_file = decode_stream(csv_file, encoding=encoding)
             self._load_file(csv_file, ignore_errors=ignore_errors, filter=filter)
         else:
-            reader = csv.DictReader(csv_file)
-            for row in reader:
-                self.add(ignore_errors=ignore_errors, condition=filter, **row)
+            self._load_rows(csv.DictReader(csv_file), ignore_errors=ignore_errors, filter=filter)
+
+    def _load_rows(self, rows, ignore_errors=False, filter=None):
+        """
+        :type rows: collections.Iterable[dict]
+        """
+
+        for row in rows:
+            self.add(ignore_errors=ignore_errors, condition=filter, **row)
 
     def validate(self):
         for i, obj in self._objects.items():
@@ -20,6 +20,9 @@ class FareAttribute(object):
         if not_none_or_empty(transfer_duration):
             self.attributes["transfer_duration"] = int(transfer_duration)
 
+        # the fare rules of this fare, maintained by FareRuleCollection
+        self.fare_rules = []
+
     @property
     def id(self):
         return self._id
@@ -125,7 +128,7 @@ class FareAttributeCollection(BaseGtfsObjectCollection):
             if condition is not None and not condition(fare_attribute):
                 return None
 
-            self._transit_data._changed()
+            self._transit_data._changed("fare_attributes", fare_attribute)
 
             assert fare_attribute.id not in self._objects
             self._objects[fare_attribute.id] = fare_attribute
@@ -150,14 +153,13 @@ class FareAttributeCollection(BaseGtfsObjectCollection):
         else:
             assert self[fare_attribute.id] is fare_attribute
 
+        self._transit_data._changed("fare_attributes", fare_attribute)
+
         if recursive:
-            fare_rules_to_clean = [fare_rule for fare_rule in self._transit_data.fare_rules
-                                   if fare_rule.fare is fare_attribute]
-            for fare_rule in fare_rules_to_clean:
+            for fare_rule in list(fare_attribute.fare_rules):
                 self._transit_data.fare_rules.remove(fare_rule, recursive=True, clean_after=False)
         else:
-            assert next((fare_rule for fare_rule in self._transit_data.fare_rules if fare_rule.fare is fare_attribute),
-                        None) is None
+            assert len(fare_attribute.fare_rules) == 0
 
         del self._objects[fare_attribute.id]
 
@@ -165,8 +167,7 @@ class FareAttributeCollection(BaseGtfsObjectCollection):
             self._transit_data.clean()
 
     def clean(self):
-        fares_with_rules = {fare_rule.fare.id for fare_rule in self._transit_data.fare_rules}
-        to_clean = [fare_attribute for fare_attribute in self if fare_attribute.id not in fares_with_rules]
+        to_clean = [fare_attribute for fare_attribute in self if len(fare_attribute.fare_rules) == 0]
 
         for fare_attribute in to_clean:
             del self._objects[fare_attribute.id]
@@ -1,10 +1,10 @@
 import csv
 import io
 import sys
-from zipfile import ZipExtFile
 
+from .base_object import collect_csv_fields
 from ..utils.validating import not_none_or_empty
-from ..utils.parsing import decode_file
+from ..utils.parsing import decode_stream
 
 
 class FareRule(object):
@@ -19,7 +19,7 @@ class FareRule(object):
         :type contains_id: str | int | None
         """
 
-        self.fare = transit_data.fare_attributes[fare_id]
+        self._fare = transit_data.fare_attributes[fare_id]
 
         self.attributes = {k: v for k, v in kwargs.items() if not_none_or_empty(v)}
         if not_none_or_empty(route_id):
@@ -31,6 +31,24 @@ class FareRule(object):
         if not_none_or_empty(contains_id):
             self.attributes["contains_id"] = str(contains_id)
 
+    @property
+    def fare(self):
+        """
+        :rtype: gtfspy.data_objects.FareAttribute
+        """
+
+        return self._fare
+
+    @fare.setter
+    def fare(self, value):
+        """
+        :type value: gtfspy.data_objects.FareAttribute
+        """
+
+        if _remove_identical(self._fare.fare_rules, self):
+            value.fare_rules.append(self)
+        self._fare = value
+
     @property
     def route(self):
         """
@@ -125,6 +143,22 @@ class FareRule(object):
         return not (self == other)
 
 
+def _remove_identical(fare_rules, fare_rule):
+    """
+    Removes fare_rule itself (and not an equal fare rule) from a list of fare rules.
+
+    :type fare_rules: list[FareRule]
+    :type fare_rule: FareRule
+    :rtype: bool
+    """
+
+    for i, other in enumerate(fare_rules):
+        if other is fare_rule:
+            del fare_rules[i]
+            return True
+    return False
+
+
 class FareRuleCollection:
     def __init__(self, transit_data, csv_file=None):
         """
@@ -144,9 +178,10 @@ class FareRuleCollection:
             if condition is not None and not condition(fare_rule):
                 return None
 
-            self._transit_data._changed()
+            self._transit_data._changed("fare_rules", fare_rule)
 
             self._objects.append(fare_rule)
+            fare_rule.fare.fare_rules.append(fare_rule)
             return fare_rule
         except:
             if not ignore_errors:
@@ -162,33 +197,50 @@ class FareRuleCollection:
         return self.add(**fare_rule.to_csv_line())
 
     def remove(self, fare_rule, recursive=False, clean_after=True):
-        self._objects.remove(fare_rule)
+        self._transit_data._changed("fare_rules", fare_rule)
+
+        fare_rule = self._objects.pop(self._objects.index(fare_rule))
+        _remove_identical(fare_rule.fare.fare_rules, fare_rule)
 
         if clean_after:
             self._transit_data.clean()
 
     def clean(self):
-        zone_ids = {stop.zone_id for stop in self._transit_data.stops}
+        zone_ids = self._transit_data.stops.zone_ids
         fare_rules_to_clean = [fare_rule for fare_rule in self
                                if (fare_rule.route is not None
                                    and fare_rule.route.id not in self._transit_data.routes)
                                or (fare_rule.origin_id is not None and fare_rule.origin_id not in zone_ids)
                                or (fare_rule.destination_id is not None and fare_rule.destination_id not in zone_ids)
                                or (fare_rule.contains_id is not None and fare_rule.contains_id not in zone_ids)]
-        for fare_rule in fare_rules_to_clean:
-            self._objects.remove(fare_rule)
+        if fare_rules_to_clean:
+            for fare_rule in fare_rules_to_clean:
+                _remove_identical(fare_rule.fare.fare_rules, fare_rule)
+            cleaned_ids = {id(fare_rule) for fare_rule in fare_rules_to_clean}
+            self._objects = [fare_rule for fare_rule in self._objects if id(fare_rule) not in cleaned_ids]
+
+    def _load_file(self, csv_file, ignore_errors=False, filter=None, encoding=None):
+        """
+        :type csv_file: str | io.BufferedIOBase | io.TextIOBase
+        :type encoding: str | gtfspy.utils.parsing.EncodingDetector | None
+        """
 
-    def _load_file(self, csv_file, ignore_errors=False, filter=None):
         if isinstance(csv_file, str):
-            with open(csv_file, "r", encoding='utf-8-sig') as f:
-                self._load_file(f, ignore_errors=ignore_errors, filter=filter)
-        elif isinstance(csv_file, ZipExtFile):
-            csv_file = decode_file(csv_file)
+            with open(csv_file, "rb") as f:
+                self._load_file(f, ignore_errors=ignore_errors, filter=filter, encoding=encoding)
+        elif isinstance(csv_file, io.BufferedIOBase):
+            csv_file = decode_stream(csv_file, encoding=encoding)
             self._load_file(csv_file, ignore_errors=ignore_errors, filter=filter)
         else:
-            reader = csv.DictReader(csv_file)
-            for row in reader:
-                self.add(ignore_errors=ignore_errors, condition=filter, **row)
+            self._load_rows(csv.DictReader(csv_file), ignore_errors=ignore_errors, filter=filter)
+
+    def _load_rows(self, rows, ignore_errors=False, filter=None):
+        """
+        :type rows: collections.Iterable[dict]
+        """
+
+        for row in rows:
+            self.add(ignore_errors=ignore_errors, condition=filter, **row)
 
     def has_data(self):
         return len(self._objects) > 0
@@ -198,9 +250,7 @@ class FareRuleCollection:
             with open(csv_file, "w") as f:
                 self.save(f)
         else:
-            fields = []
-            for obj in self:
-                fields += (field for field in obj.get_csv_fields() if field not in fields)
+            fields = collect_csv_fields(self)
 
             writer = csv.DictWriter(csv_file, fieldnames=fields, restval=None)
             writer.writeheader()
@@ -49,7 +49,7 @@ class LineCollection(BaseGtfsObjectCollection):
     def get_line(self, route):
         line_number = route.route_short_name
 
-        self._transit_data._changed()
+        self._transit_data._changed("agencies", self._agency)
 
         if line_number not in self:
             line = Line(self._agency, line_number)
@@ -79,6 +79,8 @@ class LineCollection(BaseGtfsObjectCollection):
         else:
             assert self[line.line_number] is line
 
+        self._transit_data._changed("agencies", self._agency)
+
         if recursive:
             for route in line.routes.values():
                 self._transit_data.routes.remove(route, recursive=True, clean_after=False)
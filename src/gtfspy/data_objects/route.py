@@ -1,4 +1,5 @@
 from .base_object import BaseGtfsObjectCollection
+from .trip_pattern import build_trip_patterns
 from ..utils.validating import not_none_or_empty
 
 
@@ -43,6 +44,10 @@ class Route(object):
         self.line = self.agency.get_line(self)
         self.trips = []
 
+        self._transit_data = transit_data
+        # the patterns of the trips, dropped by TransitData._changed when a trip of the route or its stop times change
+        self._patterns = None
+
     @property
     def id(self):
         return self._id
@@ -127,29 +132,60 @@ class Route(object):
 
         self.attributes["route_sort_order"] = int(value)
 
+    @property
+    def patterns(self):
+        """
+        The distinct stop sequences of the trips of the route (by direction), the patterns with more trips first.
+
+        The patterns are an index which is derived from the stop times of the trips, the memory of the stop times is
+        reduced by keeping them by pattern in a StopTimeTable (see StopTimeTable.compact). They are built on their
+        first use, and built again after a trip of the route is added or removed or its stop times are added, removed
+        or edited.
+
+        :rtype: list[gtfspy.data_objects.TripPattern]
+        """
+
+        if self._patterns is None:
+            self._patterns = build_trip_patterns(self)
+        return self._patterns
+
+    def invalidate_patterns(self):
+        """
+        Drops the cached patterns, must be called after changing the stop times of a trip of the route directly (not
+        through its collections, TransitData.add_stop_time or the setters of the stop times and the trips).
+        """
+
+        self._patterns = None
+
     @property
     def stops(self):
         """
+        :return: the stops of the main pattern of the route (the pattern with the most trips)
         :rtype: list[gtfspy.data_objects.Stop] | None
         """
 
-        return None if len(self.trips) == 0 else self.trips[0].stops
+        patterns = self.patterns
+        return None if len(patterns) == 0 else list(patterns[0].stops)
 
     @property
     def first_stop(self):
         """
+        :return: the first stop of the main pattern of the route
         :rtype: gtfspy.data_objects.Stop | None
         """
 
-        return None if len(self.trips) == 0 else self.trips[0].first_stop
+        patterns = self.patterns
+        return None if len(patterns) == 0 or len(patterns[0].stops) == 0 else patterns[0].first_stop
 
     @property
     def last_stop(self):
         """
+        :return: the last stop of the main pattern of the route
         :rtype: gtfspy.data_objects.Stop | None
         """
 
-        return None if len(self.trips) == 0 else self.trips[0].last_stop
+        patterns = self.patterns
+        return None if len(patterns) == 0 or len(patterns[0].stops) == 0 else patterns[0].last_stop
 
     def get_trips_calendar(self, from_date, to_date=None, stop_id=None, sort=True):
         res = ((t, trip)
@@ -209,7 +245,7 @@ class RouteCollection(BaseGtfsObjectCollection):
             if condition is not None and not condition(route):
                 return None
 
-            self._transit_data._changed()
+            self._transit_data._changed("routes", route)
 
             assert route.id not in self._objects
             self._objects[route.id] = route
@@ -239,6 +275,8 @@ class RouteCollection(BaseGtfsObjectCollection):
         else:
             assert self[route.id] is route
 
+        self._transit_data._changed("routes", route)
+
         if recursive:
             for trip in route.trips:
                 self._transit_data.trips.remove(trip, recursive=True, clean_after=False)
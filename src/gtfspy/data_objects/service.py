@@ -1,4 +1,4 @@
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 
 from .base_object import BaseGtfsObjectCollection
 from ..utils.parsing import parse_or_default, str_to_bool
@@ -21,8 +21,12 @@ class Service(object):
         :type saturday: str | bool | None
         """
         self._id = str(service_id)
-        self.start_date = start_date if isinstance(start_date, date) else datetime.strptime(start_date, "%Y%m%d").date()
-        self.end_date = end_date if isinstance(end_date, date) else datetime.strptime(end_date, "%Y%m%d").date()
+        # a bitset of the active days between start_date and end_date, built on first use
+        self._active_days = None
+        self._extra_active_dates = None
+        self._start_date = start_date if isinstance(start_date, date) else \
+            datetime.strptime(start_date, "%Y%m%d").date()
+        self._end_date = end_date if isinstance(end_date, date) else datetime.strptime(end_date, "%Y%m%d").date()
         sunday = parse_or_default(sunday, False, str_to_bool)
         monday = parse_or_default(monday, False, str_to_bool)
         tuesday = parse_or_default(tuesday, False, str_to_bool)
@@ -33,6 +37,8 @@ class Service(object):
         self.days_relevance = [sunday, monday, tuesday, wednesday, thursday, friday, saturday]
 
         self.special_dates = []
+        # the trips which use this service by their ids, maintained by TripCollection
+        self._trips = {}
         self.attributes = {k: v for k, v in kwargs.items() if not_none_or_empty(v)}
 
     @property
@@ -47,6 +53,48 @@ class Service(object):
     def id(self):
         return self._id
 
+    @property
+    def start_date(self):
+        """
+        :rtype: date
+        """
+
+        return self._start_date
+
+    @start_date.setter
+    def start_date(self, value):
+        """
+        :type value: date
+        """
+
+        self._start_date = value
+        self.invalidate_active_dates()
+
+    @property
+    def end_date(self):
+        """
+        :rtype: date
+        """
+
+        return self._end_date
+
+    @end_date.setter
+    def end_date(self, value):
+        """
+        :type value: date
+        """
+
+        self._end_date = value
+        self.invalidate_active_dates()
+
+    @property
+    def trips(self):
+        """
+        :rtype: list[gtfspy.data_objects.Trip]
+        """
+
+        return list(self._trips.values())
+
     @property
     def sunday(self):
         """
@@ -62,6 +110,7 @@ class Service(object):
         """
 
         self.days_relevance[0] = bool(value)
+        self.invalidate_active_dates()
 
     @property
     def monday(self):
@@ -78,6 +127,7 @@ class Service(object):
         """
 
         self.days_relevance[1] = bool(value)
+        self.invalidate_active_dates()
 
     @property
     def tuesday(self):
@@ -94,6 +144,7 @@ class Service(object):
         """
 
         self.days_relevance[2] = bool(value)
+        self.invalidate_active_dates()
 
     @property
     def wednesday(self):
@@ -110,6 +161,7 @@ class Service(object):
         """
 
         self.days_relevance[3] = bool(value)
+        self.invalidate_active_dates()
 
     @property
     def thursday(self):
@@ -126,6 +178,7 @@ class Service(object):
         """
 
         self.days_relevance[4] = bool(value)
+        self.invalidate_active_dates()
 
     @property
     def friday(self):
@@ -142,6 +195,7 @@ class Service(object):
         """
 
         self.days_relevance[5] = bool(value)
+        self.invalidate_active_dates()
 
     @property
     def saturday(self):
@@ -158,14 +212,82 @@ class Service(object):
         """
 
         self.days_relevance[6] = bool(value)
+        self.invalidate_active_dates()
+
+    def invalidate_active_dates(self):
+        """
+        Drops the cached active days, must be called after changing days_relevance or special_dates directly.
+        """
+
+        self._active_days = None
+        self._extra_active_dates = None
+
+    def _build_active_days(self):
+        days_count = max((self._end_date - self._start_date).days + 1, 0)
+        active_days = bytearray((days_count + 7) // 8)
+        first_weekday = self._start_date.isoweekday() % 7
+        for day in range(days_count):
+            if self.days_relevance[(first_weekday + day) % 7]:
+                active_days[day >> 3] |= 1 << (day & 7)
+
+        # the calendar dates outside the range of the service are kept aside, only their inclusions matter
+        extra_active_dates = set()
+        first_ordinal = self._start_date.toordinal()
+        for exception_type in (2, 1):
+            for service_date in self.special_dates:
+                if service_date.exception_type != exception_type:
+                    continue
+                day = service_date.date.toordinal() - first_ordinal
+                if 0 <= day < days_count:
+                    if exception_type == 1:
+                        active_days[day >> 3] |= 1 << (day & 7)
+                    else:
+                        active_days[day >> 3] &= ~(1 << (day & 7))
+                elif exception_type == 1:
+                    extra_active_dates.add(service_date.date)
+
+        self._active_days = active_days
+        self._extra_active_dates = extra_active_dates
 
     def is_active_on(self, date):
         """
         :rtype: bool
         """
 
-        return self.days_relevance[date.isoweekday() % 7] and date not in self.dates_exclusions \
-            or date in self.dates_inclusions
+        if self._active_days is None:
+            self._build_active_days()
+
+        first_ordinal = self._start_date.toordinal()
+        day = date.toordinal() - first_ordinal
+        if 0 <= day <= self._end_date.toordinal() - first_ordinal:
+            return bool(self._active_days[day >> 3] & (1 << (day & 7)))
+        return date in self._extra_active_dates
+
+    def active_dates(self, from_date, to_date):
+        """
+        :type from_date: date
+        :type to_date: date
+        :return: the dates between from_date and to_date (inclusive) on which the service is active
+        :rtype: list[date]
+        """
+
+        if self._active_days is None:
+            self._build_active_days()
+
+        active_days = self._active_days
+        first_ordinal = self._start_date.toordinal()
+        from_ordinal = from_date.toordinal()
+        to_ordinal = to_date.toordinal()
+        result = []
+        for day in range(max(from_ordinal, first_ordinal) - first_ordinal,
+                         min(to_ordinal, self._end_date.toordinal()) - first_ordinal + 1):
+            if active_days[day >> 3] & (1 << (day & 7)):
+                result.append(self._start_date + timedelta(days=day))
+
+        if self._extra_active_dates:
+            result += (d for d in self._extra_active_dates if from_ordinal <= d.toordinal() <= to_ordinal)
+            result.sort()
+        return result
 
     def get_csv_fields(self):
         return ["service_id", "start_date", "end_date", "sunday", "monday", "tuesday", "wednesday", "thursday",
@@ -217,7 +339,7 @@ class ServiceCollection(BaseGtfsObjectCollection):
             if condition is not None and not condition(service):
                 return None
 
-            self._transit_data._changed()
+            self._transit_data._changed("calendar", service)
 
             assert service.id not in self._objects
             self._objects[service.id] = service
@@ -242,12 +364,13 @@ class ServiceCollection(BaseGtfsObjectCollection):
         else:
             assert self[service.id] is service
 
+        self._transit_data._changed("calendar", service)
+
         if recursive:
-            for trip in self._transit_data.trips:
-                if trip.service is service:
-                    self._transit_data.trips.remove(trip, recursive=True, clean_after=False)
+            for trip in service.trips:
+                self._transit_data.trips.remove(trip, recursive=True, clean_after=False)
         else:
-            assert next((trip for trip in self._transit_data.trips if trip.service is service), None) is None
+            assert len(service._trips) == 0
 
         del self._objects[service.id]
 
@@ -257,7 +380,7 @@ class ServiceCollection(BaseGtfsObjectCollection):
     def clean(self):
         to_clean = []
         for service in self:
-            if next((trip for trip in self._transit_data.trips if trip.service is service), None) is None:
+            if len(service._trips) == 0:
                 to_clean.append(service)
 
         for service in to_clean:
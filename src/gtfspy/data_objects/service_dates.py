@@ -5,6 +5,8 @@ from ..utils.validating import not_none_or_empty
 
 
 class ServiceDate(object):
+    __slots__ = ("service_id", "service", "date", "exception_type", "_attributes")
+
     def __init__(self, transit_data, service_id, date, exception_type, **kwargs):
         """
         :type service_id: str | int
@@ -19,16 +21,28 @@ class ServiceDate(object):
             self.exception_type = 1 if exception_type else 2
         else:
             self.exception_type = int(exception_type)
-        self.attributes = {k: v for k, v in kwargs.items() if not_none_or_empty(v)}
+
+        attributes = {k: v for k, v in kwargs.items() if not_none_or_empty(v)}
+        self._attributes = attributes if attributes else None
+
+    @property
+    def attributes(self):
+        """
+        :rtype: dict
+        """
+
+        if self._attributes is None:
+            self._attributes = {}
+        return self._attributes
 
     def get_csv_fields(self):
-        return ["service_id", "date", "exception_type"] + list(self.attributes.keys())
+        return ["service_id", "date", "exception_type"] + list(self._attributes.keys() if self._attributes else [])
 
     def to_csv_line(self):
         return dict(service_id=self.service_id,
                     date=self.date.strftime("%Y%m%d"),
                     exception_type=self.exception_type,
-                    **self.attributes)
+                    **(self._attributes or {}))
 
     def validate(self, transit_data):
         """
@@ -41,7 +55,8 @@ class ServiceDate(object):
             return False
 
         return self.service == other.service and self.date == other.date and \
-            self.exception_type == other.exception_type and self.attributes == other.attributes
+            self.exception_type == other.exception_type and \
+            (self._attributes or {}) == (other._attributes or {})
 
     def __ne__(self, other):
         return not (self == other)
@@ -61,9 +76,10 @@ class ServiceDateCollection(BaseGtfsObjectCollection):
             if condition is not None and not condition(service_date):
                 return None
 
-            self._transit_data._changed()
+            self._transit_data._changed("calendar", service_date.service)
 
             service_date.service.special_dates.append(service_date)
+            service_date.service.invalidate_active_dates()
 
             key = (service_date.service_id, service_date.date)
             assert key not in self._objects
@@ -3,11 +3,13 @@ from operator import attrgetter
 
 from sortedcontainers import SortedList
 
-from .base_object import BaseGtfsObjectCollection
+from .base_object import BaseGtfsObjectCollection, collect_csv_fields
 from ..utils.validating import not_none_or_empty
 
 
 class ShapePoint(object):
+    __slots__ = ("latitude", "longitude", "sequence", "_shape_dist_traveled", "_attributes")
+
     def __init__(self, shape_pt_lat, shape_pt_lon, shape_pt_sequence, shape_dist_traveled=None, **kwargs):
         """
         :type shape_pt_lat: str | float
@@ -20,9 +22,23 @@ class ShapePoint(object):
         self.longitude = float(shape_pt_lon)
         self.sequence = int(shape_pt_sequence)
 
-        self.attributes = {k: v for k, v in kwargs.items() if not_none_or_empty(v)}
-        if not_none_or_empty(shape_dist_traveled):
-            self.attributes["shape_dist_traveled"] = float(shape_dist_traveled)
+        self._shape_dist_traveled = float(shape_dist_traveled) if not_none_or_empty(shape_dist_traveled) else None
+
+        # only unknown columns are kept in a dict, which is created on first use
+        attributes = {k: v for k, v in kwargs.items() if not_none_or_empty(v)}
+        self._attributes = attributes if attributes else None
+
+    @property
+    def attributes(self):
+        """
+        Extra columns of the shape point which are not part of the known GTFS fields.
+
+        :rtype: dict
+        """
+
+        if self._attributes is None:
+            self._attributes = {}
+        return self._attributes
 
     @property
     def shape_dist_traveled(self):
@@ -30,7 +46,7 @@ class ShapePoint(object):
         :rtype: float | None
         """
 
-        return self.attributes.get("shape_dist_traveled", None)
+        return self._shape_dist_traveled
 
     @shape_dist_traveled.setter
     def shape_dist_traveled(self, value):
@@ -38,7 +54,19 @@ class ShapePoint(object):
         :type value: float | None
         """
 
-        self.attributes["shape_dist_traveled"] = value
+        self._shape_dist_traveled = value
+
+    def _optional_attributes(self):
+        """
+        :rtype: dict
+        """
+
+        result = {}
+        if self._shape_dist_traveled is not None:
+            result["shape_dist_traveled"] = self._shape_dist_traveled
+        if self._attributes:
+            result.update(self._attributes)
+        return result
 
     def validate(self, transit_data):
         assert 90 >= self.latitude >= -90
@@ -52,7 +80,7 @@ class ShapePoint(object):
                self.sequence == other.sequence and \
                (self.shape_dist_traveled is None or other.shape_dist_traveled is None or
                 self.shape_dist_traveled == other.shape_dist_traveled) and \
-               self.attributes == other.attributes
+               (self._attributes or {}) == (other._attributes or {})
 
     def __ne__(self, other):
         return not (self == other)
@@ -66,14 +94,24 @@ class Shape(object):
         self._id = str(shape_id)
 
         self.shape_points = SortedList(key=attrgetter("sequence"))
+        # the trips which use this shape by their ids, maintained by TripCollection
+        self._trips = {}
 
     @property
     def id(self):
         return self._id
 
+    @property
+    def trips(self):
+        """
+        :rtype: list[gtfspy.data_objects.Trip]
+        """
+
+        return list(self._trips.values())
+
     def get_csv_fields(self):
         return ["shape_id", "shape_pt_lat", "shape_pt_lon", "shape_pt_sequence"] + \
-               list({key for shape_point in self.shape_points for key in shape_point.attributes.keys()})
+               list({key for shape_point in self.shape_points for key in shape_point._optional_attributes().keys()})
 
     def to_csv_line(self):
         for shape_point in self.shape_points:
@@ -81,7 +119,7 @@ class Shape(object):
                           shape_pt_lat=shape_point.latitude,
                           shape_pt_lon=shape_point.longitude,
                           shape_pt_sequence=shape_point.sequence,
-                          **shape_point.attributes)
+                          **shape_point._optional_attributes())
             yield result
 
     def validate(self, transit_data):
@@ -118,13 +156,12 @@ class ShapeCollection(BaseGtfsObjectCollection):
             if condition is not None and not condition(shape_point):
                 return None
 
-            self._transit_data._changed()
-
-            if shape_id not in self._objects:
+            shape = self._objects.get(shape_id)
+            if shape is None:
                 shape = Shape(shape_id)
-                self._objects[shape_id] = shape
-            else:
-                shape = self[shape_id]
+            self._transit_data._changed("shapes", shape)
+
+            self._objects[shape_id] = shape
             shape.shape_points.add(shape_point)
             return shape_point
         except:
@@ -149,12 +186,13 @@ class ShapeCollection(BaseGtfsObjectCollection):
         else:
             assert self[shape.id] is shape
 
+        self._transit_data._changed("shapes", shape)
+
         if recursive:
-            for trip in self._transit_data.trips:
-                if trip.shape is shape:
-                    self._transit_data.trips.remove(trip, recursive=True, clean_after=False)
+            for trip in shape.trips:
+                self._transit_data.trips.remove(trip, recursive=True, clean_after=False)
         else:
-            assert next((trip for trip in self._transit_data.trips if trip.shape is shape), None) is None
+            assert len(shape._trips) == 0
 
         del self._objects[shape.id]
 
@@ -164,7 +202,7 @@ class ShapeCollection(BaseGtfsObjectCollection):
     def clean(self):
         to_clean = []
         for shape in self:
-            if next((trip for trip in self._transit_data.trips if trip.shape is shape), None) is None:
+            if len(shape._trips) == 0:
                 to_clean.append(shape)
 
         for shape in to_clean:
@@ -175,9 +213,7 @@ class ShapeCollection(BaseGtfsObjectCollection):
             with open(csv_file, "w", encoding='utf-8') as f:
                 self.save(f)
         else:
-            fields = []
-            for obj in self:
-                fields += (field for field in obj.get_csv_fields() if field not in fields)
+            fields = collect_csv_fields(self)
 
             writer = csv.DictWriter(csv_file, fieldnames=fields, restval=None)
             writer.writeheader()
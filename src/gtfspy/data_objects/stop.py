@@ -1,5 +1,11 @@
+import math
+from bisect import bisect_left
+from datetime import timedelta
+
 from .base_object import BaseGtfsObjectCollection
+from ..utils.geo import EARTH_RADIUS, GridIndex, haversine_distances
 from ..utils.parsing import parse_yes_no_unknown, yes_no_unknown_to_int
+from ..utils.time import parse_time_of_day
 from ..utils.validating import not_none_or_empty, validate_true_false, validate_yes_no_unknown
 
 
@@ -24,8 +30,8 @@ class Stop(object):
         """
         self._id = str(stop_id)
         self.stop_name = stop_name
-        self.stop_lat = float(stop_lat)
-        self.stop_lon = float(stop_lon)
+        self._stop_lat = float(stop_lat)
+        self._stop_lon = float(stop_lon)
 
         self.attributes = {k: v for k, v in kwargs.items() if not_none_or_empty(v)}
         if not_none_or_empty(stop_code):
@@ -48,12 +54,59 @@ class Stop(object):
             else:
                 self.attributes["wheelchair_boarding"] = int(wheelchair_boarding)
 
-        self.stop_times = []
+        # the StopCollection which indexes this stop by its zone and its location
+        self._collection = None
+        # the departures from the stop ordered by their departure time, see departures
+        self._departures_index = None
+
+        if transit_data.stop_time_table is None:
+            self.stop_times = []
+        else:
+            self.stop_times = transit_data.stop_time_table.stop_stop_times(self)
 
     @property
     def id(self):
         return self._id
 
+    @property
+    def stop_lat(self):
+        """
+        :rtype: float
+        """
+
+        return self._stop_lat
+
+    @stop_lat.setter
+    def stop_lat(self, value):
+        """
+        :type value: float
+        """
+
+        self._move(float(value), self._stop_lon)
+
+    @property
+    def stop_lon(self):
+        """
+        :rtype: float
+        """
+
+        return self._stop_lon
+
+    @stop_lon.setter
+    def stop_lon(self, value):
+        """
+        :type value: float
+        """
+
+        self._move(self._stop_lat, float(value))
+
+    def _move(self, stop_lat, stop_lon):
+        self._changed()
+        old_stop_lat, old_stop_lon = self._stop_lat, self._stop_lon
+        self._stop_lat, self._stop_lon = stop_lat, stop_lon
+        if self._collection is not None:
+            self._collection._reindex_location(self, old_stop_lat, old_stop_lon)
+
     @property
     def stop_code(self):
         """
@@ -100,7 +153,10 @@ class Stop(object):
         :type value: int | None
         """
 
+        old_zone_id = self.zone_id
         self.attributes["zone_id"] = value
+        if self._collection is not None:
+            self._collection._reindex_zone(self, old_zone_id)
 
     @property
     def stop_url(self):
@@ -132,6 +188,7 @@ class Stop(object):
         :type value: bool
         """
 
+        self._changed()
         self.attributes["location_type"] = int(value)
 
     @property
@@ -148,6 +205,7 @@ class Stop(object):
         :type value: Stop | None
         """
 
+        self._changed()
         self.attributes["parent_station"] = value
 
     @property
@@ -180,8 +238,79 @@ class Stop(object):
         :type value: bool | None
         """
 
+        self._changed()
         self.attributes["wheelchair_boarding"] = yes_no_unknown_to_int(value)
 
+    def _changed(self):
+        # a stop which is in the data is validated again after a change of a validated field
+        if self._collection is not None:
+            self._collection._transit_data._changed("stops", self)
+
+    def departures(self, date, after_time=0, limit=None):
+        """
+        The departures from the stop on a date, ordered by their departure time. The trips of the previous service
+        day which depart after midnight (after 24:00:00) are included, and the stop times without a departure time or
+        without a pickup are not. The departures are indexed on the first call, and again after the data changes.
+
+        :type date: datetime.date
+        :param after_time: the time of the day from which the departures are returned (inclusive)
+        :type after_time: str | timedelta | datetime.time | int
+        :type limit: int | None
+        :return: the service date and the stop time of each departure
+        :rtype: list[(datetime.date, gtfspy.data_objects.StopTime)]
+        """
+
+        after_seconds = parse_time_of_day(after_time)
+        seconds, stop_times = self._get_departures_index()
+
+        # the departures of the service day of the date and of the previous service day are merged by their time
+        previous_date = date - timedelta(days=1)
+        current = bisect_left(seconds, after_seconds)
+        previous = bisect_left(seconds, after_seconds + 24 * 3600)
+        active_services = {}
+        result = []
+
+        count = len(seconds)
+        while limit is None or len(result) < limit:
+            if current < count and (previous >= count or seconds[current] <= seconds[previous] - 24 * 3600):
+                service_date, stop_time = date, stop_times[current]
+                current += 1
+            elif previous < count:
+                service_date, stop_time = previous_date, stop_times[previous]
+                previous += 1
+            else:
+                break
+
+            service = stop_time.trip.service
+            key = (service.id, service_date)
+            is_active = active_services.get(key)
+            if is_active is None:
+                is_active = active_services[key] = service.is_active_on(service_date)
+            if is_active:
+                result.append((service_date, stop_time))
+
+        return result
+
+    def _get_departures_index(self):
+        """
+        :return: the departure seconds and the stop times of the departures from the stop, ordered by their time
+        :rtype: (list[int], list[gtfspy.data_objects.StopTime])
+        """
+
+        version = None if self._collection is None else self._collection._transit_data._version
+        if self._departures_index is not None:
+            index_version, stop_times_count, seconds, stop_times = self._departures_index
+            if index_version == version and stop_times_count == len(self.stop_times) and version is not None:
+                return seconds, stop_times
+
+        departures = sorted((stop_time.departure_seconds, i, stop_time)
+                            for i, stop_time in enumerate(self.stop_times)
+                            if stop_time.departure_seconds is not None and stop_time.pickup_type != 1)
+        seconds = [departure_seconds for departure_seconds, _, _ in departures]
+        stop_times = [stop_time for _, _, stop_time in departures]
+        self._departures_index = (version, len(self.stop_times), seconds, stop_times)
+        return seconds, stop_times
+
     def get_csv_fields(self):
         return ["stop_id", "stop_name", "stop_lat", "stop_lon"] + list(self.attributes.keys())
 
@@ -225,6 +354,10 @@ class Stop(object):
 class StopCollection(BaseGtfsObjectCollection):
     def __init__(self, transit_data, csv_file=None):
         BaseGtfsObjectCollection.__init__(self, transit_data, Stop)
+        # stops by their ids, grouped by zone id
+        self._zones = {}
+        # the stops by their locations
+        self._grid = GridIndex()
 
         if csv_file is not None:
             self._load_file(csv_file)
@@ -236,10 +369,11 @@ class StopCollection(BaseGtfsObjectCollection):
             if condition is not None and not condition(stop):
                 return None
 
-            self._transit_data._changed()
+            self._transit_data._changed("stops", stop)
 
             assert stop.id not in self._objects
             self._objects[stop.id] = stop
+            self._link(stop)
             return stop
         except:
             if not ignore_errors:
@@ -266,12 +400,15 @@ class StopCollection(BaseGtfsObjectCollection):
         else:
             assert self[stop.id] is stop
 
+        self._transit_data._changed("stops", stop)
+
         if recursive:
             for stop_time in stop.stop_times:
                 stop_time.trip.stop_times.remove(stop_time)
         else:
             assert len(stop.stop_times) == 0
 
+        self._unlink(stop)
         del self._objects[stop.id]
 
         if clean_after:
@@ -290,4 +427,127 @@ class StopCollection(BaseGtfsObjectCollection):
                     to_clean.remove(stop.id)
 
         for stop_id in to_clean:
-            del self._objects[stop_id]
+            self._unlink(self._objects.pop(stop_id))
+
+    @property
+    def zone_ids(self):
+        """
+        :rtype: set[str]
+        """
+
+        return set(self._zones.keys())
+
+    def get_zone_stops(self, zone_id):
+        """
+        :type zone_id: str
+        :rtype: list[Stop]
+        """
+
+        return list(self._zones.get(zone_id, {}).values())
+
+    def within_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """
+        :rtype: list[Stop]
+        """
+
+        return [stop for stop in self._grid.in_bbox(min_lat, min_lon, max_lat, max_lon)
+                if min_lat <= stop.stop_lat <= max_lat and min_lon <= stop.stop_lon <= max_lon]
+
+    def within_radius(self, lat, lon, meters):
+        """
+        :type lat: float
+        :type lon: float
+        :type meters: float
+        :return: the stops within the distance from the point, ordered by their distance
+        :rtype: list[Stop]
+        """
+
+        lat_delta = math.degrees(meters / EARTH_RADIUS)
+        min_lat, max_lat = lat - lat_delta, lat + lat_delta
+        cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+        if max_lat >= 90 or min_lat <= -90 or lat_delta >= cos_lat * 90:
+            # the circle surrounds a pole or spans most of the longitudes
+            min_lon, max_lon = -180, 180
+        else:
+            lon_delta = math.degrees(math.asin(min(1.0, math.sin(meters / EARTH_RADIUS) / cos_lat)))
+            min_lon, max_lon = lon - lon_delta, lon + lon_delta
+            if min_lon < -180 or max_lon > 180:
+                # the circle crosses the antimeridian
+                min_lon, max_lon = -180, 180
+
+        candidates = list(self._grid.in_bbox(max(min_lat, -90), min_lon, min(max_lat, 90), max_lon))
+        distances = haversine_distances(lat, lon, ((stop.stop_lat, stop.stop_lon) for stop in candidates))
+        return [stop for distance, _, stop in sorted((distance, i, stop) for i, (distance, stop)
+                                                     in enumerate(zip(distances, candidates)) if distance <= meters)]
+
+    def nearest(self, lat, lon, k=1):
+        """
+        :type lat: float
+        :type lon: float
+        :type k: int
+        :return: the k nearest stops to the point, ordered by their distance
+        :rtype: list[Stop]
+        """
+
+        assert k >= 0
+
+        # (distance, order, stop) of the visited stops, the order keeps equally distant stops unordered
+        visited = []
+        for ring_stops, distance_outside in self._grid.in_rings(lat, lon):
+            distances = haversine_distances(lat, lon, ((stop.stop_lat, stop.stop_lon) for stop in ring_stops))
+            visited.extend((distance, len(visited) + i, stop) for i, (distance, stop)
+                           in enumerate(zip(distances, ring_stops)))
+            if len(visited) >= k:
+                visited.sort()
+                del visited[k:]
+                if k == 0 or visited[-1][0] <= distance_outside:
+                    break
+
+        visited.sort()
+        return [stop for _, _, stop in visited[:k]]
+
+    def _link(self, stop):
+        """
+        :type stop: Stop
+        """
+
+        stop._collection = self
+        if stop.zone_id is not None:
+            self._zones.setdefault(stop.zone_id, {})[stop.id] = stop
+        self._grid.add(stop.id, stop.stop_lat, stop.stop_lon, stop)
+
+    def _unlink(self, stop):
+        """
+        :type stop: Stop
+        """
+
+        stop._collection = None
+        self._remove_from_zone(stop, stop.zone_id)
+        self._grid.remove(stop.id, stop.stop_lat, stop.stop_lon, stop)
+
+    def _reindex_location(self, stop, old_stop_lat, old_stop_lon):
+        """
+        :type stop: Stop
+        :type old_stop_lat: float
+        :type old_stop_lon: float
+        """
+
+        self._grid.remove(stop.id, old_stop_lat, old_stop_lon, stop)
+        self._grid.add(stop.id, stop.stop_lat, stop.stop_lon, stop)
+
+    def _remove_from_zone(self, stop, zone_id):
+        zone_stops = self._zones.get(zone_id)
+        if zone_stops is not None and zone_stops.get(stop.id) is stop:
+            del zone_stops[stop.id]
+            if len(zone_stops) == 0:
+                del self._zones[zone_id]
+
+    def _reindex_zone(self, stop, old_zone_id):
+        """
+        :type stop: Stop
+        :type old_zone_id: str | None
+        """
+
+        self._remove_from_zone(stop, old_zone_id)
+        if stop.zone_id is not None:
+            self._zones.setdefault(stop.zone_id, {})[stop.id] = stop
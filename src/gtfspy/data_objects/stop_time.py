@@ -1,17 +1,20 @@
 from datetime import timedelta
 
-from ..utils.time import parse_timedelta, str_timedelta
+from ..utils.time import parse_seconds, format_seconds
 from ..utils.validating import not_none_or_empty, validate_pickup_drop_off_types
 
 
 class StopTime(object):
+    __slots__ = ("trip", "_arrival_seconds", "_departure_seconds", "stop", "stop_sequence", "_pickup_type",
+                 "_drop_off_type", "_shape_dist_traveled", "_stop_headsign", "_timepoint", "_attributes")
+
     def __init__(self, transit_data, trip_id, arrival_time, departure_time, stop_id, stop_sequence, pickup_type=None,
                  drop_off_type=None, shape_dist_traveled=None, stop_headsign=None, timepoint=None, **kwargs):
         """
         :type transit_data: gtfspy.transit_data_object.TransitData
         :type trip_id: str
-        :type arrival_time: str | timedelta
-        :type departure_time: str | timedelta
+        :type arrival_time: str | timedelta | int
+        :type departure_time: str | timedelta | int
         :type stop_id: str | int
         :type stop_sequence: str | int
         :type pickup_type: str | int | bool | None
@@ -22,22 +25,100 @@ class StopTime(object):
         """
 
         self.trip = transit_data.trips[str(trip_id)]
-        self.arrival_time = parse_timedelta(arrival_time)
-        self.departure_time = parse_timedelta(departure_time)
+        # times are kept as seconds since the start of the service day, arrival_time and departure_time are timedelta
+        # views of them
+        self._arrival_seconds = parse_seconds(arrival_time)
+        self._departure_seconds = parse_seconds(departure_time)
         self.stop = transit_data.stops[str(stop_id)]
         self.stop_sequence = int(stop_sequence)
 
-        self.attributes = {k: v for k, v in kwargs.items() if not_none_or_empty(v)}
-        if not_none_or_empty(pickup_type):
-            self.attributes["pickup_type"] = int(pickup_type)
-        if not_none_or_empty(drop_off_type):
-            self.attributes["drop_off_type"] = int(drop_off_type)
-        if not_none_or_empty(shape_dist_traveled):
-            self.attributes["shape_dist_traveled"] = float(shape_dist_traveled)
-        if not_none_or_empty(stop_headsign):
-            self.attributes["stop_headsign"] = str(stop_headsign)
-        if not_none_or_empty(timepoint):
-            self.attributes["timepoint"] = int(timepoint)
+        self._pickup_type = int(pickup_type) if not_none_or_empty(pickup_type) else None
+        self._drop_off_type = int(drop_off_type) if not_none_or_empty(drop_off_type) else None
+        self._shape_dist_traveled = float(shape_dist_traveled) if not_none_or_empty(shape_dist_traveled) else None
+        self._stop_headsign = str(stop_headsign) if not_none_or_empty(stop_headsign) else None
+        self._timepoint = int(timepoint) if not_none_or_empty(timepoint) else None
+
+        # only unknown columns are kept in a dict, which is created on first use
+        attributes = {k: v for k, v in kwargs.items() if not_none_or_empty(v)}
+        self._attributes = attributes if attributes else None
+
+    @property
+    def attributes(self):
+        """
+        Extra columns of the stop time which are not part of the known GTFS fields.
+
+        :rtype: dict
+        """
+
+        if self._attributes is None:
+            self._attributes = {}
+        return self._attributes
+
+    @property
+    def arrival_seconds(self):
+        """
+        :rtype: int | None
+        """
+
+        return self._arrival_seconds
+
+    @arrival_seconds.setter
+    def arrival_seconds(self, value):
+        """
+        :type value: int | None
+        """
+
+        self.trip._changed()
+        self._arrival_seconds = value
+
+    @property
+    def departure_seconds(self):
+        """
+        :rtype: int | None
+        """
+
+        return self._departure_seconds
+
+    @departure_seconds.setter
+    def departure_seconds(self, value):
+        """
+        :type value: int | None
+        """
+
+        self.trip._changed()
+        self._departure_seconds = value
+
+    @property
+    def arrival_time(self):
+        """
+        :rtype: timedelta | None
+        """
+
+        return None if self.arrival_seconds is None else timedelta(seconds=self.arrival_seconds)
+
+    @arrival_time.setter
+    def arrival_time(self, value):
+        """
+        :type value: str | timedelta | int | None
+        """
+
+        self.arrival_seconds = parse_seconds(value)
+
+    @property
+    def departure_time(self):
+        """
+        :rtype: timedelta | None
+        """
+
+        return None if self.departure_seconds is None else timedelta(seconds=self.departure_seconds)
+
+    @departure_time.setter
+    def departure_time(self, value):
+        """
+        :type value: str | timedelta | int | None
+        """
+
+        self.departure_seconds = parse_seconds(value)
 
     @property
     def pickup_type(self):
@@ -45,7 +126,7 @@ class StopTime(object):
         :rtype: int
         """
 
-        return self.attributes.get("pickup_type", 0)
+        return self._pickup_type if self._pickup_type is not None else 0
 
     @pickup_type.setter
     def pickup_type(self, value):
@@ -53,7 +134,8 @@ class StopTime(object):
         :type value: int
         """
 
-        self.attributes["pickup_type"] = int(value)
+        self.trip._changed()
+        self._pickup_type = int(value)
 
     @property
     def drop_off_type(self):
@@ -61,7 +143,7 @@ class StopTime(object):
         :rtype: int
         """
 
-        return self.attributes.get("drop_off_type", 0)
+        return self._drop_off_type if self._drop_off_type is not None else 0
 
     @drop_off_type.setter
     def drop_off_type(self, value):
@@ -69,7 +151,8 @@ class StopTime(object):
         :type value: int
         """
 
-        self.attributes["drop_off_type"] = int(value)
+        self.trip._changed()
+        self._drop_off_type = int(value)
 
     @property
     def allow_pickup(self):
@@ -109,7 +192,7 @@ class StopTime(object):
         :rtype: float | None
         """
 
-        return self.attributes.get("shape_dist_traveled", None)
+        return self._shape_dist_traveled
 
     @shape_dist_traveled.setter
     def shape_dist_traveled(self, value):
@@ -117,7 +200,7 @@ class StopTime(object):
         :type value: float | None
         """
 
-        self.attributes["shape_dist_traveled"] = value
+        self._shape_dist_traveled = value
 
     @property
     def stop_headsign(self):
@@ -125,7 +208,7 @@ class StopTime(object):
         :rtype: str | None
         """
 
-        return self.attributes.get("stop_headsign", None)
+        return self._stop_headsign
 
     @stop_headsign.setter
     def stop_headsign(self, value):
@@ -133,7 +216,7 @@ class StopTime(object):
         :type value: str | None
         """
 
-        self.attributes["stop_headsign"] = value
+        self._stop_headsign = value
 
     @property
     def is_exact_time(self):
@@ -141,7 +224,7 @@ class StopTime(object):
         :rtype: int | None
         """
 
-        return bool(self.attributes.get("timepoint", 1))
+        return bool(self._timepoint if self._timepoint is not None else 1)
 
     @is_exact_time.setter
     def is_exact_time(self, value):
@@ -149,18 +232,39 @@ class StopTime(object):
         :type value: bool | None
         """
 
-        self.attributes["timepoint"] = int(value)
+        self._timepoint = int(value)
+
+    def _optional_attributes(self):
+        """
+        :rtype: dict
+        """
+
+        result = {}
+        if self._pickup_type is not None:
+            result["pickup_type"] = self._pickup_type
+        if self._drop_off_type is not None:
+            result["drop_off_type"] = self._drop_off_type
+        if self._shape_dist_traveled is not None:
+            result["shape_dist_traveled"] = self._shape_dist_traveled
+        if self._stop_headsign is not None:
+            result["stop_headsign"] = self._stop_headsign
+        if self._timepoint is not None:
+            result["timepoint"] = self._timepoint
+        if self._attributes:
+            result.update(self._attributes)
+        return result
 
     def get_csv_fields(self):
-        return ["trip_id", "arrival_time", "departure_time", "stop_id", "stop_sequence"] + list(self.attributes.keys())
+        return ["trip_id", "arrival_time", "departure_time", "stop_id", "stop_sequence"] + \
+               list(self._optional_attributes().keys())
 
     def to_csv_line(self):
         result = dict(trip_id=self.trip.id,
-                      arrival_time=str_timedelta(self.arrival_time),
-                      departure_time=str_timedelta(self.departure_time),
+                      arrival_time=format_seconds(self.arrival_seconds),
+                      departure_time=format_seconds(self.departure_seconds),
                       stop_id=self.stop.id,
                       stop_sequence=self.stop_sequence,
-                      **self.attributes)
+                      **self._optional_attributes())
         return result
 
     def validate(self, transit_data):
@@ -171,23 +275,24 @@ class StopTime(object):
         assert transit_data.trips[self.trip.id] is self.trip
         assert transit_data.stops[self.stop.id] is self.stop
 
-        assert validate_pickup_drop_off_types(self.attributes.get("pickup_type", 0))
-        assert validate_pickup_drop_off_types(self.attributes.get("drop_off_type", 0))
+        assert validate_pickup_drop_off_types(self.pickup_type)
+        assert validate_pickup_drop_off_types(self.drop_off_type)
 
         # TODO: create same validation for last stop times
         if self.stop_sequence == 0:
-            assert self.arrival_time is not None
-            assert self.departure_time is not None
-        if self.arrival_time is not None and self.departure_time is not None:
-            assert self.arrival_time <= self.departure_time
+            assert self.arrival_seconds is not None
+            assert self.departure_seconds is not None
+        if self.arrival_seconds is not None and self.departure_seconds is not None:
+            assert self.arrival_seconds <= self.departure_seconds
 
     def __eq__(self, other):
         if not isinstance(other, StopTime):
             return False
 
-        return self.trip == other.trip and self.arrival_time == other.arrival_time and \
-               self.departure_time == other.departure_time and self.stop == other.stop and \
-               self.stop_sequence == other.stop_sequence and self.attributes == other.attributes
+        return self.trip == other.trip and self.arrival_seconds == other.arrival_seconds and \
+               self.departure_seconds == other.departure_seconds and self.stop == other.stop and \
+               self.stop_sequence == other.stop_sequence and \
+               self._optional_attributes() == other._optional_attributes()
 
     def __ne__(self, other):
         return not (self == other)
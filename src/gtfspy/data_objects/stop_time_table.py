@@ -0,0 +1,759 @@
+import math
+import sys
+from array import array
+
+from .stop_time import StopTime
+from ..utils.time import parse_seconds
+from ..utils.validating import not_none_or_empty
+
+MISSING_VALUE = -1
+
+_TRIP_LINK = 1
+_STOP_LINK = 2
+
+_MIN_PENDING_ROWS = 1024
+
+# the columns of a compacted table which are kept once per stop pattern (see StopTimeTable.compact)
+_PATTERN_COLUMNS = (("stop_index", "i"), ("stop_sequence", "i"), ("pickup_type", "b"), ("drop_off_type", "b"),
+                    ("timepoint", "b"), ("shape_dist_traveled", "d"), ("stop_headsign", "i"))
+# the columns of a compacted table which are kept once per running time profile, as offsets from the first departure
+_PROFILE_COLUMNS = ("arrival_time", "departure_time")
+# a missing time in a running time profile, whose offsets may be negative
+_MISSING_OFFSET = -2 ** 31
+
+
+class StopTimeTable(object):
+    """
+    Columnar storage of all the stop times of a TransitData object.
+
+    Every stop time is a row in a set of compact arrays, and the rows of each trip and of each stop are indexed with
+    CSR-style offsets. Trip.stop_times and Stop.stop_times are lightweight views over this table that expose the
+    regular StopTime API. The values of the rows can be kept by trip pattern instead of by row, see compact.
+    """
+
+    def __init__(self, transit_data):
+        """
+        :type transit_data: gtfspy.transit_data_object.TransitData
+        """
+
+        self._transit_data = transit_data
+
+        self.trips = []
+        self._trip_indexes = {}
+        self.stops = []
+        self._stop_indexes = {}
+        self.headsigns = []
+        self._headsign_indexes = {}
+
+        self.trip_index = array('i')
+        self.stop_index = array('i')
+        self.arrival_time = array('i')
+        self.departure_time = array('i')
+        self.stop_sequence = array('i')
+        self.pickup_type = array('b')
+        self.drop_off_type = array('b')
+        self.timepoint = array('b')
+        self.shape_dist_traveled = array('d')
+        self.stop_headsign = array('i')
+        self.extra_attributes = {}
+        # whether each row is still linked to its trip and to its stop
+        self.links = bytearray()
+
+        self._index_built = False
+        self._indexed_rows = 0
+        self._trip_offsets = array('i', [0])
+        self._trip_rows = array('i')
+        self._stop_offsets = array('i', [0])
+        self._stop_rows = array('i')
+        self._pending_trip_rows = {}
+        self._pending_stop_rows = {}
+        self._pending_rows_count = 0
+
+        # loads the rows of the table on first use, when the stop times are loaded lazily
+        self._loader = None
+        # the stop patterns and running time profiles of the trips, when the table is compacted
+        self._patterns = None
+
+    def _ensure_loaded(self):
+        if self._loader is not None:
+            loader = self._loader
+            self._loader = None
+            loader()
+
+    def add(self, trip_id, arrival_time, departure_time, stop_id, stop_sequence, pickup_type=None,
+            drop_off_type=None, shape_dist_traveled=None, stop_headsign=None, timepoint=None, **kwargs):
+        """
+        Adds a row to the table, accepting the same arguments as StopTime.
+
+        :rtype: int
+        """
+
+        self._ensure_loaded()
+        self._expand()
+
+        trip = self._transit_data.trips[str(trip_id)]
+        stop = self._transit_data.stops[str(stop_id)]
+        arrival_time = parse_seconds(arrival_time)
+        departure_time = parse_seconds(departure_time)
+        stop_sequence = int(stop_sequence)
+        pickup_type = int(pickup_type) if not_none_or_empty(pickup_type) else MISSING_VALUE
+        drop_off_type = int(drop_off_type) if not_none_or_empty(drop_off_type) else MISSING_VALUE
+        shape_dist_traveled = float(shape_dist_traveled) if not_none_or_empty(shape_dist_traveled) else math.nan
+        timepoint = int(timepoint) if not_none_or_empty(timepoint) else MISSING_VALUE
+        extra_attributes = {k: v for k, v in kwargs.items() if not_none_or_empty(v)}
+
+        row = len(self.trip_index)
+        self.trip_index.append(self._get_trip_index(trip))
+        self.stop_index.append(self._get_stop_index(stop))
+        self.arrival_time.append(MISSING_VALUE if arrival_time is None else arrival_time)
+        self.departure_time.append(MISSING_VALUE if departure_time is None else departure_time)
+        self.stop_sequence.append(stop_sequence)
+        self.pickup_type.append(pickup_type)
+        self.drop_off_type.append(drop_off_type)
+        self.timepoint.append(timepoint)
+        self.shape_dist_traveled.append(shape_dist_traveled)
+        self.stop_headsign.append(self._get_headsign_index(stop_headsign))
+        if extra_attributes:
+            self.extra_attributes[row] = extra_attributes
+        self.links.append(_TRIP_LINK | _STOP_LINK)
+
+        if self._index_built:
+            self._pending_trip_rows.setdefault(self.trip_index[row], []).append(row)
+            self._pending_stop_rows.setdefault(self.stop_index[row], []).append(row)
+            self._pending_rows_count += 1
+            if self._pending_rows_count > max(_MIN_PENDING_ROWS, self._indexed_rows // 4):
+                self._index_built = False
+
+        return row
+
+    def get_row(self, row):
+        """
+        :type row: int
+        :rtype: StopTimeRow
+        """
+
+        return StopTimeRow(self, row)
+
+    def trip_stop_times(self, trip):
+        """
+        :type trip: gtfspy.data_objects.Trip
+        :rtype: TripStopTimes
+        """
+
+        return TripStopTimes(self, trip)
+
+    def stop_stop_times(self, stop):
+        """
+        :type stop: gtfspy.data_objects.Stop
+        :rtype: StopStopTimes
+        """
+
+        return StopStopTimes(self, stop)
+
+    def trip_rows(self, trip):
+        """
+        :type trip: gtfspy.data_objects.Trip
+        :return: the rows of the trip, ordered by their stop sequence
+        :rtype: list[int]
+        """
+
+        self._ensure_loaded()
+
+        index = self._trip_indexes.get(trip.id)
+        if index is None or self.trips[index] is not trip:
+            return []
+
+        self._ensure_index()
+        links = self.links
+        rows = [row for row in self._trip_rows[self._trip_offsets[index]:self._trip_offsets[index + 1]]
+                if links[row] & _TRIP_LINK]
+        pending_rows = self._pending_trip_rows.get(index)
+        if pending_rows:
+            rows += (row for row in pending_rows if links[row] & _TRIP_LINK)
+            rows.sort(key=self.stop_sequence.__getitem__)
+        return rows
+
+    def trips_rows(self, trips):
+        """
+        :type trips: list[gtfspy.data_objects.Trip]
+        :return: the rows of all the trips one after another, each ordered by their stop sequence, and the end of the
+                 rows of every trip
+        :rtype: (list[int], list[int])
+        """
+
+        self._ensure_loaded()
+        self._ensure_index()
+
+        rows = []
+        ends = []
+        links = self.links
+        if self._pending_rows_count or links.count(0) or links.count(_STOP_LINK):
+            for trip in trips:
+                rows += self.trip_rows(trip)
+                ends.append(len(rows))
+            return rows, ends
+
+        # all the rows are indexed and linked to their trips, so the rows of every trip are a slice of the index
+        trip_offsets = self._trip_offsets
+        trip_rows = self._trip_rows
+        for trip in trips:
+            index = self._trip_indexes.get(trip.id)
+            if index is not None and self.trips[index] is trip:
+                rows += trip_rows[trip_offsets[index]:trip_offsets[index + 1]]
+            ends.append(len(rows))
+        return rows, ends
+
+    def stop_rows(self, stop):
+        """
+        :type stop: gtfspy.data_objects.Stop
+        :return: the rows of the stop, in the order they were added
+        :rtype: list[int]
+        """
+
+        self._ensure_loaded()
+
+        index = self._stop_indexes.get(stop.id)
+        if index is None or self.stops[index] is not stop:
+            return []
+
+        self._ensure_index()
+        links = self.links
+        rows = [row for row in self._stop_rows[self._stop_offsets[index]:self._stop_offsets[index + 1]]
+                if links[row] & _STOP_LINK]
+        pending_rows = self._pending_stop_rows.get(index)
+        if pending_rows:
+            rows += (row for row in pending_rows if links[row] & _STOP_LINK)
+            rows.sort()
+        return rows
+
+    def unlink_from_trip(self, row):
+        self.links[row] &= ~_TRIP_LINK
+
+    def unlink_from_stop(self, row):
+        self.links[row] &= ~_STOP_LINK
+
+    def build_index(self):
+        """
+        Rebuilds the per trip and per stop offsets of all the rows in the table.
+        """
+
+        self._trip_offsets, self._trip_rows = self._group_rows(self.trip_index, len(self.trips), _TRIP_LINK)
+        stop_sequence = self.stop_sequence
+        trip_offsets = self._trip_offsets
+        trip_rows = self._trip_rows
+        for index in range(len(self.trips)):
+            start, end = trip_offsets[index], trip_offsets[index + 1]
+            rows = trip_rows[start:end]
+            if any(stop_sequence[rows[i]] > stop_sequence[rows[i + 1]] for i in range(len(rows) - 1)):
+                trip_rows[start:end] = array('i', sorted(rows, key=stop_sequence.__getitem__))
+
+        self._stop_offsets, self._stop_rows = self._group_rows(self.stop_index, len(self.stops), _STOP_LINK)
+
+        self._indexed_rows = len(self.trip_index)
+        self._pending_trip_rows = {}
+        self._pending_stop_rows = {}
+        self._pending_rows_count = 0
+        self._index_built = True
+
+    def invalidate_index(self):
+        self._index_built = False
+
+    @property
+    def is_compact(self):
+        """
+        :rtype: bool
+        """
+
+        return self._patterns is not None
+
+    def compact(self):
+        """
+        Keeps the stop times by pattern, to reduce their memory. The trips whose rows have the same stops, stop
+        sequences, pickup and drop off types, time points, distances and headsigns share a stop pattern, and the trips
+        which run at the same pace (their times have the same offsets from their first departure) share a running time
+        profile. Every trip keeps the indexes of its pattern and its profile and its first departure, and every row
+        only its trip and its position in the trip.
+
+        The rows keep their numbers and the StopTime API, and the values are read through the patterns. Changing a
+        value of a row (or adding a row) expands the table back to a column per field.
+        """
+
+        self._ensure_loaded()
+        if self._patterns is not None:
+            return
+
+        self._patterns = _StopTimePatterns(self)
+        for name, _ in _PATTERN_COLUMNS:
+            setattr(self, name, _PatternColumn(self, name))
+        for name in _PROFILE_COLUMNS:
+            setattr(self, name, _ProfileColumn(self, name))
+
+    def _expand(self):
+        """
+        Keeps the values of a compacted table in a column per field again.
+        """
+
+        if self._patterns is None:
+            return
+
+        rows = range(len(self.trip_index))
+        columns = [(name, array(typecode, map(getattr(self, name).__getitem__, rows)))
+                   for name, typecode in _PATTERN_COLUMNS]
+        columns += [(name, array('i', map(getattr(self, name).__getitem__, rows))) for name in _PROFILE_COLUMNS]
+        self._patterns = None
+        for name, column in columns:
+            setattr(self, name, column)
+
+    def _ensure_index(self):
+        if not self._index_built:
+            self.build_index()
+
+    def _group_rows(self, group_column, groups_count, link):
+        """
+        :param link: the link of the rows which are grouped, or None to group all the rows
+        :type link: int | None
+        """
+
+        links = self.links
+        offsets = array('i', [0]) * (groups_count + 1)
+        for row, group in enumerate(group_column):
+            if link is None or links[row] & link:
+                offsets[group + 1] += 1
+        for group in range(groups_count):
+            offsets[group + 1] += offsets[group]
+
+        positions = array('i', offsets)
+        rows = array('i', [0]) * offsets[-1]
+        for row, group in enumerate(group_column):
+            if link is None or links[row] & link:
+                rows[positions[group]] = row
+                positions[group] += 1
+
+        return offsets, rows
+
+    def _get_trip_index(self, trip):
+        index = self._trip_indexes.get(trip.id)
+        if index is None or self.trips[index] is not trip:
+            index = len(self.trips)
+            self.trips.append(trip)
+            self._trip_indexes[trip.id] = index
+            self._index_built = False
+        return index
+
+    def _get_stop_index(self, stop):
+        index = self._stop_indexes.get(stop.id)
+        if index is None or self.stops[index] is not stop:
+            index = len(self.stops)
+            self.stops.append(stop)
+            self._stop_indexes[stop.id] = index
+            self._index_built = False
+        return index
+
+    def _get_headsign_index(self, headsign):
+        if not not_none_or_empty(headsign):
+            return MISSING_VALUE
+
+        headsign = str(headsign)
+        index = self._headsign_indexes.get(headsign)
+        if index is None:
+            index = len(self.headsigns)
+            self.headsigns.append(headsign)
+            self._headsign_indexes[headsign] = index
+        return index
+
+    def get_csv_fields(self):
+        """
+        The union of the csv fields of the stop times of the table, found by scanning its optional columns.
+
+        :rtype: list[str]
+        """
+
+        self._ensure_loaded()
+        links = self.links
+        if links.count(_TRIP_LINK | _STOP_LINK) == len(links):
+            rows = range(len(links))
+        else:
+            rows = [row for row in range(len(links)) if links[row] & _TRIP_LINK]
+
+        fields = ["trip_id", "arrival_time", "departure_time", "stop_id", "stop_sequence"]
+        for field, column in (("pickup_type", self.pickup_type), ("drop_off_type", self.drop_off_type)):
+            if any(column[row] != MISSING_VALUE for row in rows):
+                fields.append(field)
+        if any(not math.isnan(self.shape_dist_traveled[row]) for row in rows):
+            fields.append("shape_dist_traveled")
+        if any(self.stop_headsign[row] != MISSING_VALUE for row in rows):
+            fields.append("stop_headsign")
+        if any(self.timepoint[row] != MISSING_VALUE for row in rows):
+            fields.append("timepoint")
+
+        extra_fields = {}
+        for row, attributes in self.extra_attributes.items():
+            if links[row] & _TRIP_LINK:
+                extra_fields.update(dict.fromkeys(attributes))
+        return fields + [field for field in extra_fields if field not in fields]
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self.trip_index)
+
+    def __sizeof__(self):
+        # the columns and the indexes of the rows, the trips and the stops are objects of their own collections
+        columns = [getattr(self, name) for name, _ in _PATTERN_COLUMNS]
+        columns += [getattr(self, name) for name in _PROFILE_COLUMNS]
+        columns += [self.trip_index, self.links, self._trip_offsets, self._trip_rows, self._stop_offsets,
+                    self._stop_rows, self._patterns]
+        return object.__sizeof__(self) + sum(sys.getsizeof(column) for column in columns
+                                             if column is not None and not isinstance(column, _PatternColumn))
+
+
+class _StopTimePatterns(object):
+    """
+    The stop patterns and the running time profiles of the trips of a compacted StopTimeTable.
+    """
+
+    def __init__(self, table):
+        """
+        Builds the patterns and the profiles of all the rows of the table, including the rows which were removed from
+        their trips (and may still be in the stop times of their stops).
+
+        :type table: StopTimeTable
+        """
+
+        trip_offsets, trip_rows = table._group_rows(table.trip_index, len(table.trips), None)
+        longest_trip = max((trip_offsets[i + 1] - trip_offsets[i] for i in range(len(table.trips))), default=0)
+
+        # the position of every row in the rows of its trip, ordered by their stop sequence
+        self.positions = array('H' if longest_trip <= 0xFFFF else 'i', [0]) * len(table.trip_index)
+        self.trip_patterns = array('i')
+        self.trip_profiles = array('i')
+        self.trip_starts = array('i')
+        # the values of pattern i are pattern_offsets[i]:pattern_offsets[i + 1] of each column, and likewise profiles
+        self.pattern_offsets = array('i', [0])
+        self.pattern_columns = {name: array(typecode) for name, typecode in _PATTERN_COLUMNS}
+        self.profile_offsets = array('i', [0])
+        self.profile_columns = {name: array('i') for name in _PROFILE_COLUMNS}
+
+        pattern_indexes = {}
+        profile_indexes = {}
+        stop_sequence = table.stop_sequence
+        for index in range(len(table.trips)):
+            rows = sorted(trip_rows[trip_offsets[index]:trip_offsets[index + 1]], key=stop_sequence.__getitem__)
+            for position, row in enumerate(rows):
+                self.positions[row] = position
+
+            # the values are compared as bytes, so the missing distances (nan) of two trips are equal
+            pattern = tuple(array(typecode, map(getattr(table, name).__getitem__, rows)).tobytes()
+                            for name, typecode in _PATTERN_COLUMNS)
+            pattern_index = pattern_indexes.get(pattern)
+            if pattern_index is None:
+                pattern_index = pattern_indexes[pattern] = len(self.pattern_offsets) - 1
+                for (name, _), values in zip(_PATTERN_COLUMNS, pattern):
+                    self.pattern_columns[name].frombytes(values)
+                self.pattern_offsets.append(self.pattern_offsets[-1] + len(rows))
+
+            times = [list(map(getattr(table, name).__getitem__, rows)) for name in _PROFILE_COLUMNS]
+            arrivals, departures = times
+            start = next((seconds for seconds in departures + arrivals if seconds != MISSING_VALUE), 0)
+            profile = tuple(array('i', [_MISSING_OFFSET if seconds == MISSING_VALUE else seconds - start
+                                        for seconds in column_times]).tobytes()
+                            for column_times in times)
+            profile_index = profile_indexes.get(profile)
+            if profile_index is None:
+                profile_index = profile_indexes[profile] = len(self.profile_offsets) - 1
+                for name, offsets in zip(_PROFILE_COLUMNS, profile):
+                    self.profile_columns[name].frombytes(offsets)
+                self.profile_offsets.append(self.profile_offsets[-1] + len(rows))
+
+            self.trip_patterns.append(pattern_index)
+            self.trip_profiles.append(profile_index)
+            self.trip_starts.append(start)
+
+    def __sizeof__(self):
+        columns = [self.positions, self.trip_patterns, self.trip_profiles, self.trip_starts, self.pattern_offsets,
+                   self.profile_offsets] + list(self.pattern_columns.values()) + list(self.profile_columns.values())
+        return object.__sizeof__(self) + sum(map(sys.getsizeof, columns))
+
+
+class _PatternColumn(object):
+    """
+    A column of a compacted StopTimeTable whose values are kept once per stop pattern.
+    """
+
+    def __init__(self, table, name):
+        """
+        :type table: StopTimeTable
+        :type name: str
+        """
+
+        self._table = table
+        self._name = name
+        self._values = table._patterns.pattern_columns[name]
+
+    def __getitem__(self, row):
+        patterns = self._table._patterns
+        trip = self._table.trip_index[row]
+        return self._values[patterns.pattern_offsets[patterns.trip_patterns[trip]] + patterns.positions[row]]
+
+    def __setitem__(self, row, value):
+        self._table._expand()
+        getattr(self._table, self._name)[row] = value
+
+    def __len__(self):
+        return len(self._table.trip_index)
+
+    def __iter__(self):
+        return map(self.__getitem__, range(len(self)))
+
+
+class _ProfileColumn(_PatternColumn):
+    """
+    A time column of a compacted StopTimeTable whose values are kept once per running time profile, as offsets from
+    the first departure of each trip.
+    """
+
+    def __init__(self, table, name):
+        """
+        :type table: StopTimeTable
+        :type name: str
+        """
+
+        self._table = table
+        self._name = name
+        self._values = table._patterns.profile_columns[name]
+
+    def __getitem__(self, row):
+        patterns = self._table._patterns
+        trip = self._table.trip_index[row]
+        offset = self._values[patterns.profile_offsets[patterns.trip_profiles[trip]] + patterns.positions[row]]
+        return MISSING_VALUE if offset == _MISSING_OFFSET else patterns.trip_starts[trip] + offset
+
+
+class _StopTimesView(object):
+    def __init__(self, table, owner):
+        """
+        :type table: StopTimeTable
+        """
+
+        self._table = table
+        self._owner = owner
+
+    def _rows(self):
+        raise NotImplementedError()
+
+    def _unlink(self, row):
+        raise NotImplementedError()
+
+    def _find_row(self, stop_time):
+        rows = self._rows()
+        if isinstance(stop_time, StopTimeRow) and stop_time._table is self._table:
+            if stop_time._row in rows:
+                return stop_time._row
+        else:
+            for row in rows:
+                if StopTimeRow(self._table, row) == stop_time:
+                    return row
+        raise ValueError("%r is not in the stop times" % (stop_time,))
+
+    def remove(self, stop_time):
+        row = self._find_row(stop_time)
+        self._table._transit_data._changed("trips", self._table.get_row(row).trip)
+        self._unlink(row)
+
+    def __len__(self):
+        return len(self._rows())
+
+    def __iter__(self):
+        table = self._table
+        return (StopTimeRow(table, row) for row in self._rows())
+
+    def __getitem__(self, index):
+        rows = self._rows()
+        if isinstance(index, slice):
+            return [StopTimeRow(self._table, row) for row in rows[index]]
+        return StopTimeRow(self._table, rows[index])
+
+    def __contains__(self, stop_time):
+        try:
+            self._find_row(stop_time)
+            return True
+        except ValueError:
+            return False
+
+
+class TripStopTimes(_StopTimesView):
+    """
+    The stop times of a single trip in a StopTimeTable, ordered by their stop sequence.
+
+    New stop times must be added through TransitData.add_stop_time.
+    """
+
+    def _rows(self):
+        return self._table.trip_rows(self._owner)
+
+    def _unlink(self, row):
+        self._table.unlink_from_trip(row)
+
+
+class StopStopTimes(_StopTimesView):
+    """
+    The stop times of a single stop in a StopTimeTable, in the order they were added.
+
+    New stop times must be added through TransitData.add_stop_time.
+    """
+
+    def _rows(self):
+        return self._table.stop_rows(self._owner)
+
+    def _unlink(self, row):
+        self._table.unlink_from_stop(row)
+
+
+class StopTimeRow(StopTime):
+    """
+    A lightweight StopTime which reads and writes its values from a row of a StopTimeTable.
+    """
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row):
+        """
+        :type table: StopTimeTable
+        :type row: int
+        """
+
+        self._table = table
+        self._row = row
+
+    @property
+    def trip(self):
+        """
+        :rtype: gtfspy.data_objects.Trip
+        """
+
+        return self._table.trips[self._table.trip_index[self._row]]
+
+    @trip.setter
+    def trip(self, value):
+        self.trip._changed()
+        value._changed()
+        # the position of the row in its trip is kept for the patterns of a compacted table
+        self._table._expand()
+        self._table.trip_index[self._row] = self._table._get_trip_index(value)
+        self._table.invalidate_index()
+
+    @property
+    def stop(self):
+        """
+        :rtype: gtfspy.data_objects.Stop
+        """
+
+        return self._table.stops[self._table.stop_index[self._row]]
+
+    @stop.setter
+    def stop(self, value):
+        self.trip._changed()
+        self._table.stop_index[self._row] = self._table._get_stop_index(value)
+        self._table.invalidate_index()
+
+    @property
+    def arrival_seconds(self):
+        """
+        :rtype: int | None
+        """
+
+        seconds = self._table.arrival_time[self._row]
+        return None if seconds == MISSING_VALUE else seconds
+
+    @arrival_seconds.setter
+    def arrival_seconds(self, value):
+        self.trip._changed()
+        self._table.arrival_time[self._row] = MISSING_VALUE if value is None else value
+
+    @property
+    def departure_seconds(self):
+        """
+        :rtype: int | None
+        """
+
+        seconds = self._table.departure_time[self._row]
+        return None if seconds == MISSING_VALUE else seconds
+
+    @departure_seconds.setter
+    def departure_seconds(self, value):
+        self.trip._changed()
+        self._table.departure_time[self._row] = MISSING_VALUE if value is None else value
+
+    @property
+    def stop_sequence(self):
+        """
+        :rtype: int
+        """
+
+        return self._table.stop_sequence[self._row]
+
+    @stop_sequence.setter
+    def stop_sequence(self, value):
+        self.trip._changed()
+        self._table.stop_sequence[self._row] = int(value)
+        self._table.invalidate_index()
+
+    @property
+    def _pickup_type(self):
+        value = self._table.pickup_type[self._row]
+        return None if value == MISSING_VALUE else value
+
+    @_pickup_type.setter
+    def _pickup_type(self, value):
+        self._table._transit_data._check_writable()
+        self._table.pickup_type[self._row] = MISSING_VALUE if value is None else value
+
+    @property
+    def _drop_off_type(self):
+        value = self._table.drop_off_type[self._row]
+        return None if value == MISSING_VALUE else value
+
+    @_drop_off_type.setter
+    def _drop_off_type(self, value):
+        self._table._transit_data._check_writable()
+        self._table.drop_off_type[self._row] = MISSING_VALUE if value is None else value
+
+    @property
+    def _shape_dist_traveled(self):
+        value = self._table.shape_dist_traveled[self._row]
+        return None if math.isnan(value) else value
+
+    @_shape_dist_traveled.setter
+    def _shape_dist_traveled(self, value):
+        self._table._transit_data._check_writable()
+        self._table.shape_dist_traveled[self._row] = math.nan if value is None else float(value)
+
+    @property
+    def _stop_headsign(self):
+        value = self._table.stop_headsign[self._row]
+        return None if value == MISSING_VALUE else self._table.headsigns[value]
+
+    @_stop_headsign.setter
+    def _stop_headsign(self, value):
+        self._table._transit_data._check_writable()
+        self._table.stop_headsign[self._row] = self._table._get_headsign_index(value)
+
+    @property
+    def _timepoint(self):
+        value = self._table.timepoint[self._row]
+        return None if value == MISSING_VALUE else value
+
+    @_timepoint.setter
+    def _timepoint(self, value):
+        self._table._transit_data._check_writable()
+        self._table.timepoint[self._row] = MISSING_VALUE if value is None else value
+
+    @property
+    def _attributes(self):
+        return self._table.extra_attributes.get(self._row)
+
+    @_attributes.setter
+    def _attributes(self, value):
+        self._table.extra_attributes[self._row] = value
+
+    def __repr__(self):
+        return "<StopTimeRow %d of trip %s>" % (self._row, self.trip.id)
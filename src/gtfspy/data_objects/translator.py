@@ -1,9 +1,8 @@
 import csv
 import io
 from collections import defaultdict
-from zipfile import ZipExtFile
 
-from ..utils.parsing import decode_file
+from ..utils.parsing import decode_stream
 
 
 class Translator(object):
@@ -19,13 +18,18 @@ class Translator(object):
         for row in data:
             self.add_translate(row["lang"], row["trans_id"], row["translation"])
 
-    def _load_file(self, csv_file):
+    def _load_file(self, csv_file, encoding=None):
+        """
+        :type csv_file: str | io.BufferedIOBase | io.TextIOBase
+        :type encoding: str | gtfspy.utils.parsing.EncodingDetector | None
+        """
+
         if isinstance(csv_file, str):
             print(type(csv_file), csv_file)
-            with open(csv_file, "r", encoding='utf-8-sig') as f:
-                self._load_file(f)
-        elif isinstance(csv_file, ZipExtFile):
-            csv_file = decode_file(csv_file)
+            with open(csv_file, "rb") as f:
+                self._load_file(f, encoding=encoding)
+        elif isinstance(csv_file, io.BufferedIOBase):
+            csv_file = decode_stream(csv_file, encoding=encoding)
             self._load_file(csv_file)
         else:
             print(type(csv_file))
@@ -1,4 +1,4 @@
-from datetime import date, time, timedelta
+from datetime import date, datetime, time, timedelta
 from operator import attrgetter
 
 from sortedcontainers import SortedList
@@ -28,8 +28,8 @@ class Trip(object):
         """
 
         self._id = str(trip_id)
-        self.route = transit_data.routes[str(route_id)]
-        self.service = transit_data.calendar[str(service_id)]
+        self._route = transit_data.routes[str(route_id)]
+        self._service = transit_data.calendar[str(service_id)]
 
         self.attributes = {k: v for k, v in kwargs.items() if not_none_or_empty(v)}
         if not_none_or_empty(trip_headsign):
@@ -55,12 +55,57 @@ class Trip(object):
         if not_none_or_empty(original_trip_id):
             self.attributes["original_trip_id"] = str(original_trip_id)
 
-        self.stop_times = SortedList(key=attrgetter("stop_sequence"))
+        if transit_data.stop_time_table is None:
+            self.stop_times = SortedList(key=attrgetter("stop_sequence"))
+        else:
+            self.stop_times = transit_data.stop_time_table.trip_stop_times(self)
 
     @property
     def id(self):
         return self._id
 
+    @property
+    def route(self):
+        """
+        :rtype: gtfspy.data_objects.Route
+        """
+
+        return self._route
+
+    @route.setter
+    def route(self, value):
+        """
+        :type value: gtfspy.data_objects.Route
+        """
+
+        # marked before and after the move, so the patterns of both routes are built again
+        self._changed()
+        if self._is_linked():
+            self._route.trips.remove(self)
+            value.trips.append(self)
+        self._route = value
+        self._changed()
+
+    @property
+    def service(self):
+        """
+        :rtype: gtfspy.data_objects.Service
+        """
+
+        return self._service
+
+    @service.setter
+    def service(self, value):
+        """
+        :type value: gtfspy.data_objects.Service
+        """
+
+        self._changed()
+        if self._is_linked():
+            del self._service._trips[self._id]
+            value._trips[self._id] = self
+        self._service = value
+
     @property
     def trip_headsign(self):
         """
@@ -95,6 +140,7 @@ class Trip(object):
 
     @direction_id.setter
     def direction_id(self, value):
+        self._changed()
         self.attributes["direction_id"] = value
 
     @property
@@ -119,6 +165,13 @@ class Trip(object):
 
     @shape.setter
     def shape(self, value):
+        self._changed()
+        if self._is_linked():
+            old_shape = self.shape
+            if old_shape is not None:
+                del old_shape._trips[self._id]
+            if value is not None:
+                value._trips[self._id] = self
         self.attributes["shape_id"] = value
 
     @property
@@ -131,6 +184,7 @@ class Trip(object):
 
     @bikes_allowed.setter
     def bikes_allowed(self, value):
+        self._changed()
         self.attributes["bikes_allowed"] = yes_no_unknown_to_int(value)
 
     @property
@@ -143,8 +197,26 @@ class Trip(object):
 
     @wheelchair_accessible.setter
     def wheelchair_accessible(self, value):
+        self._changed()
         self.attributes["wheelchair_accessible"] = yes_no_unknown_to_int(value)
 
+    def _is_linked(self):
+        """
+        :return: whether the trip is in its collection, so it is in the trips of its route, its service and its shape
+        :rtype: bool
+        """
+
+        return self._service._trips.get(self._id) is self
+
+    def _changed(self):
+        """
+        Marks a trip which is in its collection as changed, so it is validated again and the patterns of its route are
+        built again, must be called by the setters of the fields which are validated or which make up the patterns.
+        """
+
+        if self._is_linked():
+            self._route._transit_data._changed("trips", self)
+
     @property
     def original_trip_id(self):
         """
@@ -159,10 +231,10 @@ class Trip(object):
 
     @property
     def start_time(self):
-        arrival_time_seconds = self.stop_times[0].arrival_time.total_seconds()
-        return time(hour=int(arrival_time_seconds / (60 * 60)),
-                    minute=int(arrival_time_seconds / 60) % 60,
-                    second=int(arrival_time_seconds) % 60)
+        arrival_seconds = self.stop_times[0].arrival_seconds
+        return time(hour=arrival_seconds // (60 * 60),
+                    minute=arrival_seconds // 60 % 60,
+                    second=arrival_seconds % 60)
 
     @property
     def stops(self):
@@ -209,12 +281,11 @@ class Trip(object):
         else:
             stop_time = self.stop_times[0]
 
-        i = from_date
-        day_interval = timedelta(days=1)
-        while i <= to_date:
-            if self.service.is_active_on(i):
-                yield i + stop_time.arrival_time
-            i += day_interval
+        arrival_time = timedelta(seconds=stop_time.arrival_seconds)
+        for active_date in self.service.active_dates(from_date, to_date):
+            if isinstance(from_date, datetime):
+                active_date = datetime.combine(active_date, from_date.time())
+            yield active_date + arrival_time
 
     def get_csv_fields(self):
         return ["trip_id", "route_id", "service_id"] + list(self.attributes.keys())
@@ -269,11 +340,11 @@ class TripCollection(BaseGtfsObjectCollection):
             if condition is not None and not condition(trip):
                 return None
 
-            self._transit_data._changed()
+            self._transit_data._changed("trips", trip)
 
             assert trip.id not in self._objects
             self._objects[trip.id] = trip
-            trip.route.trips.append(trip)
+            self._link(trip)
             return trip
         except:
             if not ignore_errors:
@@ -304,13 +375,15 @@ class TripCollection(BaseGtfsObjectCollection):
         else:
             assert self[trip.id] is trip
 
+        self._transit_data._changed("trips", trip)
+
         if recursive:
             for stop_time in trip.stop_times:
                 stop_time.stop.stop_times.remove(stop_time)
         else:
             assert len(trip.stop_times) == 0
 
-        trip.route.trips.remove(trip)
+        self._unlink(trip)
         del self._objects[trip.id]
 
         if clean_after:
@@ -323,5 +396,29 @@ class TripCollection(BaseGtfsObjectCollection):
                 to_clean.append(trip)
 
         for trip in to_clean:
-            trip.route.trips.remove(trip)
+            self._unlink(trip)
             del self._objects[trip.id]
+
+    @staticmethod
+    def _link(trip):
+        """
+        Registers the trip in the back references of its route, service and shape.
+
+        :type trip: Trip
+        """
+
+        trip.route.trips.append(trip)
+        trip.service._trips[trip.id] = trip
+        if trip.shape is not None:
+            trip.shape._trips[trip.id] = trip
+
+    @staticmethod
+    def _unlink(trip):
+        """
+        :type trip: Trip
+        """
+
+        trip.route.trips.remove(trip)
+        del trip.service._trips[trip.id]
+        if trip.shape is not None:
+            del trip.shape._trips[trip.id]
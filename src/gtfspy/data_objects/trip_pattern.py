@@ -0,0 +1,102 @@
+class TripPattern(object):
+    """
+    The trips of a route which stop in the same stops in the same order, in the same direction.
+
+    The times of every trip are kept as its departure from the first stop and a running time profile (the arrival
+    and departure offsets from that departure in every stop), and the trips which run at the same pace share a
+    single profile. A pattern is an index which is derived from the stop times of its trips (see Route.patterns); the
+    stop times themselves are kept by pattern and profile in a compacted StopTimeTable (see StopTimeTable.compact).
+    """
+
+    def __init__(self, route, direction_id, stops):
+        """
+        :type route: gtfspy.data_objects.Route
+        :type direction_id: int | None
+        :type stops: tuple[gtfspy.data_objects.Stop]
+        """
+
+        self.route = route
+        self.direction_id = direction_id
+        self.stops = stops
+
+        self.trips = []
+        self.start_seconds = []
+        # the running time profiles, each a tuple of the arrival offsets and a tuple of the departure offsets
+        self.profiles = []
+        self._profile_indexes = {}
+        # the index of the profile of each trip
+        self.trip_profiles = []
+
+    @property
+    def first_stop(self):
+        """
+        :rtype: gtfspy.data_objects.Stop
+        """
+
+        return self.stops[0]
+
+    @property
+    def last_stop(self):
+        """
+        :rtype: gtfspy.data_objects.Stop
+        """
+
+        return self.stops[-1]
+
+    def _add_trip(self, trip, stop_times):
+        """
+        :type trip: gtfspy.data_objects.Trip
+        :type stop_times: list[gtfspy.data_objects.StopTime]
+        """
+
+        start_seconds = next((stop_time.departure_seconds for stop_time in stop_times
+                              if stop_time.departure_seconds is not None), 0)
+        profile = (tuple(None if stop_time.arrival_seconds is None else stop_time.arrival_seconds - start_seconds
+                         for stop_time in stop_times),
+                   tuple(None if stop_time.departure_seconds is None else stop_time.departure_seconds - start_seconds
+                         for stop_time in stop_times))
+
+        profile_index = self._profile_indexes.get(profile)
+        if profile_index is None:
+            profile_index = self._profile_indexes[profile] = len(self.profiles)
+            self.profiles.append(profile)
+
+        self.trips.append(trip)
+        self.start_seconds.append(start_seconds)
+        self.trip_profiles.append(profile_index)
+
+    def get_trip_seconds(self, trip_index):
+        """
+        :type trip_index: int
+        :return: the arrival seconds and the departure seconds of the trip in every stop of the pattern
+        :rtype: (list[int | None], list[int | None])
+        """
+
+        start_seconds = self.start_seconds[trip_index]
+        arrival_offsets, departure_offsets = self.profiles[self.trip_profiles[trip_index]]
+        return ([None if offset is None else start_seconds + offset for offset in arrival_offsets],
+                [None if offset is None else start_seconds + offset for offset in departure_offsets])
+
+    def __len__(self):
+        return len(self.trips)
+
+
+def build_trip_patterns(route):
+    """
+    :type route: gtfspy.data_objects.Route
+    :return: the patterns of the trips of the route, the patterns with more trips first
+    :rtype: list[TripPattern]
+    """
+
+    patterns = {}
+    for trip in route.trips:
+        stop_times = list(trip.stop_times)
+        stops = tuple(stop_time.stop for stop_time in stop_times)
+        # the stops are unhashable, so the patterns are keyed by their ids
+        key = (trip.direction_id, tuple(stop.id for stop in stops))
+        pattern = patterns.get(key)
+        if pattern is None:
+            pattern = patterns[key] = TripPattern(route, trip.direction_id, stops)
+        pattern._add_trip(trip, stop_times)
+
+    return sorted(patterns.values(), key=len, reverse=True)
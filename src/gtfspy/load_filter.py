@@ -0,0 +1,132 @@
+import copy
+from datetime import date
+
+
+class LoadFilter(object):
+    """
+    Selects the part of a GTFS file which is loaded by TransitData.load_gtfs_file.
+
+    The agencies, the routes and the services are filtered as objects, since they are few. The trips, the stop times,
+    the stops and the shapes are filtered on their raw csv rows before any object is created: the ids of the kept
+    routes and services select the trips, the trips select their stop times, and the kept stop times select the
+    stops (with their parent stations) and the trips select the shapes which are loaded.
+    """
+
+    def __init__(self, lines=None, route_types=None, bbox=None, from_date=None, to_date=None, trip_ids=None,
+                 stop_ids=None):
+        """
+        :param lines: the line numbers to load by agency id, None instead of a list loads all the lines of the agency
+        :type lines: dict[str, list[str] | None] | None
+        :type route_types: collections.Iterable[int] | None
+        :param bbox: load the trips which stop inside the box (min_lat, min_lon, max_lat, max_lon)
+        :type bbox: (float, float, float, float) | None
+        :param from_date: load the trips whose service is active at least once since this date
+        :type from_date: date | None
+        :param to_date: load the trips whose service is active at least once until this date
+        :type to_date: date | None
+        :type trip_ids: collections.Iterable[str] | None
+        :param stop_ids: load the trips which stop in one of these stops
+        :type stop_ids: collections.Iterable[str] | None
+        """
+
+        self.lines = None if lines is None else {str(agency_id): None if line_numbers is None else
+                                                 {str(line_number) for line_number in line_numbers}
+                                                 for agency_id, line_numbers in lines.items()}
+        self.route_types = None if route_types is None else {int(route_type) for route_type in route_types}
+        self.bbox = None if bbox is None else tuple(float(value) for value in bbox)
+        self.from_date = from_date
+        self.to_date = to_date
+        self.trip_ids = None if trip_ids is None else {str(trip_id) for trip_id in trip_ids}
+        self.stop_ids = None if stop_ids is None else {str(stop_id) for stop_id in stop_ids}
+
+    @classmethod
+    def create(cls, partial=None, service_window=None):
+        """
+        Combines the partial and the service_window arguments of TransitData.load_gtfs_file into a single filter.
+
+        :type partial: dict[str, list[str]] | dict[str, None] | LoadFilter | None
+        :type service_window: (date, date) | None
+        :return: the filter, or None when the whole file is loaded
+        :rtype: LoadFilter | None
+        """
+
+        if partial is None and service_window is None:
+            return None
+
+        load_filter = copy.copy(partial) if isinstance(partial, LoadFilter) else cls(lines=partial)
+        if service_window is not None:
+            assert load_filter.from_date is None and load_filter.to_date is None
+            load_filter.from_date, load_filter.to_date = service_window
+        return load_filter
+
+    @property
+    def filters_stops(self):
+        """
+        Whether the trips are selected by the stops they stop in.
+
+        :rtype: bool
+        """
+
+        return self.bbox is not None or self.stop_ids is not None
+
+    def accept_agency(self, agency):
+        """
+        :type agency: gtfspy.data_objects.Agency
+        :rtype: bool
+        """
+
+        return self.lines is None or agency.id in self.lines
+
+    def accept_route(self, route):
+        """
+        :type route: gtfspy.data_objects.Route
+        :rtype: bool
+        """
+
+        if self.route_types is not None and route.route_type not in self.route_types:
+            return False
+        if self.lines is not None:
+            line_numbers = self.lines.get(route.agency.id)
+            return line_numbers is None or route.line.line_number in line_numbers
+        return True
+
+    def accept_service(self, service):
+        """
+        :type service: gtfspy.data_objects.Service
+        :rtype: bool
+        """
+
+        if self.from_date is None and self.to_date is None:
+            return True
+        return len(service.active_dates(self.from_date or date.min, self.to_date or date.max)) != 0
+
+    def accept_trip_row(self, row, route_ids, service_ids):
+        """
+        :type row: dict
+        :param route_ids: the ids of the loaded routes
+        :type route_ids: set[str]
+        :param service_ids: the ids of the loaded services which are accepted
+        :type service_ids: set[str]
+        :rtype: bool
+        """
+
+        return row["route_id"] in route_ids and row["service_id"] in service_ids and \
+            (self.trip_ids is None or row["trip_id"] in self.trip_ids)
+
+    def accept_stop_row(self, row):
+        """
+        Whether the trips which stop in this stop are loaded, when the trips are selected by their stops.
+
+        :type row: dict
+        :rtype: bool
+        """
+
+        if self.stop_ids is not None and row["stop_id"] not in self.stop_ids:
+            return False
+        if self.bbox is not None:
+            min_lat, min_lon, max_lat, max_lon = self.bbox
+            try:
+                return min_lat <= float(row["stop_lat"]) <= max_lat and min_lon <= float(row["stop_lon"]) <= max_lon
+            except (KeyError, TypeError, ValueError):
+                return False
+        return True
@@ -0,0 +1,289 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# the phases in which the time of loading, saving and validating is reported, in the order they're done
+PHASES = ["decode", "parse", "construct", "link", "clean", "validate", "write"]
+
+
+class PhaseStats(object):
+    """
+    The time, the rows and the allocated memory of a single phase of a single GTFS file.
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.rows = 0
+        # the bytes which were still allocated at the end of the phase, only known when tracemalloc is tracing
+        self.allocated_bytes = None
+
+    @property
+    def rows_per_second(self):
+        """
+        :rtype: float | None
+        """
+
+        return self.rows / self.seconds if self.rows and self.seconds > 0 else None
+
+    def _add(self, seconds, rows, allocated_bytes):
+        self.seconds += seconds
+        self.rows += rows
+        if allocated_bytes is not None:
+            self.allocated_bytes = (self.allocated_bytes or 0) + allocated_bytes
+
+
+class MemberStats(object):
+    """
+    The phases of a single GTFS file (or of the file of a collection, when it's saved or validated).
+    """
+
+    def __init__(self, member_name):
+        """
+        :type member_name: str
+        """
+
+        self.member_name = member_name
+        # the phases by their names, see PHASES
+        self.phases = {}
+
+    @property
+    def seconds(self):
+        """
+        :rtype: float
+        """
+
+        return sum(phase.seconds for phase in self.phases.values())
+
+    @property
+    def rows(self):
+        """
+        :return: the most rows a phase handled, since every phase handles the same rows of the file
+        :rtype: int
+        """
+
+        return max([phase.rows for phase in self.phases.values()] or [0])
+
+    @property
+    def rows_per_second(self):
+        """
+        :rtype: float | None
+        """
+
+        seconds = self.seconds
+        return self.rows / seconds if self.rows and seconds > 0 else None
+
+    @property
+    def allocated_bytes(self):
+        """
+        :rtype: int | None
+        """
+
+        allocated = [phase.allocated_bytes for phase in self.phases.values() if phase.allocated_bytes is not None]
+        return sum(allocated) if allocated else None
+
+    def get_phase(self, phase):
+        """
+        :type phase: str
+        :rtype: PhaseStats
+        """
+
+        assert phase in PHASES
+        if phase not in self.phases:
+            self.phases[phase] = PhaseStats()
+        return self.phases[phase]
+
+
+class LoadStats(object):
+    """
+    Collects the time, the rows and the allocated memory of every phase of every GTFS file when it's passed as the
+    stats argument of TransitData.load_gtfs_file, save, validate and clean. A single instance may collect several
+    operations, their phases are added up.
+
+    The phases are:
+        decode: opening a file and detecting its encoding
+        parse: decoding and tokenizing the csv rows of a file (receiving them from the workers, when loading with
+               workers)
+        construct: creating the objects from the rows and adding them to their collections
+        link: adding the stop times to the sorted stop times of their trips and to their stops (which is a part of
+              their construction, and is reported apart from it)
+        clean: removing the unused objects
+        validate: validating the objects
+        write: formatting and compressing a file when saving
+
+    The allocated bytes are only collected when tracemalloc is tracing (see tracemalloc.start), since tracing slows
+    down the measured code considerably.
+    """
+
+    def __init__(self):
+        # the files by their names, in the order they were first measured
+        self.members = {}
+
+    def get_member(self, member_name):
+        """
+        :type member_name: str
+        :rtype: MemberStats
+        """
+
+        if member_name not in self.members:
+            self.members[member_name] = MemberStats(member_name)
+        return self.members[member_name]
+
+    def add(self, member_name, phase, seconds, rows=0, allocated_bytes=None):
+        """
+        :type member_name: str
+        :type phase: str
+        :type seconds: float
+        :type rows: int
+        :type allocated_bytes: int | None
+        """
+
+        self.get_member(member_name).get_phase(phase)._add(seconds, rows, allocated_bytes)
+
+    def get_phase_totals(self):
+        """
+        :return: the phases summed over all the files, in the order of PHASES
+        :rtype: dict[str, PhaseStats]
+        """
+
+        totals = {}
+        for phase in PHASES:
+            for member in self.members.values():
+                if phase in member.phases:
+                    member_phase = member.phases[phase]
+                    if phase not in totals:
+                        totals[phase] = PhaseStats()
+                    totals[phase]._add(member_phase.seconds, member_phase.rows, member_phase.allocated_bytes)
+        return totals
+
+    @property
+    def seconds(self):
+        """
+        :rtype: float
+        """
+
+        return sum(member.seconds for member in self.members.values())
+
+    @contextmanager
+    def measure(self, member_name, phase, rows=0):
+        """
+        Measures the code in the with block as a phase of a file.
+
+        :type member_name: str
+        :type phase: str
+        :type rows: int
+        """
+
+        start_memory = _traced_memory()
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start_time
+            self.add(member_name, phase, seconds, rows, _allocated_since(start_memory))
+
+    def measure_rows(self, member_name, rows):
+        """
+        Counts the rows of a file as they're consumed, measuring the time spent producing the rows as the parse phase
+        and the time spent by the consumer between them as the construct phase.
+
+        :type member_name: str
+        :type rows: collections.Iterable[dict]
+        :rtype: collections.Iterable[dict]
+        """
+
+        perf_counter = time.perf_counter
+        count = 0
+        parse_seconds = 0.0
+        start_memory = _traced_memory()
+        start_time = perf_counter()
+        iterator = iter(rows)
+        try:
+            while True:
+                row_start_time = perf_counter()
+                row = next(iterator, None)
+                parse_seconds += perf_counter() - row_start_time
+                if row is None:
+                    break
+                count += 1
+                yield row
+        finally:
+            seconds = perf_counter() - start_time
+            self.add(member_name, "parse", parse_seconds, count)
+            self.add(member_name, "construct", seconds - parse_seconds, count, _allocated_since(start_memory))
+
+    def move(self, member_name, from_phase, to_phase, seconds):
+        """
+        Moves time which was measured as a part of a phase into another phase.
+
+        :type member_name: str
+        :type from_phase: str
+        :type to_phase: str
+        :type seconds: float
+        """
+
+        member = self.get_member(member_name)
+        member.get_phase(from_phase).seconds -= seconds
+        member.get_phase(to_phase).seconds += seconds
+
+    def report(self):
+        """
+        :return: a table of the phases of every file, and their totals
+        :rtype: str
+        """
+
+        lines = ["%-24s %-10s %10s %10s %12s %14s" % ("file", "phase", "seconds", "rows", "rows/second",
+                                                     "allocated KiB")]
+        for member_name, member in self.members.items():
+            for phase in PHASES:
+                if phase in member.phases:
+                    lines.append(_format_phase(member_name, phase, member.phases[phase]))
+        for phase, phase_stats in self.get_phase_totals().items():
+            lines.append(_format_phase("total", phase, phase_stats))
+        return "\n".join(lines)
+
+
+def _format_phase(member_name, phase, phase_stats):
+    rows_per_second = phase_stats.rows_per_second
+    return "%-24s %-10s %10.4f %10d %12s %14s" % (
+        member_name, phase, phase_stats.seconds, phase_stats.rows,
+        "-" if rows_per_second is None else "%.0f" % (rows_per_second,),
+        "-" if phase_stats.allocated_bytes is None else "%.1f" % (phase_stats.allocated_bytes / 1024.0,))
+
+
+def _traced_memory():
+    """
+    :rtype: int | None
+    """
+
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+
+
+def _allocated_since(start_memory):
+    """
+    :type start_memory: int | None
+    :rtype: int | None
+    """
+
+    memory = _traced_memory()
+    return None if start_memory is None or memory is None else memory - start_memory
+
+
+class _NoMeasure(object):
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+def measure(stats, member_name, phase, rows=0):
+    """
+    Measures the code in the with block with LoadStats.measure, or does nothing when stats is None.
+
+    :type stats: LoadStats | None
+    :type member_name: str
+    :type phase: str
+    :type rows: int
+    """
+
+    return _NoMeasure() if stats is None else stats.measure(member_name, phase, rows)
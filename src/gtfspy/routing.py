@@ -0,0 +1,424 @@
+"""
+Round-based public transit routing (RAPTOR) over a TransitData object.
+
+A Timetable is built once for a service date from the trips which run on it (and the trips of the previous service day
+which run after midnight), grouping the trips which stop in the same stops into route patterns. Every round of a
+query scans the patterns which stop in the stops improved by the previous round, so the k-th round finds the
+earliest arrivals with k trips (k - 1 transfers).
+"""
+
+from bisect import bisect_left
+from datetime import timedelta
+
+from .utils.geo import haversine_distances
+from .utils.time import parse_time_of_day
+
+# the walking speed used for the footpaths between close stops, in meters per second
+DEFAULT_WALKING_SPEED = 1.3
+
+_DAY_SECONDS = 24 * 3600
+_INFINITY = float("inf")
+
+
+class Leg(object):
+    """
+    A part of a journey, either on a trip or walking between stops.
+    """
+
+    def __init__(self, from_stop, to_stop, departure_seconds, arrival_seconds, trip=None):
+        """
+        :type from_stop: gtfspy.data_objects.Stop
+        :type to_stop: gtfspy.data_objects.Stop
+        :param departure_seconds: seconds since the start of the service day of the query
+        :type departure_seconds: int
+        :type arrival_seconds: int
+        :param trip: the trip of the leg, None for a walk
+        :type trip: gtfspy.data_objects.Trip | None
+        """
+
+        self.from_stop = from_stop
+        self.to_stop = to_stop
+        self.departure_seconds = departure_seconds
+        self.arrival_seconds = arrival_seconds
+        self.trip = trip
+
+    @property
+    def is_walk(self):
+        """
+        :rtype: bool
+        """
+
+        return self.trip is None
+
+    @property
+    def departure_time(self):
+        """
+        :rtype: timedelta
+        """
+
+        return timedelta(seconds=self.departure_seconds)
+
+    @property
+    def arrival_time(self):
+        """
+        :rtype: timedelta
+        """
+
+        return timedelta(seconds=self.arrival_seconds)
+
+    def __repr__(self):
+        return "<Leg %s -> %s (%s)>" % (self.from_stop.id, self.to_stop.id,
+                                        "walk" if self.trip is None else self.trip.id)
+
+
+class Journey(object):
+    def __init__(self, legs):
+        """
+        :type legs: list[Leg]
+        """
+
+        self.legs = legs
+
+    @property
+    def departure_seconds(self):
+        """
+        :return: the departure of the first leg, or None when the journey has no legs
+        :rtype: int | None
+        """
+
+        return self.legs[0].departure_seconds if self.legs else None
+
+    @property
+    def arrival_seconds(self):
+        """
+        :return: the arrival of the last leg, or None when the journey has no legs
+        :rtype: int | None
+        """
+
+        return self.legs[-1].arrival_seconds if self.legs else None
+
+    @property
+    def transfers(self):
+        """
+        :return: the number of times the journey changes trips
+        :rtype: int
+        """
+
+        return max(len([leg for leg in self.legs if not leg.is_walk]) - 1, 0)
+
+    def __repr__(self):
+        return "<Journey %r>" % (self.legs,)
+
+
+class _Pattern(object):
+    """
+    Trips which stop in the same stops, with the same pickup and drop off types, and never overtake each other.
+    """
+
+    __slots__ = ("stops", "can_board", "can_alight", "trips", "arrivals", "departures")
+
+    def __init__(self, stops, can_board, can_alight):
+        """
+        :param stops: the indexes of the stops of the trips
+        :type stops: list[int]
+        :type can_board: list[bool]
+        :type can_alight: list[bool]
+        """
+
+        self.stops = stops
+        self.can_board = can_board
+        self.can_alight = can_alight
+        self.trips = []
+        # the arrival and departure seconds of each trip in each stop
+        self.arrivals = []
+        self.departures = []
+
+    def can_follow(self, arrivals, departures):
+        if not self.trips:
+            return True
+        last_arrivals, last_departures = self.arrivals[-1], self.departures[-1]
+        return all(arrival >= last_arrival for arrival, last_arrival in zip(arrivals, last_arrivals)) and \
+            all(departure >= last_departure for departure, last_departure in zip(departures, last_departures))
+
+
+class Timetable(object):
+    """
+    The route patterns and the footpaths of a TransitData object on a single service date.
+    """
+
+    def __init__(self, transit_data, service_date, footpath_radius=0, walking_speed=DEFAULT_WALKING_SPEED):
+        """
+        :type transit_data: gtfspy.transit_data_object.TransitData
+        :type service_date: datetime.date
+        :param footpath_radius: the maximal distance (in meters) between stops which may be walked between; walks
+                                aren't chained, so a journey never walks twice in a row
+        :type footpath_radius: float
+        :param walking_speed: in meters per second
+        :type walking_speed: float
+        """
+
+        self.service_date = service_date
+
+        self.stops = list(transit_data.stops)
+        self._stop_indexes = {stop.id: i for i, stop in enumerate(self.stops)}
+
+        self.patterns = self._build_patterns(transit_data, service_date)
+        # the patterns which stop in each stop, and the position of the stop in them
+        self.stop_patterns = [[] for _ in self.stops]
+        for pattern_index, pattern in enumerate(self.patterns):
+            for position, stop_index in enumerate(pattern.stops):
+                self.stop_patterns[stop_index].append((pattern_index, position))
+
+        self.footpaths = self._build_footpaths(transit_data, footpath_radius, walking_speed)
+
+    def _build_patterns(self, transit_data, service_date):
+        previous_date = service_date - timedelta(days=1)
+        services = {}
+        trips = []
+        for trip in transit_data.trips:
+            service = trip.service
+            for day_offset, day in ((0, service_date), (-_DAY_SECONDS, previous_date)):
+                key = (service.id, day)
+                if key not in services:
+                    services[key] = service.is_active_on(day)
+                if services[key]:
+                    trips.append((trip, day_offset))
+
+        patterns_by_key = {}
+        for trip, day_offset in trips:
+            stop_times = list(trip.stop_times)
+            # the trips without explicit times in all their stops are not routed
+            if len(stop_times) < 2 or any(stop_time.arrival_seconds is None or stop_time.departure_seconds is None
+                                          for stop_time in stop_times):
+                continue
+            # the trips of the previous day are only useful when they run after midnight
+            if day_offset != 0 and stop_times[-1].arrival_seconds < _DAY_SECONDS:
+                continue
+
+            key = tuple((stop_time.stop.id, stop_time.pickup_type != 1, stop_time.drop_off_type != 1)
+                        for stop_time in stop_times)
+            patterns_by_key.setdefault(key, []).append(
+                (stop_times[0].departure_seconds + day_offset, trip,
+                 [stop_time.arrival_seconds + day_offset for stop_time in stop_times],
+                 [stop_time.departure_seconds + day_offset for stop_time in stop_times]))
+
+        patterns = []
+        for key, pattern_trips in patterns_by_key.items():
+            stops = [self._stop_indexes[stop_id] for stop_id, _, _ in key]
+            can_board = [can_board for _, can_board, _ in key]
+            can_alight = [can_alight for _, _, can_alight in key]
+
+            # the trips are split between patterns so no trip overtakes a previous trip of its pattern
+            key_patterns = []
+            for _, trip, arrivals, departures in sorted(pattern_trips, key=lambda item: item[0]):
+                pattern = next((pattern for pattern in key_patterns if pattern.can_follow(arrivals, departures)), None)
+                if pattern is None:
+                    pattern = _Pattern(stops, can_board, can_alight)
+                    key_patterns.append(pattern)
+                pattern.trips.append(trip)
+                pattern.arrivals.append(arrivals)
+                pattern.departures.append(departures)
+            patterns.extend(key_patterns)
+
+        # the departures of every stop of a pattern are kept as columns, for the binary search of the boarded trip
+        for pattern in patterns:
+            pattern.departures = [[departures[position] for departures in pattern.departures]
+                                  for position in range(len(pattern.stops))]
+            pattern.arrivals = [[arrivals[position] for arrivals in pattern.arrivals]
+                                for position in range(len(pattern.stops))]
+        return patterns
+
+    def _build_footpaths(self, transit_data, footpath_radius, walking_speed):
+        footpaths = [[] for _ in self.stops]
+
+        # the stops of a station are connected to each other and to the station, since walks aren't chained
+        stations = {}
+        for stop_index, stop in enumerate(self.stops):
+            if stop.parent_station is not None and stop.parent_station.id in self._stop_indexes:
+                parent_index = self._stop_indexes[stop.parent_station.id]
+                stations.setdefault(parent_index, [parent_index]).append(stop_index)
+        for station_stops in stations.values():
+            for stop_index in station_stops:
+                footpaths[stop_index].extend((other_index, 0) for other_index in station_stops)
+
+        if footpath_radius > 0:
+            for stop_index, stop in enumerate(self.stops):
+                close_stops = transit_data.stops.within_radius(stop.stop_lat, stop.stop_lon, footpath_radius)
+                close_points = [(close_stop.stop_lat, close_stop.stop_lon) for close_stop in close_stops]
+                distances = haversine_distances(stop.stop_lat, stop.stop_lon, close_points)
+                for close_stop, distance in zip(close_stops, distances):
+                    if close_stop is not stop:
+                        footpaths[stop_index].append((self._stop_indexes[close_stop.id],
+                                                      int(round(distance / walking_speed))))
+
+        # only the fastest footpath between every two stops is kept
+        for stop_index, stop_footpaths in enumerate(footpaths):
+            durations = {}
+            for target_index, duration in stop_footpaths:
+                if target_index != stop_index and duration < durations.get(target_index, _INFINITY):
+                    durations[target_index] = duration
+            footpaths[stop_index] = sorted(durations.items())
+        return footpaths
+
+    def _stop_index(self, stop):
+        return self._stop_indexes[stop if isinstance(stop, str) else stop.id]
+
+    def earliest_arrival(self, from_stop, to_stop, departure_time, max_transfers=5):
+        """
+        Finds the journey which arrives first, and with the fewest transfers among those.
+
+        :param from_stop: the stop or its id
+        :type from_stop: gtfspy.data_objects.Stop | str
+        :param to_stop: the stop or its id
+        :type to_stop: gtfspy.data_objects.Stop | str
+        :param departure_time: the time of the service day from which the journey may start
+        :type departure_time: str | timedelta | datetime.time | int
+        :type max_transfers: int
+        :return: the journey, a journey without legs when the stops are the same, or None when the stop can't be reached
+        :rtype: Journey | None
+        """
+
+        source = self._stop_index(from_stop)
+        target = self._stop_index(to_stop)
+        if source == target:
+            return Journey([])
+        labels = self._run(source, parse_time_of_day(departure_time), max_transfers, target)
+
+        best_round = None
+        for round_index, (arrivals, _) in enumerate(labels):
+            if target in arrivals and (best_round is None or arrivals[target] < labels[best_round][0][target]):
+                best_round = round_index
+        if best_round is None:
+            return None
+        return Journey(self._journey_legs(labels, best_round, target))
+
+    def arrival_times(self, from_stop, departure_time, max_transfers=5):
+        """
+        :param from_stop: the stop or its id
+        :type from_stop: gtfspy.data_objects.Stop | str
+        :type departure_time: str | timedelta | datetime.time | int
+        :type max_transfers: int
+        :return: the earliest arrival (in seconds since the start of the service day) by the reachable stop ids
+        :rtype: dict[str, int]
+        """
+
+        labels = self._run(self._stop_index(from_stop), parse_time_of_day(departure_time), max_transfers)
+        best_arrivals = {}
+        for arrivals, _ in labels:
+            for stop_index, arrival in arrivals.items():
+                if arrival < best_arrivals.get(stop_index, _INFINITY):
+                    best_arrivals[stop_index] = arrival
+        return {self.stops[stop_index].id: arrival for stop_index, arrival in best_arrivals.items()}
+
+    def _run(self, source, departure_seconds, max_transfers, target=None):
+        """
+        :return: for each round, the arrivals by stop index of the stops it improved and how they were reached: a
+                 (pattern index, trip index, boarding position, alighting position) tuple for a ride, or a (stop index,
+                 arrival, parent) tuple of the stop it was walked from
+        :rtype: list[(dict[int, int], dict[int, tuple | int])]
+        """
+
+        best_arrivals = {source: departure_seconds}
+        arrivals = {source: departure_seconds}
+        parents = {source: None}
+        marked = self._relax_footpaths(arrivals, parents, best_arrivals, {source}, target)
+        labels = [(arrivals, parents)]
+        # the earliest arrivals with the trips of the previous rounds
+        previous_arrivals = dict(arrivals)
+
+        for _ in range(max_transfers + 1):
+
+            # the earliest position of each pattern which stops in a marked stop
+            queue = {}
+            for stop_index in marked:
+                for pattern_index, position in self.stop_patterns[stop_index]:
+                    if position < queue.get(pattern_index, _INFINITY):
+                        queue[pattern_index] = position
+
+            arrivals = {}
+            parents = {}
+            marked = set()
+            target_arrival = best_arrivals.get(target, _INFINITY)
+            for pattern_index, first_position in queue.items():
+                pattern = self.patterns[pattern_index]
+                trip_index = None
+                boarding_position = None
+                for position in range(first_position, len(pattern.stops)):
+                    stop_index = pattern.stops[position]
+
+                    if trip_index is not None and pattern.can_alight[position]:
+                        arrival = pattern.arrivals[position][trip_index]
+                        if arrival < min(best_arrivals.get(stop_index, _INFINITY), target_arrival):
+                            arrivals[stop_index] = best_arrivals[stop_index] = arrival
+                            parents[stop_index] = (pattern_index, trip_index, boarding_position, position)
+                            marked.add(stop_index)
+                            if stop_index == target:
+                                target_arrival = arrival
+
+                    previous_arrival = previous_arrivals.get(stop_index)
+                    if previous_arrival is not None and pattern.can_board[position] and \
+                            (trip_index is None or previous_arrival <= pattern.departures[position][trip_index]):
+                        departures = pattern.departures[position]
+                        earlier_trip_index = bisect_left(departures, previous_arrival,
+                                                         0, len(departures) if trip_index is None else trip_index + 1)
+                        if earlier_trip_index < len(departures) and \
+                                (trip_index is None or earlier_trip_index < trip_index):
+                            trip_index = earlier_trip_index
+                            boarding_position = position
+
+            marked = self._relax_footpaths(arrivals, parents, best_arrivals, marked, target)
+            labels.append((arrivals, parents))
+            previous_arrivals.update(arrivals)
+            if not marked:
+                break
+
+        return labels
+
+    def _relax_footpaths(self, arrivals, parents, best_arrivals, marked, target):
+        """
+        Walks from the stops which were reached by the round (without chaining walks).
+
+        :return: the marked stops and the stops which were improved by walking from them
+        :rtype: set[int]
+        """
+
+        # the stops may be improved by walks while walking from them, so their labels are kept first
+        reached = [(stop_index, arrivals[stop_index], parents[stop_index]) for stop_index in marked]
+        improved = set(marked)
+        for stop_index, arrival, parent in reached:
+            for target_index, duration in self.footpaths[stop_index]:
+                walk_arrival = arrival + duration
+                if walk_arrival < min(best_arrivals.get(target_index, _INFINITY),
+                                      best_arrivals.get(target, _INFINITY)):
+                    arrivals[target_index] = best_arrivals[target_index] = walk_arrival
+                    parents[target_index] = (stop_index, arrival, parent)
+                    improved.add(target_index)
+        return improved
+
+    def _journey_legs(self, labels, round_index, stop_index):
+        legs = []
+        parent = labels[round_index][1][stop_index]
+        arrival = labels[round_index][0][stop_index]
+        while parent is not None:
+            if len(parent) == 3:
+                # a walk, from the stop as it was reached in the same round
+                from_stop_index, from_arrival, parent = parent
+                legs.append(Leg(self.stops[from_stop_index], self.stops[stop_index], from_arrival, arrival))
+                stop_index, arrival = from_stop_index, from_arrival
+            else:
+                pattern_index, trip_index, boarding_position, alighting_position = parent
+                pattern = self.patterns[pattern_index]
+                boarding_stop_index = pattern.stops[boarding_position]
+                legs.append(Leg(self.stops[boarding_stop_index], self.stops[stop_index],
+                                pattern.departures[boarding_position][trip_index],
+                                pattern.arrivals[alighting_position][trip_index], pattern.trips[trip_index]))
+                stop_index = boarding_stop_index
+                # the boarding stop was last improved by the previous round, or by an earlier one
+                round_index -= 1
+                while stop_index not in labels[round_index][1]:
+                    round_index -= 1
+                parent = labels[round_index][1][stop_index]
+                arrival = labels[round_index][0][stop_index]
+
+        legs.reverse()
+        return legs
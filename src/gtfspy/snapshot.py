@@ -0,0 +1,680 @@
+"""
+A versioned binary snapshot of a TransitData object, which can be loaded much faster than the original GTFS file.
+
+The snapshot starts with a fixed preamble (magic, version and the header length), followed by a JSON header and by
+raw array sections, each aligned to 8 bytes. All the strings of the feed are kept in a single string table, and the
+collections are tables of string indexes. The stop times and the shape points, which are the bulk of every feed, are
+kept as typed columns, so they are loaded with a single copy, or used directly from a memory mapped file.
+"""
+
+import hashlib
+import io
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from operator import attrgetter
+from zipfile import ZipFile
+
+from sortedcontainers import SortedList
+
+from .data_objects import Shape, ShapePoint, StopTime, UnknownFile
+from .data_objects.stop_time_table import MISSING_VALUE
+
+SNAPSHOT_MAGIC = b"GTFSPYSS"
+SNAPSHOT_VERSION = 1
+
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGNMENT = 8
+
+# the collections which are kept as tables of strings, in the order they must be loaded; the shapes are loaded
+# before the trips, and the stop times after the stops
+_TABLES_BEFORE_SHAPES = ["agencies", "routes", "calendar", "calendar_dates"]
+_TABLES_AFTER_SHAPES = ["trips", "stops"]
+_FARE_TABLES = ["fare_attributes", "fare_rules"]
+
+
+class SnapshotError(ValueError):
+    """
+    Raised when a snapshot can't be used: it's corrupted, of another version or taken from another GTFS file.
+    """
+
+    pass
+
+
+def gtfs_checksum(gtfs_file):
+    """
+    A checksum of a GTFS zip file, calculated from the names, the CRCs and the sizes of its members, so it doesn't
+    require decompressing the file.
+
+    :type gtfs_file: str | file | ZipFile
+    :rtype: str
+    """
+
+    if not isinstance(gtfs_file, ZipFile):
+        with ZipFile(gtfs_file) as zip_file:
+            return gtfs_checksum(zip_file)
+
+    checksum = hashlib.sha1()
+    for info in sorted(gtfs_file.infolist(), key=lambda info: info.filename):
+        checksum.update(("%s:%08x:%d\n" % (info.filename, info.CRC, info.file_size)).encode("utf-8"))
+    return checksum.hexdigest()
+
+
+class _StringTable(object):
+    def __init__(self):
+        self.strings = []
+        self._indexes = {}
+
+    def index(self, value):
+        """
+        :rtype: int
+        """
+
+        if value is None:
+            return MISSING_VALUE
+
+        value = str(value)
+        index = self._indexes.get(value)
+        if index is None:
+            assert "\0" not in value
+            index = len(self.strings)
+            self.strings.append(value)
+            self._indexes[value] = index
+        return index
+
+    def to_bytes(self):
+        return "\0".join(self.strings).encode("utf-8")
+
+
+class _SnapshotWriter(object):
+    def __init__(self):
+        self.strings = _StringTable()
+        self.sections = []
+
+    def add_section(self, name, values):
+        """
+        :type name: str
+        :type values: array | bytes
+        """
+
+        self.sections.append((name, values))
+
+    def add_table(self, name, rows):
+        """
+        Adds a table of the csv lines of a collection.
+
+        :type name: str
+        :type rows: list[dict]
+        :return: the fields of the table
+        :rtype: list[str]
+        """
+
+        fields = []
+        known_fields = set()
+        for row in rows:
+            for field in row:
+                if field not in known_fields:
+                    known_fields.add(field)
+                    fields.append(field)
+
+        values = array('i')
+        for row in rows:
+            values.extend(self.strings.index(row.get(field)) for field in fields)
+        self.add_section(name, values)
+        return fields
+
+    def write(self, file_path, header):
+        sections = [("strings", self.strings.to_bytes())] + self.sections
+
+        header["strings_count"] = len(self.strings.strings)
+        header["sections"] = {}
+        offset = 0
+        for name, values in sections:
+            typecode = values.typecode if isinstance(values, array) else "B"
+            length = len(values)
+            header["sections"][name] = [typecode, offset, length]
+            offset += _aligned(length * (values.itemsize if isinstance(values, array) else 1))
+
+        header_data = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        header_data += b" " * (_aligned(_PREAMBLE.size + len(header_data)) - _PREAMBLE.size - len(header_data))
+
+        with open(file_path, "wb") as f:
+            f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(header_data)))
+            f.write(header_data)
+            for name, values in sections:
+                data = values.tobytes() if isinstance(values, array) else values
+                f.write(data)
+                f.write(b"\0" * (_aligned(len(data)) - len(data)))
+
+
+def _aligned(size):
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _ordered_stops(stops):
+    """
+    Orders the stops so every parent station comes before its children.
+
+    :type stops: gtfspy.data_objects.StopCollection
+    :rtype: list[gtfspy.data_objects.Stop]
+    """
+
+    result = []
+    added = set()
+
+    def add(stop):
+        if stop.id not in added:
+            if stop.parent_station is not None:
+                add(stop.parent_station)
+            added.add(stop.id)
+            result.append(stop)
+
+    for stop in stops:
+        add(stop)
+    return result
+
+
+def save_snapshot(transit_data, file_path, checksum=None):
+    """
+    :type transit_data: gtfspy.TransitData
+    :type file_path: str
+    :param checksum: the checksum of the GTFS file the data was loaded from, see gtfs_checksum
+    :type checksum: str | None
+    """
+
+    writer = _SnapshotWriter()
+    header = {"version": SNAPSHOT_VERSION, "checksum": checksum, "byteorder": sys.byteorder, "tables": {}}
+
+    trips = list(transit_data.trips)
+    stops = _ordered_stops(transit_data.stops)
+    collection_rows = {
+        "agencies": [agency.to_csv_line() for agency in transit_data.agencies],
+        "routes": [route.to_csv_line() for route in transit_data.routes],
+        "calendar": [service.to_csv_line() for service in transit_data.calendar],
+        "calendar_dates": [service_date.to_csv_line() for service in transit_data.calendar
+                           for service_date in service.special_dates],
+        "trips": [trip.to_csv_line() for trip in trips],
+        "stops": [stop.to_csv_line() for stop in stops],
+        "fare_attributes": [fare_attribute.to_csv_line() for fare_attribute in transit_data.fare_attributes]
+        if transit_data.fare_rules.has_data() else [],
+        "fare_rules": [fare_rule.to_csv_line() for fare_rule in transit_data.fare_rules],
+    }
+    for name in _TABLES_BEFORE_SHAPES + _TABLES_AFTER_SHAPES + _FARE_TABLES:
+        header["tables"][name] = writer.add_table(name, collection_rows[name])
+
+    _write_shapes(writer, header, transit_data)
+    _write_stop_times(writer, header, trips, stops)
+
+    translations = array('i')
+    for language, words in transit_data.translator._words.items():
+        for expression, translation in words.items():
+            translations.extend((writer.strings.index(language), writer.strings.index(expression),
+                                 writer.strings.index(translation)))
+    writer.add_section("translations", translations)
+    header["unknown_files"] = []
+    for file_name, unknown_file in transit_data.unknown_files.items():
+        header["unknown_files"].append(file_name)
+        writer.add_section("unknown_file:%s" % (file_name,), bytes(unknown_file.data))
+
+    writer.write(file_path, header)
+
+
+def _write_shapes(writer, header, transit_data):
+    shape_ids = array('i')
+    offsets = array('q', [0])
+    latitudes = array('d')
+    longitudes = array('d')
+    sequences = array('i')
+    distances = array('d')
+    extras = {}
+
+    for shape in transit_data.shapes:
+        shape_ids.append(writer.strings.index(shape.id))
+        for shape_point in shape.shape_points:
+            if shape_point._attributes:
+                extras[len(sequences)] = shape_point._attributes
+            latitudes.append(shape_point.latitude)
+            longitudes.append(shape_point.longitude)
+            sequences.append(shape_point.sequence)
+            shape_dist_traveled = shape_point.shape_dist_traveled
+            distances.append(math.nan if shape_dist_traveled is None else shape_dist_traveled)
+        offsets.append(len(sequences))
+
+    writer.add_section("shape_ids", shape_ids)
+    writer.add_section("shape_offsets", offsets)
+    writer.add_section("shape_pt_lat", latitudes)
+    writer.add_section("shape_pt_lon", longitudes)
+    writer.add_section("shape_pt_sequence", sequences)
+    writer.add_section("shape_dist_traveled", distances)
+    header["shape_extras"] = extras
+
+
+def _write_stop_times(writer, header, trips, stops):
+    stop_indexes = {stop.id: i for i, stop in enumerate(stops)}
+    headsigns = _StringTable()
+
+    trip_index = array('i')
+    stop_index = array('i')
+    arrival_time = array('i')
+    departure_time = array('i')
+    stop_sequence = array('i')
+    pickup_type = array('b')
+    drop_off_type = array('b')
+    timepoint = array('b')
+    shape_dist_traveled = array('d')
+    stop_headsign = array('i')
+    extras = {}
+
+    for i, trip in enumerate(trips):
+        for stop_time in trip.stop_times:
+            if stop_time._attributes:
+                extras[len(trip_index)] = stop_time._attributes
+            trip_index.append(i)
+            stop_index.append(stop_indexes[stop_time.stop.id])
+            arrival_seconds = stop_time.arrival_seconds
+            arrival_time.append(MISSING_VALUE if arrival_seconds is None else arrival_seconds)
+            departure_seconds = stop_time.departure_seconds
+            departure_time.append(MISSING_VALUE if departure_seconds is None else departure_seconds)
+            stop_sequence.append(stop_time.stop_sequence)
+            pickup_type.append(MISSING_VALUE if stop_time._pickup_type is None else stop_time._pickup_type)
+            drop_off_type.append(MISSING_VALUE if stop_time._drop_off_type is None else stop_time._drop_off_type)
+            timepoint.append(MISSING_VALUE if stop_time._timepoint is None else stop_time._timepoint)
+            distance = stop_time._shape_dist_traveled
+            shape_dist_traveled.append(math.nan if distance is None else distance)
+            stop_headsign.append(headsigns.index(stop_time._stop_headsign))
+
+    writer.add_section("trip_index", trip_index)
+    writer.add_section("stop_index", stop_index)
+    writer.add_section("arrival_time", arrival_time)
+    writer.add_section("departure_time", departure_time)
+    writer.add_section("stop_sequence", stop_sequence)
+    writer.add_section("pickup_type", pickup_type)
+    writer.add_section("drop_off_type", drop_off_type)
+    writer.add_section("timepoint", timepoint)
+    writer.add_section("stop_time_shape_dist_traveled", shape_dist_traveled)
+    writer.add_section("stop_headsign", stop_headsign)
+
+    # the CSR index of the table; the rows are already written grouped by trip and ordered by stop sequence
+    trip_offsets = array('i', [0])
+    for trip in trips:
+        trip_offsets.append(trip_offsets[-1] + len(trip.stop_times))
+    stop_offsets = array('i', [0]) * (len(stops) + 1)
+    for index in stop_index:
+        stop_offsets[index + 1] += 1
+    for i in range(len(stops)):
+        stop_offsets[i + 1] += stop_offsets[i]
+    positions = array('i', stop_offsets)
+    stop_rows = array('i', [0]) * len(stop_index)
+    for row, index in enumerate(stop_index):
+        stop_rows[positions[index]] = row
+        positions[index] += 1
+
+    writer.add_section("trip_offsets", trip_offsets)
+    writer.add_section("trip_rows", array('i', range(len(trip_index))))
+    writer.add_section("stop_offsets", stop_offsets)
+    writer.add_section("stop_rows", stop_rows)
+    header["headsigns"] = headsigns.strings
+    header["stop_time_extras"] = extras
+
+
+class SnapshotReader(object):
+    """
+    Parses the header of a snapshot and gives access to its sections over any buffer (bytes or mmap).
+    """
+
+    def __init__(self, buffer):
+        """
+        :type buffer: bytes | mmap.mmap
+        """
+
+        if len(buffer) < _PREAMBLE.size:
+            raise SnapshotError("the snapshot is truncated")
+        magic, version, header_length = _PREAMBLE.unpack_from(buffer, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError("not a gtfspy snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError("unsupported snapshot version %d" % (version,))
+
+        try:
+            self.header = json.loads(bytes(buffer[_PREAMBLE.size:_PREAMBLE.size + header_length]).decode("utf-8"))
+        except ValueError:
+            raise SnapshotError("the snapshot header is corrupted")
+
+        self._buffer = buffer
+        self._data_offset = _PREAMBLE.size + header_length
+        self._swap = self.header["byteorder"] != sys.byteorder
+
+        end = max([self._data_offset + offset + length * array(typecode).itemsize
+                   for typecode, offset, length in self.header["sections"].values()] + [0])
+        if len(buffer) < end:
+            raise SnapshotError("the snapshot is truncated")
+
+    @property
+    def checksum(self):
+        return self.header["checksum"]
+
+    def view(self, name):
+        """
+        A zero copy view of a section, which is only available when the snapshot has the native byte order.
+
+        :type name: str
+        :rtype: memoryview
+        """
+
+        assert not self._swap
+        typecode, offset, length = self.header["sections"][name]
+        start = self._data_offset + offset
+        end = start + length * array(typecode).itemsize
+        return memoryview(self._buffer)[start:end].cast(typecode)
+
+    def column(self, name):
+        """
+        A zero copy view of a section when the snapshot has the native byte order, otherwise a copy of it.
+
+        :type name: str
+        :rtype: memoryview | array
+        """
+
+        return self.array(name) if self._swap else self.view(name)
+
+    def has_section(self, name):
+        """
+        :type name: str
+        :rtype: bool
+        """
+
+        return name in self.header["sections"]
+
+    def array(self, name):
+        """
+        :type name: str
+        :rtype: array
+        """
+
+        typecode, offset, length = self.header["sections"][name]
+        start = self._data_offset + offset
+        result = array(typecode)
+        result.frombytes(self._buffer[start:start + length * result.itemsize])
+        if self._swap:
+            result.byteswap()
+        return result
+
+    def strings(self):
+        """
+        :rtype: list[str]
+        """
+
+        if self.header["strings_count"] == 0:
+            return []
+        return self.array("strings").tobytes().decode("utf-8").split("\0")
+
+    def rows(self, name, strings):
+        """
+        The rows of a collection table as csv line dicts.
+
+        :type name: str
+        :type strings: list[str]
+        :rtype: collections.Iterable[dict]
+        """
+
+        fields = self.header["tables"][name]
+        if not fields:
+            return
+
+        values = self.array(name)
+        fields_count = len(fields)
+        for start in range(0, len(values), fields_count):
+            yield {field: strings[value] for field, value in zip(fields, values[start:start + fields_count])
+                   if value != MISSING_VALUE}
+
+
+def read_snapshot(file_path):
+    """
+    :type file_path: str
+    :rtype: SnapshotReader
+    """
+
+    with open(file_path, "rb") as f:
+        return SnapshotReader(f.read())
+
+
+def map_snapshot(file_path):
+    """
+    Memory maps a snapshot file, so the views of its sections are shared with any other process which maps it.
+
+    :type file_path: str
+    :rtype: SnapshotReader
+    """
+
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise SnapshotError("the snapshot is truncated")
+        return SnapshotReader(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def load_snapshot(transit_data, reader, load_stop_times=True, mapped=False):
+    """
+    Fills an empty TransitData object from a snapshot.
+
+    :type transit_data: gtfspy.TransitData
+    :type reader: SnapshotReader
+    :param load_stop_times: whether to load the stop times and the shape points into the transit data
+    :type load_stop_times: bool
+    :param mapped: use the sections of the reader's buffer as the stop times columns and create the shape points
+                   from it on first access, instead of copying them; requires a StopTimeTable
+    :type mapped: bool
+    """
+
+    assert not mapped or transit_data.stop_time_table is not None
+
+    strings = reader.strings()
+
+    for name in _TABLES_BEFORE_SHAPES:
+        getattr(transit_data, name)._load_rows(reader.rows(name, strings))
+    if mapped:
+        _map_shapes(transit_data, reader, strings)
+    else:
+        _load_shapes(transit_data, reader, strings)
+    for name in _TABLES_AFTER_SHAPES:
+        getattr(transit_data, name)._load_rows(reader.rows(name, strings))
+
+    if load_stop_times:
+        if transit_data.stop_time_table is not None:
+            _load_stop_time_table(transit_data.stop_time_table, transit_data, reader,
+                                  reader.column if mapped else reader.array)
+        else:
+            _load_stop_times(transit_data, reader)
+
+    translations = reader.array("translations")
+    for i in range(0, len(translations), 3):
+        transit_data.translator.add_translate(strings[translations[i]], strings[translations[i + 1]],
+                                              strings[translations[i + 2]])
+
+    for name in _FARE_TABLES:
+        getattr(transit_data, name)._load_rows(reader.rows(name, strings))
+
+    for file_name in reader.header["unknown_files"]:
+        data = reader.array("unknown_file:%s" % (file_name,)).tobytes()
+        transit_data.unknown_files[file_name] = UnknownFile(io.BytesIO(data))
+
+    transit_data.source_checksum = reader.checksum
+
+
+def _load_shapes(transit_data, reader, strings):
+    shape_ids = reader.array("shape_ids")
+    offsets = reader.array("shape_offsets")
+    latitudes = reader.array("shape_pt_lat")
+    longitudes = reader.array("shape_pt_lon")
+    sequences = reader.array("shape_pt_sequence")
+    distances = reader.array("shape_dist_traveled")
+    extras = reader.header["shape_extras"]
+
+    if len(shape_ids) > 0:
+        transit_data._changed()
+
+    shape_points = [ShapePoint(latitude, longitude, sequence, None if math.isnan(distance) else distance)
+                    for latitude, longitude, sequence, distance in zip(latitudes, longitudes, sequences, distances)]
+    for point, attributes in extras.items():
+        shape_points[int(point)].attributes.update(attributes)
+
+    for i, shape_id in enumerate(shape_ids):
+        shape = Shape(strings[shape_id])
+        shape.shape_points.update(shape_points[offsets[i]:offsets[i + 1]])
+        transit_data.shapes._objects[shape.id] = shape
+
+
+class _MappedShapePoints(object):
+    """
+    The shape points columns of a snapshot, shared by all the shapes which are mapped from it.
+    """
+
+    def __init__(self, reader):
+        """
+        :type reader: SnapshotReader
+        """
+
+        self.latitudes = reader.column("shape_pt_lat")
+        self.longitudes = reader.column("shape_pt_lon")
+        self.sequences = reader.column("shape_pt_sequence")
+        self.distances = reader.column("shape_dist_traveled")
+        self.extras = reader.header["shape_extras"]
+
+    def create(self, point):
+        """
+        :type point: int
+        :rtype: ShapePoint
+        """
+
+        distance = self.distances[point]
+        shape_point = ShapePoint(self.latitudes[point], self.longitudes[point], self.sequences[point],
+                                 None if math.isnan(distance) else distance)
+        attributes = self.extras.get(str(point))
+        if attributes:
+            shape_point.attributes.update(attributes)
+        return shape_point
+
+
+class _MappedShape(Shape):
+    """
+    A shape whose points are created from the mapped columns of a snapshot on first access.
+    """
+
+    def __init__(self, shape_id, columns, start, end):
+        """
+        :type shape_id: str
+        :type columns: _MappedShapePoints
+        :type start: int
+        :type end: int
+        """
+
+        Shape.__init__(self, shape_id)
+        self._columns = columns
+        self._start = start
+        self._end = end
+        self._shape_points = None
+
+    @property
+    def shape_points(self):
+        """
+        :rtype: SortedList
+        """
+
+        if self._shape_points is None:
+            shape_points = SortedList(key=attrgetter("sequence"))
+            shape_points.update(self._columns.create(point) for point in range(self._start, self._end))
+            self._shape_points = shape_points
+        return self._shape_points
+
+    @shape_points.setter
+    def shape_points(self, value):
+        self._shape_points = value
+
+
+def _map_shapes(transit_data, reader, strings):
+    shape_ids = reader.array("shape_ids")
+    offsets = reader.array("shape_offsets")
+    columns = _MappedShapePoints(reader)
+
+    if len(shape_ids) > 0:
+        transit_data._changed()
+
+    for i, shape_id in enumerate(shape_ids):
+        shape = _MappedShape(strings[shape_id], columns, offsets[i], offsets[i + 1])
+        transit_data.shapes._objects[shape.id] = shape
+
+
+def _load_stop_time_table(table, transit_data, reader, column):
+    """
+    :type table: gtfspy.data_objects.StopTimeTable
+    :param column: the function which returns a section of the reader as a column of the table
+    :type column: callable
+    """
+
+    trips = list(transit_data.trips)
+    stops = list(transit_data.stops)
+
+    table.trips = trips
+    table._trip_indexes = {trip.id: i for i, trip in enumerate(trips)}
+    table.stops = stops
+    table._stop_indexes = {stop.id: i for i, stop in enumerate(stops)}
+    table.headsigns = list(reader.header["headsigns"])
+    table._headsign_indexes = {headsign: i for i, headsign in enumerate(table.headsigns)}
+
+    table.trip_index = column("trip_index")
+    table.stop_index = column("stop_index")
+    table.arrival_time = column("arrival_time")
+    table.departure_time = column("departure_time")
+    table.stop_sequence = column("stop_sequence")
+    table.pickup_type = column("pickup_type")
+    table.drop_off_type = column("drop_off_type")
+    table.timepoint = column("timepoint")
+    table.shape_dist_traveled = column("stop_time_shape_dist_traveled")
+    table.stop_headsign = column("stop_headsign")
+    table.extra_attributes = {int(row): dict(attributes)
+                              for row, attributes in reader.header["stop_time_extras"].items()}
+    table.links = bytearray(b"\3" * len(table.trip_index))
+
+    if reader.has_section("trip_offsets"):
+        table._trip_offsets = column("trip_offsets")
+        table._trip_rows = column("trip_rows")
+        table._stop_offsets = column("stop_offsets")
+        table._stop_rows = column("stop_rows")
+        table._indexed_rows = len(table.trip_index)
+        table._index_built = True
+    else:
+        table.invalidate_index()
+
+    if len(table) > 0:
+        transit_data._changed()
+
+
+def _load_stop_times(transit_data, reader):
+    trips = list(transit_data.trips)
+    stops = list(transit_data.stops)
+    headsigns = reader.header["headsigns"]
+    extras = reader.header["stop_time_extras"]
+
+    columns = zip(reader.array("trip_index"), reader.array("stop_index"), reader.array("arrival_time"),
+                  reader.array("departure_time"), reader.array("stop_sequence"), reader.array("pickup_type"),
+                  reader.array("drop_off_type"), reader.array("stop_time_shape_dist_traveled"),
+                  reader.array("stop_headsign"), reader.array("timepoint"))
+    for row, (trip_index, stop_index, arrival_time, departure_time, stop_sequence, pickup_type, drop_off_type,
+              shape_dist_traveled, stop_headsign, timepoint) in enumerate(columns):
+        trip = trips[trip_index]
+        stop = stops[stop_index]
+        stop_time = StopTime(transit_data, trip.id,
+                             None if arrival_time == MISSING_VALUE else arrival_time,
+                             None if departure_time == MISSING_VALUE else departure_time,
+                             stop.id, stop_sequence,
+                             None if pickup_type == MISSING_VALUE else pickup_type,
+                             None if drop_off_type == MISSING_VALUE else drop_off_type,
+                             None if math.isnan(shape_dist_traveled) else shape_dist_traveled,
+                             None if stop_headsign == MISSING_VALUE else headsigns[stop_headsign],
+                             None if timepoint == MISSING_VALUE else timepoint,
+                             **extras.get(str(row), {}))
+        trip.stop_times.add(stop_time)
+        stop.stop_times.append(stop_time)
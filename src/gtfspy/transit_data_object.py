@@ -1,208 +1,628 @@
 import io
 import os
-import shutil
 import tempfile
 import zipfile
+from time import perf_counter
 from zipfile import ZipFile
 
 from .data_objects import *
-from .utils.parsing import decode_file
+from .data_objects.base_object import collect_csv_fields
+from .load_filter import LoadFilter
+from .load_stats import measure
+from .snapshot import SnapshotError, gtfs_checksum, load_snapshot, map_snapshot, read_snapshot, save_snapshot
+from .utils.loading import GtfsMemberReader, ParallelGtfsMemberReader
+from .utils.parsing import EncodingDetector
+from .utils.saving import GtfsMemberWriter, ParallelGtfsMemberWriter
+from .validation import ValidationError, validate_dirty, validate_transit_data
+
+# the files which are parsed by the worker processes when loading with workers
+_PARALLEL_MEMBERS = ["agency.txt", "routes.txt", "shapes.txt", "calendar.txt", "calendar_dates.txt", "trips.txt",
+                     "stops.txt", "stop_times.txt", "fare_attributes.txt", "fare_rules.txt"]
+
+# the members each collection is loaded from in a lazily loaded GTFS file, and the collections it refers to; the
+# calendar dates are loaded with the calendar, since they add services to it
+_LAZY_COLLECTIONS = {
+    "agencies": (["agency.txt"], []),
+    "routes": (["routes.txt"], ["agencies"]),
+    "shapes": (["shapes.txt"], []),
+    "calendar": (["calendar.txt", "calendar_dates.txt"], []),
+    "calendar_dates": ([], ["calendar"]),
+    "trips": (["trips.txt"], ["routes", "calendar", "shapes"]),
+    "stops": (["stops.txt"], []),
+    "stop_time_table": (["stop_times.txt"], ["trips", "stops"]),
+    "translator": (["translations.txt"], []),
+    "fare_attributes": (["fare_attributes.txt"], ["agencies"]),
+    "fare_rules": (["fare_rules.txt"], ["fare_attributes", "routes"]),
+}
+
+# the collection of TransitData each member is loaded into
+_MEMBER_COLLECTIONS = {"agency.txt": "agencies", "routes.txt": "routes", "shapes.txt": "shapes",
+                       "calendar.txt": "calendar", "calendar_dates.txt": "calendar_dates", "trips.txt": "trips",
+                       "stops.txt": "stops", "fare_attributes.txt": "fare_attributes", "fare_rules.txt": "fare_rules"}
+
+
+class ReadOnlyError(Exception):
+    """
+    Raised when a read only TransitData object (see TransitData.load_snapshot) is modified.
+    """
+
+    pass
+
+
+def _lazy_collection(name):
+    """
+    A property of a collection of TransitData, which loads the collection on first access when the data is loaded
+    lazily.
+
+    :type name: str
+    :rtype: property
+    """
+
+    attribute_name = "_" + name
+
+    def get_collection(self):
+        if self._lazy_collections:
+            self._load_lazy_collection(name)
+        return getattr(self, attribute_name)
+
+    return property(get_collection)
 
 
 class TransitData(object):
-    def __init__(self, gtfs_file=None, validate=True):
-        self.agencies = AgencyCollection(self)
-        self.routes = RouteCollection(self)
-        self.shapes = ShapeCollection(self)
-        self.calendar = ServiceCollection(self)
-        self.calendar_dates = ServiceDateCollection(self)
-        self.trips = TripCollection(self)
-        self.stops = StopCollection(self)
-        self.translator = Translator()
-        self.fare_attributes = FareAttributeCollection(self)
-        self.fare_rules = FareRuleCollection(self)
+    agencies = _lazy_collection("agencies")
+    routes = _lazy_collection("routes")
+    shapes = _lazy_collection("shapes")
+    calendar = _lazy_collection("calendar")
+    calendar_dates = _lazy_collection("calendar_dates")
+    trips = _lazy_collection("trips")
+    stops = _lazy_collection("stops")
+    translator = _lazy_collection("translator")
+    fare_attributes = _lazy_collection("fare_attributes")
+    fare_rules = _lazy_collection("fare_rules")
+
+    def __init__(self, gtfs_file=None, validate=True, encoding=None, columnar_stop_times=False, workers=None,
+                 lazy=False):
+        """
+        :type gtfs_file: str | file | None
+        :type validate: bool
+        :type encoding: str | EncodingDetector | None
+        :param columnar_stop_times: store the stop times in a compact StopTimeTable instead of StopTime objects
+        :type columnar_stop_times: bool
+        :param workers: the number of worker processes used to parse gtfs_file, see load_gtfs_file
+        :type workers: int | None
+        :param lazy: load each collection of gtfs_file on first access, see load_gtfs_file; implies
+                     columnar_stop_times
+        :type lazy: bool
+        """
+
+        # the names of the collections which are still not loaded from a lazily loaded GTFS file
+        self._lazy_collections = set()
+        self._lazy_gtfs_file = None
+        self._lazy_encoding = None
+
+        self.stop_time_table = StopTimeTable(self) if columnar_stop_times or lazy else None
+
+        self._agencies = AgencyCollection(self)
+        self._routes = RouteCollection(self)
+        self._shapes = ShapeCollection(self)
+        self._calendar = ServiceCollection(self)
+        self._calendar_dates = ServiceDateCollection(self)
+        self._trips = TripCollection(self)
+        self._stops = StopCollection(self)
+        self._translator = Translator()
+        self._fare_attributes = FareAttributeCollection(self)
+        self._fare_rules = FareRuleCollection(self)
 
         # TODO: create dedicated object for unknown files collection
         # TODO: save the headers order in the unknown files
         self.unknown_files = {}
 
+        # the checksum of the GTFS file this data was loaded from, see gtfspy.snapshot.gtfs_checksum
+        self.source_checksum = None
+
         self.has_changed = False
         self.is_validated = True
+        # the objects which were added, changed or removed since the data was last validated, by the names of their
+        # collections and by their identities (they're unhashable); None when all the data has to be validated
+        self._dirty = {}
+        # counts the changes of the data, so indexes built from it can tell they are stale
+        self._version = 0
+        # set when the data is mapped from a snapshot, which may be shared with other processes
+        self.read_only = False
 
         if gtfs_file is not None:
-            self.load_gtfs_file(gtfs_file, validate=validate)
-
-    def _changed(self):
+            self.load_gtfs_file(gtfs_file, validate=validate, encoding=encoding, workers=workers, lazy=lazy)
+
+    def _check_writable(self):
+        if self.read_only:
+            raise ReadOnlyError("the transit data is read only")
+
+    def _changed(self, collection_name=None, obj=None):
+        """
+        :param collection_name: the name of the collection of the object, see obj
+        :type collection_name: str | None
+        :param obj: the single object which was added, changed or removed, so only it (and the objects which refer to
+                    it, when it was removed) is validated again by validate, and only the patterns of the route of a
+                    changed trip are built again. Without it all the data is validated and all the patterns are built
+                    again
+        """
+
+        self._check_writable()
         self.has_changed = True
+        self._version += 1
         self.is_validated = False
+        if obj is None:
+            self._dirty = None
+            for route in self._routes:
+                route.invalidate_patterns()
+            return
+
+        if collection_name == "trips":
+            obj.route.invalidate_patterns()
+        if self._dirty is not None:
+            dirty_objects = self._dirty.get(collection_name)
+            if dirty_objects is None:
+                dirty_objects = self._dirty[collection_name] = {}
+            dirty_objects[id(obj)] = obj
+
+    def load_gtfs_file(self, gtfs_file, validate=True, partial=None, encoding=None, workers=None, service_window=None,
+                       lazy=False, stats=None):
+        """
+        :type gtfs_file: str | file
+        :type validate: bool
+        :param partial: the part of the file to load, a LoadFilter or the line numbers to load by agency id (see
+                        LoadFilter)
+        :type partial: dict[str, list[str]] | dict[str, None] | LoadFilter | None
+        :param encoding: the encoding of all the files in the archive; when it's None the encoding is detected from a
+                         sample of each file and the detection is reused for the rest of the archive
+        :type encoding: str | EncodingDetector | None
+        :param workers: the number of worker processes which parse the files of the archive (and chunks of
+                        stop_times.txt) in parallel, the objects are still created and wired in this process (the
+                        archive is only parsed by workers when gtfs_file is a path). The data is also validated with
+                        this number of workers, see validate
+        :type workers: int | None
+        :param service_window: load only the trips whose service is active at least once between these dates
+                               (inclusive); the trips and the stop times of the other services are skipped on their
+                               raw rows
+        :type service_window: (date, date) | None
+        :param lazy: only index the archive, and load each collection (with the collections it refers to) the first
+                     time it's accessed; the stop times are loaded when the stop times of any trip or stop are first
+                     used. The back references of an object (like the trips of a route) are filled when the
+                     collection which refers to it is loaded. gtfs_file must stay available until everything is
+                     loaded. The data isn't validated on load in this mode. Requires a StopTimeTable
+        :type lazy: bool
+        :param stats: when given, collects the time, the rows and the allocated memory of every phase of every file
+                      (including the validation), see LoadStats. Not supported with lazy
+        :type stats: LoadStats | None
+        """
 
-    def load_gtfs_file(self, gtfs_file, validate=True, partial=None):
         assert not self.has_changed
+        self._dirty = None
+
+        load_filter = LoadFilter.create(partial, service_window)
+
+        if not isinstance(encoding, EncodingDetector):
+            encoding = EncodingDetector(encoding)
+
+        if lazy:
+            assert load_filter is None and workers is None and stats is None and self.stop_time_table is not None
+            self._index_gtfs_file(gtfs_file, encoding)
+            return
 
         with ZipFile(gtfs_file) as zip_file:
             zip_files_list = zip_file.namelist()
+            self.source_checksum = gtfs_checksum(zip_file)
 
-            with zip_file.open("agency.txt", "r") as agency_file:
-                if partial is None:
-                    self.agencies._load_file(agency_file)
-                else:
-                    self.agencies._load_file(agency_file, filter=lambda agency: agency.id in partial)
+            if workers is not None and workers > 1 and isinstance(gtfs_file, str):
+                members = [member for member in _PARALLEL_MEMBERS if member in zip_files_list]
+                reader = ParallelGtfsMemberReader(zip_file, gtfs_file, encoding, workers, members, stats=stats)
+            else:
+                reader = GtfsMemberReader(zip_file, encoding, stats=stats)
 
-            with zip_file.open("routes.txt", "r") as routes_file:
-                if partial is None:
-                    self.routes._load_file(routes_file)
-                else:
-                    self.routes._load_file(routes_file,
-                                           ignore_errors=True,
-                                           filter=lambda route: partial[route.agency.id] is None or
-                                                                route.line.line_number in partial[route.agency.id])
-                    for agency in self.agencies:
-                        agency.lines.clean()
-
-            if 'shapes.txt' in zip_files_list:
-                with zip_file.open("shapes.txt", "r") as shapes_file:
-                    self.shapes._load_file(shapes_file, ignore_errors=partial is not None)
-
-            with zip_file.open("calendar.txt", "r") as calendar_file:
-                self.calendar._load_file(calendar_file, ignore_errors=partial is not None)
-
-            if 'calendar_dates.txt' in zip_files_list:
-                with zip_file.open("calendar_dates.txt", "r") as calendar_dates_file:
-                    self.calendar_dates._load_file(calendar_dates_file, ignore_errors=partial is not None)
-
-            with zip_file.open("trips.txt", "r") as trips_file:
-                self.trips._load_file(trips_file, ignore_errors=partial is not None)
-                if partial is not None:
-                    self.shapes.clean()
-                    self.calendar.clean()
-
-            with zip_file.open("stops.txt", "r") as stops_file:
-                self.stops._load_file(stops_file, ignore_errors=partial is not None)
-
-            with zip_file.open("stop_times.txt", "r") as stop_times_file:
-                stop_times_file = decode_file(stop_times_file) 
-                reader = csv.DictReader(stop_times_file)
-                for row in reader:
-                    try:
-                        stop_time = StopTime(transit_data=self, **row)
-                        stop_time.trip.stop_times.add(stop_time)
-                        stop_time.stop.stop_times.append(stop_time)
-                    except:
-                        if partial is None:
-                            raise
-
-                if partial is not None:
-                    self.stops.clean()
-
-            if "translations.txt" in zip_files_list:
-                with zip_file.open("translations.txt", "r") as translation_file:
-                    self.translator._load_file(translation_file)
-
-            if "fare_attributes.txt" in zip_files_list and "fare_rules.txt" in zip_files_list:
-                with zip_file.open("fare_attributes.txt", "r") as fare_attributes_file:
-                    self.fare_attributes._load_file(fare_attributes_file, ignore_errors=partial is not None)
-                with zip_file.open("fare_rules.txt", "r") as fare_rules_file:
-                    if partial is None:
-                        self.fare_rules._load_file(fare_rules_file)
-                    else:
-                        zone_ids = {stop.zone_id for stop in self.stops}
-                        self.fare_rules._load_file(fare_rules_file,
-                                                   ignore_errors=True,
-                                                   filter=lambda fare_rule:
-                                                   (fare_rule.origin_id is None or fare_rule.origin_id in zone_ids) and
-                                                   (fare_rule.destination_id is None or fare_rule.destination_id in zone_ids) and
-                                                   (fare_rule.contains_id is None or fare_rule.contains_id in zone_ids))
-
-                if partial is not None:
-                    self.fare_attributes.clean()
-
-            for inner_file in zip_file.filelist:
-                # TODO: collect this known files list on reading
-                if inner_file.filename not in ["agency.txt", "routes.txt", "shapes.txt", "calendar.txt", "trips.txt",
-                                               "stops.txt", "stop_times.txt", "translations.txt", "fare_attributes.txt",
-                                               "fare_rules.txt"]:
-                    with zip_file.open(inner_file, "r") as f:
-                        self.unknown_files[inner_file.filename] = UnknownFile(f)
+            try:
+                self._load_members(reader, zip_files_list, load_filter, encoding, stats)
+            finally:
+                reader.close()
 
-        if validate:
-            self.validate()
+            self._load_unknown_files(zip_file)
 
-    def save(self, file_path=None, compression=zipfile.ZIP_DEFLATED, validate=True):
         if validate:
-            self.validate()
+            self.validate(stats=stats, workers=workers)
+
+    def _load_unknown_files(self, zip_file):
+        """
+        :type zip_file: ZipFile
+        """
+
+        for inner_file in zip_file.filelist:
+            # TODO: collect this known files list on reading
+            if inner_file.filename not in ["agency.txt", "routes.txt", "shapes.txt", "calendar.txt", "trips.txt",
+                                           "stops.txt", "stop_times.txt", "translations.txt", "fare_attributes.txt",
+                                           "fare_rules.txt"]:
+                with zip_file.open(inner_file, "r") as f:
+                    self.unknown_files[inner_file.filename] = UnknownFile(f)
+
+    def _index_gtfs_file(self, gtfs_file, encoding):
+        """
+        :type gtfs_file: str | file
+        :type encoding: EncodingDetector
+        """
 
-        tempdir = tempfile.mkdtemp()
-        temp_gtfs_file_path = tempfile.mktemp(suffix=".zip")
+        with ZipFile(gtfs_file) as zip_file:
+            self.source_checksum = gtfs_checksum(zip_file)
+            self._load_unknown_files(zip_file)
 
-        try:
-            with open(os.path.join(tempdir, "agency.txt"), "w", encoding='utf-8') as f:
-                self.agencies.save(f)
+        self._lazy_gtfs_file = gtfs_file
+        self._lazy_encoding = encoding
+        self._lazy_collections = set(_LAZY_COLLECTIONS.keys())
+        self.is_validated = False
+        self.stop_time_table._loader = lambda: self._load_lazy_collection("stop_time_table")
+
+    def _load_lazy_collection(self, name):
+        """
+        Loads a collection of a lazily loaded GTFS file, after the collections it refers to.
 
-            with open(os.path.join(tempdir, "routes.txt"), "w", encoding='utf-8') as f:
-                self.routes.save(f)
+        :type name: str
+        """
 
-            with open(os.path.join(tempdir, "shapes.txt"), "w", encoding='utf-8') as f:
-                self.shapes.save(f)
+        if name not in self._lazy_collections:
+            return
+
+        # the collection is marked as loaded first, so it can be used while its rows are added
+        self._lazy_collections.remove(name)
+        member_names, dependencies = _LAZY_COLLECTIONS[name]
+        for dependency in dependencies:
+            self._load_lazy_collection(dependency)
 
-            with open(os.path.join(tempdir, "calendar.txt"), "w", encoding='utf-8') as f:
-                self.calendar.save(f)
+        with ZipFile(self._lazy_gtfs_file) as zip_file:
+            zip_files_list = zip_file.namelist()
+            reader = GtfsMemberReader(zip_file, self._lazy_encoding)
+            for member_name in member_names:
+                if member_name not in zip_files_list:
+                    continue
+                if member_name == "translations.txt":
+                    with zip_file.open(member_name, "r") as translation_file:
+                        self._translator._load_file(translation_file, encoding=self._lazy_encoding)
+                elif member_name == "stop_times.txt":
+                    self._load_stop_times(reader.read(member_name))
+                elif member_name.startswith("fare_") and \
+                        ("fare_attributes.txt" not in zip_files_list or "fare_rules.txt" not in zip_files_list):
+                    continue
+                else:
+                    getattr(self, "_" + _MEMBER_COLLECTIONS[member_name])._load_rows(reader.read(member_name))
+
+        if not self._lazy_collections:
+            self._lazy_gtfs_file = None
+
+    def _load_members(self, reader, zip_files_list, load_filter, encoding, stats=None):
+        """
+        :type reader: GtfsMemberReader
+        :type zip_files_list: list[str]
+        :type load_filter: LoadFilter | None
+        :type encoding: EncodingDetector
+        :type stats: LoadStats | None
+        """
+
+        if load_filter is not None:
+            self._load_filtered_members(reader, zip_files_list, load_filter, encoding, stats)
+            return
 
-            with open(os.path.join(tempdir, "trips.txt"), "w", encoding='utf-8') as f:
-                self.trips.save(f)
+        self.agencies._load_rows(reader.read("agency.txt"))
+        self.routes._load_rows(reader.read("routes.txt"))
+
+        if 'shapes.txt' in zip_files_list:
+            self.shapes._load_rows(reader.read("shapes.txt"))
+
+        self.calendar._load_rows(reader.read("calendar.txt"))
+
+        if 'calendar_dates.txt' in zip_files_list:
+            self.calendar_dates._load_rows(reader.read("calendar_dates.txt"))
+
+        self.trips._load_rows(reader.read("trips.txt"))
+        self.stops._load_rows(reader.read("stops.txt"))
+        self._load_stop_times(reader.read("stop_times.txt"), stats=stats)
+
+        if "translations.txt" in zip_files_list:
+            with reader.zip_file.open("translations.txt", "r") as translation_file, \
+                    measure(stats, "translations.txt", "parse"):
+                self.translator._load_file(translation_file, encoding=encoding)
+
+        if "fare_attributes.txt" in zip_files_list and "fare_rules.txt" in zip_files_list:
+            self.fare_attributes._load_rows(reader.read("fare_attributes.txt"))
+            self.fare_rules._load_rows(reader.read("fare_rules.txt"))
+
+    def _load_filtered_members(self, reader, zip_files_list, load_filter, encoding, stats=None):
+        """
+        :type reader: GtfsMemberReader
+        :type zip_files_list: list[str]
+        :type load_filter: LoadFilter
+        :type encoding: EncodingDetector
+        :param stats: the rows of the trips are read before they're selected, so their selection is a part of their
+                      parse phase and their construct phase is measured apart. The stops and the stop times are
+                      selected in a first pass over their files, which is a part of their parse phase
+        :type stats: LoadStats | None
+        """
+
+        self.agencies._load_rows(reader.read("agency.txt"), filter=load_filter.accept_agency)
+        self.routes._load_rows(reader.read("routes.txt"), ignore_errors=True, filter=load_filter.accept_route)
+        for agency in self.agencies:
+            agency.lines.clean()
+
+        self.calendar._load_rows(reader.read("calendar.txt"), ignore_errors=True)
+        if 'calendar_dates.txt' in zip_files_list:
+            self.calendar_dates._load_rows(reader.read("calendar_dates.txt"), ignore_errors=True)
+
+        # the trips, the stop times and the stops are selected on their raw rows, and only the rows which are
+        # referenced by the kept rows of the previous files are loaded
+        route_ids = {route.id for route in self.routes}
+        service_ids = {service.id for service in self.calendar if load_filter.accept_service(service)}
+        trip_rows = {row["trip_id"]: row for row in reader.read("trips.txt")
+                     if load_filter.accept_trip_row(row, route_ids, service_ids)}
+
+        # the stops and the stop times are streamed twice: the first pass only keeps the ids which select the trips
+        # and the stops, and the second pass loads the selected rows
+        selection_reader = GtfsMemberReader(reader.zip_file, encoding)
+        with measure(stats, "stops.txt", "parse"):
+            parent_stations = {}
+            accepted_stop_ids = set()
+            for row in selection_reader.read("stops.txt"):
+                parent_stations[row["stop_id"]] = row.get("parent_station")
+                if load_filter.filters_stops and load_filter.accept_stop_row(row):
+                    accepted_stop_ids.add(row["stop_id"])
+
+        with measure(stats, "stop_times.txt", "parse"):
+            trip_ids = set()
+            # the stops of the stop times of all the trips which may be kept, the stops which are left without stop
+            # times are removed by clean
+            used_stop_ids = set()
+            for row in selection_reader.read("stop_times.txt"):
+                if row["trip_id"] in trip_rows:
+                    used_stop_ids.add(row["stop_id"])
+                    if not load_filter.filters_stops or row["stop_id"] in accepted_stop_ids:
+                        trip_ids.add(row["trip_id"])
+
+        if 'shapes.txt' in zip_files_list:
+            shape_ids = {trip_rows[trip_id].get("shape_id") for trip_id in trip_ids}
+            self.shapes._load_rows((row for row in reader.read("shapes.txt") if row["shape_id"] in shape_ids),
+                                   ignore_errors=True)
+
+        with measure(stats, "trips.txt", "construct"):
+            self.trips._load_rows((row for trip_id, row in trip_rows.items() if trip_id in trip_ids),
+                                  ignore_errors=True)
+
+        stop_ids = set()
+        for stop_id in used_stop_ids:
+            while stop_id and stop_id not in stop_ids and stop_id in parent_stations:
+                stop_ids.add(stop_id)
+                stop_id = parent_stations[stop_id]
+        self.stops._load_rows((row for row in reader.read("stops.txt") if row["stop_id"] in stop_ids),
+                              ignore_errors=True)
+
+        self._load_stop_times((row for row in reader.read("stop_times.txt") if row["trip_id"] in trip_ids),
+                              ignore_errors=True, stats=stats)
+        self.clean(stats=stats)
+
+        if "translations.txt" in zip_files_list:
+            with reader.zip_file.open("translations.txt", "r") as translation_file, \
+                    measure(stats, "translations.txt", "parse"):
+                self.translator._load_file(translation_file, encoding=encoding)
+
+        if "fare_attributes.txt" in zip_files_list and "fare_rules.txt" in zip_files_list:
+            self.fare_attributes._load_rows(reader.read("fare_attributes.txt"), ignore_errors=True)
+            zone_ids = self.stops.zone_ids
+            self.fare_rules._load_rows(reader.read("fare_rules.txt"),
+                                       ignore_errors=True,
+                                       filter=lambda fare_rule:
+                                       (fare_rule.origin_id is None or fare_rule.origin_id in zone_ids) and
+                                       (fare_rule.destination_id is None or fare_rule.destination_id in zone_ids) and
+                                       (fare_rule.contains_id is None or fare_rule.contains_id in zone_ids))
+            with measure(stats, "fare_attributes.txt", "clean"):
+                self.fare_attributes.clean()
+
+    def _load_stop_times(self, rows, ignore_errors=False, stats=None):
+        """
+        :type rows: collections.Iterable[dict]
+        :type ignore_errors: bool
+        :param stats: when given, the time spent adding the stop times to their trips and stops is moved from the
+                      construct phase to the link phase
+        :type stats: LoadStats | None
+        """
+
+        if stats is not None and self.stop_time_table is None:
+            self._load_linked_stop_times(rows, ignore_errors, stats)
+            return
 
-            with open(os.path.join(tempdir, "stops.txt"), "w", encoding='utf-8') as f:
-                self.stops.save(f)
+        for row in rows:
+            try:
+                if self.stop_time_table is None:
+                    stop_time = StopTime(transit_data=self, **row)
+                    stop_time.trip.stop_times.add(stop_time)
+                    stop_time.stop.stop_times.append(stop_time)
+                else:
+                    self.stop_time_table.add(**row)
+            except:
+                if not ignore_errors:
+                    raise
+
+    def _load_linked_stop_times(self, rows, ignore_errors, stats):
+        """
+        :type rows: collections.Iterable[dict]
+        :type ignore_errors: bool
+        :type stats: LoadStats
+        """
+
+        link_seconds = 0.0
+        linked = 0
+        for row in rows:
+            try:
+                stop_time = StopTime(transit_data=self, **row)
+                start_time = perf_counter()
+                stop_time.trip.stop_times.add(stop_time)
+                stop_time.stop.stop_times.append(stop_time)
+                link_seconds += perf_counter() - start_time
+                linked += 1
+            except:
+                if not ignore_errors:
+                    raise
+        stats.move("stop_times.txt", "construct", "link", link_seconds)
+        stats.add("stop_times.txt", "link", 0, linked)
+
+    def save(self, file_path=None, compression=zipfile.ZIP_DEFLATED, validate=True, workers=None, timings=None,
+             stats=None):
+        """
+        Saves the data as a GTFS zip file. The csv rows are streamed directly into the entries of the archive, so no
+        temporary files are needed.
+
+        :param file_path: the path or the writable binary file to save to; when it's None the archive is returned
+        :type file_path: str | io.BufferedIOBase | None
+        :type compression: int
+        :type validate: bool
+        :param workers: the number of threads which serialize the files of the archive concurrently, while this thread
+                        compresses the serialized files into the archive
+        :type workers: int | None
+        :param timings: when given, filled with the seconds it took to write each file of the archive
+        :type timings: dict[str, float] | None
+        :param stats: when given, collects the write phase (and the validate phase) of every file, see LoadStats
+        :type stats: LoadStats | None
+        :rtype: bytes | None
+        """
 
-            fields = []
-            for trip in self.trips:
-                for stop_time in trip.stop_times:
-                    fields += (field for field in stop_time.get_csv_fields() if field not in fields)
-            with open(os.path.join(tempdir, "stop_times.txt"), "w", encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fields, restval=None)
-                writer.writeheader()
-                for trip in self.trips:
-                    for stop_time in trip.stop_times:
-                        writer.writerow(stop_time.to_csv_line())
-
-            fields = ["service_id", "date", "exception_type"]
-            for c in self.calendar:
-                for service_date in c.special_dates:
-                    fields += (field for field in service_date.get_csv_fields() if field not in fields)
-
-            with open(os.path.join(tempdir, "calendar_dates.txt"), "w", encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fields, restval=None)
-                writer.writeheader()
-                for c in self.calendar:
-                    for service_date in c.special_dates:
-                        writer.writerow(service_date.to_csv_line())
+        if validate:
+            self.validate(stats=stats)
+
+        if file_path is None:
+            buffer = io.BytesIO()
+            self.save(buffer, compression=compression, validate=False, workers=workers, timings=timings, stats=stats)
+            return buffer.getvalue()
+
+        if not isinstance(file_path, str):
+            with ZipFile(file_path, mode="w", compression=compression) as zip_file:
+                self._save_members(zip_file, workers, timings, stats)
+            return None
+
+        # write next to the destination, so the complete archive replaces it with a rename
+        temp_file_descriptor, temp_gtfs_file_path = tempfile.mkstemp(suffix=".zip",
+                                                                     dir=os.path.dirname(os.path.abspath(file_path)))
+        try:
+            with os.fdopen(temp_file_descriptor, "wb") as temp_file:
+                with ZipFile(temp_file, mode="w", compression=compression) as zip_file:
+                    self._save_members(zip_file, workers, timings, stats)
+                # mkstemp creates the file readable by its owner only, a saved archive gets the default permissions
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(temp_gtfs_file_path, 0o666 & ~umask)
+            os.replace(temp_gtfs_file_path, file_path)
+        finally:
+            if os.path.exists(temp_gtfs_file_path):
+                os.remove(temp_gtfs_file_path)
+
+    def _save_members(self, zip_file, workers, timings, stats=None):
+        """
+        :type zip_file: ZipFile
+        :type workers: int | None
+        :type timings: dict[str, float] | None
+        :type stats: LoadStats | None
+        """
+
+        if workers is not None and workers > 1:
+            writer = ParallelGtfsMemberWriter(zip_file, workers, timings, stats)
+        else:
+            writer = GtfsMemberWriter(zip_file, timings, stats)
+
+        try:
+            writer.write("agency.txt", self.agencies.save)
+            writer.write("routes.txt", self.routes.save)
+            writer.write("shapes.txt", self.shapes.save)
+            writer.write("calendar.txt", self.calendar.save)
+            writer.write("trips.txt", self.trips.save)
+            writer.write("stops.txt", self.stops.save)
+            writer.write("stop_times.txt", self._save_stop_times)
+            writer.write("calendar_dates.txt", self._save_calendar_dates)
 
             if self.translator.has_data():
-                with open(os.path.join(tempdir, "translations.txt"), "w", encoding='utf-8') as f:
-                    self.translator.save(f)
+                writer.write("translations.txt", self.translator.save)
 
             if self.fare_rules.has_data():
-                with open(os.path.join(tempdir, "fare_attributes.txt"), "w", encoding='utf-8') as f:
-                    self.fare_attributes.save(f)
-
-                with open(os.path.join(tempdir, "fare_rules.txt"), "w", encoding='utf-8') as f:
-                    self.fare_rules.save(f)
-
-            if file_path is None:
-                buffer = io.BytesIO()
-                with ZipFile(buffer, mode="w", compression=compression) as zip_file:
-                    for file_name in os.listdir(tempdir):
-                        zip_file.write(os.path.join(tempdir, file_name), arcname=file_name)
-                return buffer.getvalue()
-            else:
-                with ZipFile(temp_gtfs_file_path, mode="w", compression=compression) as zip_file:
-                    for file_name in os.listdir(tempdir):
-                        zip_file.write(os.path.join(tempdir, file_name), arcname=file_name)
-                shutil.move(temp_gtfs_file_path, file_path)
+                writer.write("fare_attributes.txt", self.fare_attributes.save)
+                writer.write("fare_rules.txt", self.fare_rules.save)
         finally:
-            if os.path.exists(tempdir) and os.path.isdir(tempdir):
-                shutil.rmtree(tempdir)
-            if os.path.exists(temp_gtfs_file_path) and not os.path.isdir(temp_gtfs_file_path):
-                os.remove(temp_gtfs_file_path)
+            writer.close()
+
+    def _save_stop_times(self, csv_file):
+        if self.stop_time_table is not None:
+            fields = self.stop_time_table.get_csv_fields()
+        else:
+            fields = collect_csv_fields(stop_time for trip in self.trips for stop_time in trip.stop_times)
+
+        writer = csv.DictWriter(csv_file, fieldnames=fields, restval=None)
+        writer.writeheader()
+        for trip in self.trips:
+            for stop_time in trip.stop_times:
+                writer.writerow(stop_time.to_csv_line())
+
+    def _save_calendar_dates(self, csv_file):
+        fields = collect_csv_fields((service_date for c in self.calendar for service_date in c.special_dates),
+                                    fields=["service_id", "date", "exception_type"])
+
+        writer = csv.DictWriter(csv_file, fieldnames=fields, restval=None)
+        writer.writeheader()
+        for c in self.calendar:
+            for service_date in c.special_dates:
+                writer.writerow(service_date.to_csv_line())
+
+    def save_snapshot(self, file_path):
+        """
+        Saves the data as a binary snapshot, which can be loaded much faster than a GTFS file.
+
+        :type file_path: str
+        """
+
+        save_snapshot(self, file_path, checksum=self.source_checksum)
+
+    @classmethod
+    def load_snapshot(cls, file_path, gtfs_file=None, columnar_stop_times=True, validate=False, mapped=False):
+        """
+        Loads a TransitData from a snapshot saved by save_snapshot.
+
+        When gtfs_file is given, the snapshot is used only if it was saved from this GTFS file; otherwise (or when the
+        snapshot is missing or corrupted) the GTFS file is loaded and the snapshot is rebuilt.
+
+        When mapped is set the snapshot file is memory mapped: the stop times columns and the shape points stay in
+        the mapped file, so processes which map the same snapshot share their physical pages, and the shape points
+        are created only when a shape is accessed. The returned data is read only, and any attempt to change it
+        raises ReadOnlyError.
+
+        :type file_path: str
+        :type gtfs_file: str | None
+        :param columnar_stop_times: load the stop times into a StopTimeTable, which is much faster; always set when
+                                    mapped is set
+        :type columnar_stop_times: bool
+        :type validate: bool
+        :type mapped: bool
+        :rtype: TransitData
+        """
+
+        checksum = None if gtfs_file is None else gtfs_checksum(gtfs_file)
+
+        try:
+            reader = map_snapshot(file_path) if mapped else read_snapshot(file_path)
+            if checksum is not None and reader.checksum != checksum:
+                raise SnapshotError("the snapshot was saved from another GTFS file")
+        except (SnapshotError, IOError):
+            if gtfs_file is None:
+                raise
+            transit_data = cls(gtfs_file, validate=validate, columnar_stop_times=columnar_stop_times)
+            transit_data.save_snapshot(file_path)
+            if not mapped:
+                return transit_data
+            reader = map_snapshot(file_path)
+
+        transit_data = cls(columnar_stop_times=columnar_stop_times or mapped)
+        load_snapshot(transit_data, reader, mapped=mapped)
+        if validate:
+            transit_data.validate()
+        transit_data.read_only = mapped
+        return transit_data
 
     def add_object(self, obj, recursive=False):
         if isinstance(obj, Agency):
@@ -229,10 +649,16 @@ class TransitData(object):
             raise ValueError("Unknown object type '%s'" % (type(obj),))
 
     def add_stop_time(self, **kwargs):
+        if self.stop_time_table is not None:
+            trip = self.trips[str(kwargs["trip_id"])]
+            assert int(kwargs["stop_sequence"]) not in (st.stop_sequence for st in trip.stop_times)
+            self._changed("trips", trip)
+            return self.stop_time_table.get_row(self.stop_time_table.add(**kwargs))
+
         stop_time = StopTime(transit_data=self, **kwargs)
 
         assert stop_time.stop_sequence not in (st.stop_sequence for st in stop_time.trip.stop_times)
-        self._changed()
+        self._changed("trips", stop_time.trip)
         stop_time.trip.stop_times.add(stop_time)
         stop_time.stop.stop_times.append(stop_time)
         return stop_time
@@ -251,30 +677,65 @@ class TransitData(object):
             assert stop_time.stop in self.stops
         return self.add_stop_time(**stop_time.to_csv_line())
 
-    def clean(self):
-        self.trips.clean()
-        self.stops.clean()
-        self.shapes.clean()
-        self.calendar.clean()
-        self.routes.clean()
-        self.agencies.clean()
-        self.fare_rules.clean()
-        self.fare_attributes.clean()
-
-    def validate(self, force=False):
+    def clean(self, stats=None):
+        """
+        :param stats: when given, collects the clean phase of every file, see LoadStats
+        :type stats: LoadStats | None
+        """
+
+        self._check_writable()
+
+        for member_name, collection in [("trips.txt", self.trips), ("stops.txt", self.stops),
+                                        ("shapes.txt", self.shapes), ("calendar.txt", self.calendar),
+                                        ("routes.txt", self.routes), ("agency.txt", self.agencies),
+                                        ("fare_rules.txt", self.fare_rules),
+                                        ("fare_attributes.txt", self.fare_attributes)]:
+            with measure(stats, member_name, "clean"):
+                collection.clean()
+
+    def validate(self, force=False, stats=None, workers=None):
+        """
+        Validates the objects which were added, changed or removed since the data was last validated (see
+        validation.validate_dirty), or all the data when it was loaded or changed as a whole since then, or with force.
+        The objects are changed through their collections or the setters of their fields; the stop, the trip and the
+        stop sequence of a stop time which isn't kept in a StopTimeTable are changed by removing and adding it again.
+
+        :type force: bool
+        :param stats: when given, collects the validate phase of every file, see LoadStats
+        :type stats: LoadStats | None
+        :param workers: the number of worker processes which validate chunks of the trips, the stops and the shapes
+                        concurrently when all the data is validated, see validation.validate_transit_data
+        :type workers: int | None
+        :raises ValidationError: when the data has errors, with the report of all the violations (the rows of the
+                                 violations are unknown when only the changed objects were validated)
+        """
+
         if self.is_validated and not force:
             return
 
-        self.agencies.validate()
-        self.routes.validate()
-        self.shapes.validate()
-        self.calendar.validate()
-        self.trips.validate()
-        self.stops.validate()
-        self.fare_attributes.validate()
-        self.fare_rules.validate()
+        if force or self._dirty is None:
+            report = validate_transit_data(self, stats=stats, workers=workers)
+        else:
+            report = validate_dirty(self, self._dirty, stats=stats)
+        if not report.is_valid:
+            self.is_validated = False
+            raise ValidationError(report)
 
         self.is_validated = True
+        self._dirty = {}
+
+    def validation_report(self, stats=None, workers=None):
+        """
+        Checks all the validation rules without stopping at the first violation.
+
+        :param stats: when given, collects the validate phase of every file, see LoadStats
+        :type stats: LoadStats | None
+        :param workers: the number of worker processes which validate the data, see validate
+        :type workers: int | None
+        :rtype: ValidationReport
+        """
+
+        return validate_transit_data(self, stats=stats, workers=workers)
 
     def __eq__(self, other):
         if not isinstance(other, TransitData):
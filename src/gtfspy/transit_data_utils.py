@@ -1,9 +1,19 @@
-from io import StringIO
+from io import BytesIO, StringIO
 
 from .data_objects import UnknownFile
 from .transit_data_object import TransitData
 
 
+def _copy_unknown_file(unknown_file):
+    """
+    :type unknown_file: UnknownFile
+    :rtype: UnknownFile
+    """
+
+    data = unknown_file.data
+    return UnknownFile(BytesIO(data) if isinstance(data, bytes) else StringIO(data))
+
+
 def clone_transit_data(transit_data):
     """
     :rtype: TransitData
@@ -31,10 +41,7 @@ def clone_transit_data(transit_data):
         new_transit_data.fare_rules.add_object(fare_rule, recursive=False)
 
     for file_name, file_data in transit_data.unknown_files.items():
-        dome_file = StringIO()
-        dome_file.write(file_data.data)
-        new_transit_data.unknown_files[file_name] = UnknownFile(dome_file)
-        dome_file.close()
+        new_transit_data.unknown_files[file_name] = _copy_unknown_file(file_data)
 
     return new_transit_data
 
@@ -54,7 +61,7 @@ def create_partial_transit_data(transit_data, lines, add_unknown_files=True):
         new_transit_data.agencies.add_object(agency, recursive=False)
         for line in transit_data.agencies[agency_id].lines:
             if line_numbers is None or line.line_number in line_numbers:
-                for route in line.routes.itervalues():
+                for route in line.routes.values():
                     new_transit_data.routes.add_object(route, recursive=False)
                     for trip in route.trips:
                         new_transit_data.calendar.add_object(trip.service)
@@ -66,8 +73,8 @@ def create_partial_transit_data(transit_data, lines, add_unknown_files=True):
                             new_transit_data.stops.add_object(stop, recursive=True)
                             new_transit_data.add_stop_time_object(stop_time)
 
+    zone_ids = new_transit_data.stops.zone_ids
     for fare_rule in transit_data.fare_rules:
-        zone_ids = {stop.zone_id for stop in new_transit_data.stops}
         if (fare_rule.route is None or fare_rule.route.id in new_transit_data.routes) and \
                 (fare_rule.origin_id is None or fare_rule.origin_id in zone_ids) and \
                 (fare_rule.destination_id is None or fare_rule.destination_id in zone_ids) and \
@@ -76,21 +83,21 @@ def create_partial_transit_data(transit_data, lines, add_unknown_files=True):
 
     if add_unknown_files:
         for file_name, file_data in transit_data.unknown_files.items():
-            dome_file = StringIO()
-            dome_file.write(file_data.data)
-            new_transit_data.unknown_files[file_name] = UnknownFile(dome_file)
-            dome_file.close()
+            new_transit_data.unknown_files[file_name] = _copy_unknown_file(file_data)
 
     return new_transit_data
 
 
-def load_partial_transit_data(gtfs_file, lines):
+def load_partial_transit_data(gtfs_file, lines=None, service_window=None):
     """
     :rtype: TransitData
     :type transit_data: TransitData
-    :type lines: dict[int, list[str]] | dict[int, None]
+    :param lines: the line numbers to load by agency id, or a LoadFilter
+    :type lines: dict[int, list[str]] | dict[int, None] | gtfspy.LoadFilter | None
+    :param service_window: load only the trips whose service is active at least once between these dates
+    :type service_window: (date, date) | None
     """
 
     td = TransitData()
-    td.load_gtfs_file(gtfs_file, partial=lines)
+    td.load_gtfs_file(gtfs_file, partial=lines, service_window=service_window)
     return td
@@ -0,0 +1,191 @@
+import math
+
+# the mean radius of the earth, in meters
+EARTH_RADIUS = 6371008.8
+
+# the default size of the cells of a GridIndex, in degrees (about 1.1km of latitude)
+DEFAULT_CELL_SIZE = 0.01
+
+
+def haversine_distance(lat1, lon1, lat2, lon2):
+    """
+    :return: the great circle distance between two points, in meters
+    :rtype: float
+    """
+
+    lat1, lon1, lat2, lon2 = math.radians(lat1), math.radians(lon1), math.radians(lat2), math.radians(lon2)
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_distances(lat, lon, points):
+    """
+    Computes the distances from a point to many points in a single pass, with the trigonometry of the origin computed
+    once.
+
+    :type lat: float
+    :type lon: float
+    :param points: (latitude, longitude) pairs
+    :type points: collections.Iterable[(float, float)]
+    :return: the great circle distances, in meters
+    :rtype: list[float]
+    """
+
+    radians = math.radians
+    sin = math.sin
+    cos = math.cos
+    sqrt = math.sqrt
+    asin = math.asin
+
+    lat, lon = radians(lat), radians(lon)
+    cos_lat = cos(lat)
+    diameter = 2 * EARTH_RADIUS
+
+    distances = []
+    for point_lat, point_lon in points:
+        point_lat, point_lon = radians(point_lat), radians(point_lon)
+        a = sin((point_lat - lat) / 2) ** 2 + cos_lat * cos(point_lat) * sin((point_lon - lon) / 2) ** 2
+        distances.append(diameter * asin(min(1.0, sqrt(a))))
+    return distances
+
+
+def _is_finite(lat, lon):
+    return math.isfinite(lat) and math.isfinite(lon)
+
+
+class GridIndex(object):
+    """
+    A spatial index of objects by their coordinates, bucketed into a grid of cells of a fixed size in degrees.
+
+    The objects are kept by their ids in the cells, so they may be moved or removed without scanning the index. The
+    objects whose coordinates aren't finite (like NaN coordinates, which are invalid) aren't indexed, so they're never
+    found.
+    """
+
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        """
+        :param cell_size: the size of the cells, in degrees
+        :type cell_size: float
+        """
+
+        assert cell_size > 0
+
+        self.cell_size = cell_size
+        # objects by their ids, grouped by their cells
+        self._cells = {}
+
+    def _cell(self, lat, lon):
+        return int(math.floor(lat / self.cell_size)), int(math.floor(lon / self.cell_size))
+
+    def add(self, obj_id, lat, lon, obj):
+        """
+        :type obj_id: str
+        :type lat: float
+        :type lon: float
+        """
+
+        if not _is_finite(lat, lon):
+            return
+        self._cells.setdefault(self._cell(lat, lon), {})[obj_id] = obj
+
+    def remove(self, obj_id, lat, lon, obj):
+        """
+        Removes an object which was added with these coordinates, if it's still indexed.
+
+        :type obj_id: str
+        :type lat: float
+        :type lon: float
+        """
+
+        if not _is_finite(lat, lon):
+            return
+        cell = self._cell(lat, lon)
+        cell_objects = self._cells.get(cell)
+        if cell_objects is not None and cell_objects.get(obj_id) is obj:
+            del cell_objects[obj_id]
+            if len(cell_objects) == 0:
+                del self._cells[cell]
+
+    def clear(self):
+        self._cells.clear()
+
+    def _cells_in_range(self, min_row, min_column, max_row, max_column):
+        # the cells are visited either by their coordinates or by scanning the occupied cells, the cheaper of both
+        if (max_row - min_row + 1) * (max_column - min_column + 1) <= len(self._cells):
+            for row in range(min_row, max_row + 1):
+                for column in range(min_column, max_column + 1):
+                    cell_objects = self._cells.get((row, column))
+                    if cell_objects is not None:
+                        yield cell_objects
+        else:
+            for (row, column), cell_objects in self._cells.items():
+                if min_row <= row <= max_row and min_column <= column <= max_column:
+                    yield cell_objects
+
+    def in_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """
+        :return: the objects of the cells which intersect the box, which may lie outside of it
+        :rtype: collections.Iterable
+        """
+
+        min_row, min_column = self._cell(min_lat, min_lon)
+        max_row, max_column = self._cell(max_lat, max_lon)
+        for cell_objects in self._cells_in_range(min_row, min_column, max_row, max_column):
+            for obj in cell_objects.values():
+                yield obj
+
+    def in_rings(self, lat, lon):
+        """
+        Visits the cells in growing square rings around a point.
+
+        :return: for each ring, the objects of its cells and a lower bound of the distance (in meters) from the point
+                 to any object which is outside of this ring and the previous ones; the iteration ends once all the
+                 occupied cells are visited
+        :rtype: collections.Iterable[(list, float)]
+        """
+
+        if len(self._cells) == 0:
+            return
+
+        center_row, center_column = self._cell(lat, lon)
+        rows = [row for row, _ in self._cells]
+        columns = [column for _, column in self._cells]
+        max_radius = max(abs(center_row - min(rows)), abs(center_row - max(rows)),
+                         abs(center_column - min(columns)), abs(center_column - max(columns)))
+
+        for radius in range(max_radius + 1):
+            if 8 * radius > len(self._cells):
+                # the ring has more cells than the index, so the remaining objects are collected at once
+                yield [obj for (row, column), cell_objects in self._cells.items()
+                       if max(abs(row - center_row), abs(column - center_column)) >= radius
+                       for obj in cell_objects.values()], math.inf
+                return
+
+            ring_objects = []
+            for row in range(center_row - radius, center_row + radius + 1):
+                step = 1 if row in (center_row - radius, center_row + radius) else 2 * radius
+                for column in range(center_column - radius, center_column + radius + 1, max(step, 1)):
+                    cell_objects = self._cells.get((row, column))
+                    if cell_objects is not None:
+                        ring_objects.extend(cell_objects.values())
+
+            yield ring_objects, self._distance_outside(lat, lon, center_row, center_column, radius)
+
+    def _distance_outside(self, lat, lon, center_row, center_column, radius):
+        """
+        :return: a lower bound of the distance from a point to the cells outside of the square of cells around it
+        :rtype: float
+        """
+
+        min_lat = (center_row - radius) * self.cell_size
+        max_lat = (center_row + radius + 1) * self.cell_size
+        min_lon = (center_column - radius) * self.cell_size
+        max_lon = (center_column + radius + 1) * self.cell_size
+
+        lat_gap = min(lat - min_lat, max_lat - lat)
+        # the objects across the antimeridian are in cells far away in the grid, so they are bounded by it instead
+        lon_gap = min(lon - min_lon, max_lon - lon, 180 - abs(lon))
+        # the distance to a meridian is measured along the great circle which crosses it at a right angle
+        lon_distance = EARTH_RADIUS * math.asin(min(1.0, math.cos(math.radians(lat)) *
+                                                    math.sin(math.radians(min(lon_gap, 90)))))
+        return min(EARTH_RADIUS * math.radians(lat_gap), lon_distance)
@@ -0,0 +1,257 @@
+import codecs
+import csv
+import io
+from concurrent.futures import ProcessPoolExecutor
+from zipfile import ZipFile
+
+from .time import parse_seconds
+
+# the minimal size of a stop_times.txt chunk which is parsed by a single worker
+MIN_CHUNK_SIZE = 4 * 1024 * 1024
+
+# the columns which are converted by the workers, so the main process receives ready values
+_CONVERTERS = {
+    "stop_times.txt": {"arrival_time": parse_seconds, "departure_time": parse_seconds, "stop_sequence": int,
+                       "pickup_type": int, "drop_off_type": int, "shape_dist_traveled": float, "timepoint": int},
+    "shapes.txt": {"shape_pt_lat": float, "shape_pt_lon": float, "shape_pt_sequence": int,
+                   "shape_dist_traveled": float},
+    "stops.txt": {"stop_lat": float, "stop_lon": float},
+}
+
+# encodings in which a newline byte may be a part of another character, so their files can't be split into chunks
+_UNCHUNKABLE_ENCODINGS = ("utf-16", "utf-32")
+
+
+def _convert_row(row, converters):
+    """
+    :type row: list[str]
+    :type converters: list[callable | None]
+    :rtype: tuple
+    """
+
+    for i, converter in enumerate(converters):
+        if converter is not None and i < len(row) and row[i]:
+            try:
+                row[i] = converter(row[i])
+            except ValueError:
+                # leave the raw value, the error is raised (or ignored) when the object is created
+                pass
+    return tuple(row)
+
+
+def read_member_rows(gtfs_file, member_name, encoding):
+    """
+    Tokenizes and converts the rows of a member of a GTFS archive.
+
+    :type gtfs_file: str
+    :type member_name: str
+    :type encoding: str
+    :return: the field names and the rows of the member
+    :rtype: (list[str], list[tuple])
+    """
+
+    with ZipFile(gtfs_file) as zip_file:
+        data = zip_file.read(member_name)
+    return parse_member_rows(data, member_name, encoding)
+
+
+def parse_member_rows(data, member_name, encoding, header=None):
+    """
+    Tokenizes and converts the rows of a member of a GTFS archive, or of a chunk of its records.
+
+    :param data: the whole records of the member, see split_records
+    :type data: bytes
+    :type member_name: str
+    :type encoding: str
+    :param header: the first record of the member, when the data doesn't start with it
+    :type header: bytes | None
+    :return: the field names and the rows of the data
+    :rtype: (list[str], list[tuple])
+    """
+
+    rows = csv.reader(io.StringIO(data.decode(encoding), newline=''))
+    if header is None:
+        fieldnames = next(rows, [])
+    else:
+        fieldnames = next(csv.reader(io.StringIO(header.decode(encoding), newline='')))
+
+    member_converters = _CONVERTERS.get(member_name, {})
+    converters = [member_converters.get(field) for field in fieldnames]
+    if any(converter is not None for converter in converters):
+        return fieldnames, [_convert_row(row, converters) for row in rows if row]
+    return fieldnames, [tuple(row) for row in rows if row]
+
+
+def _records_end(data):
+    """
+    :param data: bytes which start at the start of a record
+    :type data: bytes
+    :return: the position after the last line break of the data which isn't in a quoted value, or 0
+    :rtype: int
+    """
+
+    # a line break is between records when an even number of quotes precedes it, escaped quotes ("") are counted twice
+    quotes = data.count(b'"')
+    end = len(data)
+    while True:
+        line_break = data.rfind(b"\n", 0, end)
+        if line_break < 0:
+            return 0
+        quotes -= data.count(b'"', line_break, end)
+        end = line_break
+        if quotes % 2 == 0:
+            return line_break + 1
+
+
+def split_records(f, chunk_size):
+    """
+    Reads a member of a GTFS archive once, and splits it into chunks of whole records of about chunk_size bytes.
+    The chunks are split on the line breaks which aren't in quoted values, so a record is never split.
+
+    :type f: io.BufferedIOBase
+    :type chunk_size: int
+    :return: the chunks, the first chunk starts with the header of the member
+    :rtype: collections.Iterable[bytes]
+    """
+
+    pending = b""
+    while True:
+        block = f.read(chunk_size)
+        if not block:
+            break
+        pending += block
+        end = _records_end(pending)
+        if end > 0:
+            yield pending[:end]
+            pending = pending[end:]
+    if pending:
+        yield pending
+
+
+def _header_end(data):
+    """
+    :return: the position after the first record of the data
+    :rtype: int
+    """
+
+    line_break = data.find(b"\n")
+    while line_break >= 0 and data.count(b'"', 0, line_break) % 2:
+        line_break = data.find(b"\n", line_break + 1)
+    return len(data) if line_break < 0 else line_break + 1
+
+
+class GtfsMemberReader(object):
+    """
+    Reads the rows of the members of a GTFS archive in the current process.
+    """
+
+    def __init__(self, zip_file, encoding, stats=None):
+        """
+        :type zip_file: zipfile.ZipFile
+        :type encoding: gtfspy.utils.parsing.EncodingDetector
+        :param stats: when given, collects the decode and parse phases of every member, and the time spent by the
+                      consumer of its rows as the construct phase
+        :type stats: gtfspy.load_stats.LoadStats | None
+        """
+
+        self.zip_file = zip_file
+        self._encoding = encoding
+        self._stats = stats
+
+    def read(self, member_name):
+        """
+        :type member_name: str
+        :rtype: collections.Iterable[dict]
+        """
+
+        with self.zip_file.open(member_name, "r") as f:
+            if self._stats is None:
+                for row in csv.DictReader(self._encoding.decode(f)):
+                    yield row
+                return
+
+            with self._stats.measure(member_name, "decode"):
+                text_file = self._encoding.decode(f)
+            for row in self._stats.measure_rows(member_name, csv.DictReader(text_file)):
+                yield row
+
+    def close(self):
+        pass
+
+
+class ParallelGtfsMemberReader(GtfsMemberReader):
+    """
+    Reads the rows of the members of a GTFS archive in a pool of worker processes.
+
+    All the members are submitted to the pool on creation, and large members (stop_times.txt) are split into chunks
+    of records, so they are tokenized and converted concurrently while the main process wires the objects of the
+    members it already received. A large member is inflated once by the main process, which sends the chunks to the
+    workers (see split_records).
+    """
+
+    def __init__(self, zip_file, gtfs_file, encoding, workers, member_names, stats=None):
+        """
+        :type zip_file: zipfile.ZipFile
+        :type gtfs_file: str
+        :type encoding: gtfspy.utils.parsing.EncodingDetector
+        :type workers: int
+        :type member_names: list[str]
+        :param stats: see GtfsMemberReader, the parse phase of the members which are parsed by the workers is the
+                      time spent waiting for their rows
+        :type stats: gtfspy.load_stats.LoadStats | None
+        """
+
+        GtfsMemberReader.__init__(self, zip_file, encoding, stats)
+
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+        self._futures = {}
+        for member_name in member_names:
+            self._futures[member_name] = self._submit(gtfs_file, member_name, workers)
+
+    def _submit(self, gtfs_file, member_name, workers):
+        """
+        :return: the futures of the chunks of the member, in their order
+        :rtype: list[concurrent.futures.Future]
+        """
+
+        with self.zip_file.open(member_name, "r") as f:
+            encoding = self._encoding.detect(f.read(self._encoding.sample_size))
+
+        size = self.zip_file.getinfo(member_name).file_size
+        chunks_count = min(workers * 2, size // MIN_CHUNK_SIZE)
+        if chunks_count <= 1 or codecs.lookup(encoding).name.startswith(_UNCHUNKABLE_ENCODINGS):
+            return [self._executor.submit(read_member_rows, gtfs_file, member_name, encoding)]
+
+        futures = []
+        header = None
+        with self.zip_file.open(member_name, "r") as f:
+            for chunk in split_records(f, size // chunks_count):
+                futures.append(self._executor.submit(parse_member_rows, chunk, member_name, encoding, header))
+                if header is None:
+                    header = chunk[:_header_end(chunk)]
+        return futures
+
+    def read(self, member_name):
+        if member_name not in self._futures:
+            for row in GtfsMemberReader.read(self, member_name):
+                yield row
+            return
+
+        rows = self._read_futures(self._futures.pop(member_name))
+        if self._stats is not None:
+            rows = self._stats.measure_rows(member_name, rows)
+        for row in rows:
+            yield row
+
+    @staticmethod
+    def _read_futures(futures):
+        for future in futures:
+            fieldnames, rows = future.result()
+            for row in rows:
+                yield dict(zip(fieldnames, row))
+
+    def close(self):
+        for futures in self._futures.values():
+            for future in futures:
+                future.cancel()
+        self._executor.shutdown()
@@ -1,6 +1,17 @@
-import chardet
+import codecs
 import io
-from zipfile import ZipExtFile
+
+import chardet
+
+DEFAULT_ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# UTF-32 BOMs must be checked before the UTF-16 ones, since BOM_UTF32_LE starts with BOM_UTF16_LE
+_BOMS = [(codecs.BOM_UTF8, "utf-8-sig"),
+         (codecs.BOM_UTF32_LE, "utf-32"),
+         (codecs.BOM_UTF32_BE, "utf-32"),
+         (codecs.BOM_UTF16_LE, "utf-16"),
+         (codecs.BOM_UTF16_BE, "utf-16")]
+
 
 def str_to_bool(value):
     return bool(int(value))
@@ -36,3 +47,85 @@ def decode_file(csv_file):
     encoding = chardet.detect(content)['encoding']
     content = content.decode(encoding)
     return io.StringIO(content)
+
+
+class EncodingDetector(object):
+    """
+    Decides the encoding of the files of a single GTFS archive.
+
+    chardet is consulted only on the first sample_size bytes of a file, and its first non-ascii answer is cached and
+    reused for the rest of the archive. An explicit encoding skips the detection entirely.
+    """
+
+    def __init__(self, encoding=None, sample_size=DEFAULT_ENCODING_SAMPLE_SIZE):
+        """
+        :type encoding: str | None
+        :type sample_size: int
+        """
+
+        self.encoding = encoding
+        self.sample_size = sample_size
+        self._detected_encoding = None
+
+    def detect(self, sample):
+        """
+        :type sample: bytes
+        :rtype: str
+        """
+
+        if self.encoding is not None:
+            if sample.startswith(codecs.BOM_UTF8) and codecs.lookup(self.encoding).name == "utf-8":
+                return "utf-8-sig"
+            return self.encoding
+
+        for bom, encoding in _BOMS:
+            if sample.startswith(bom):
+                return encoding
+
+        if self._detected_encoding is not None:
+            return self._detected_encoding
+
+        encoding = chardet.detect(sample)['encoding']
+        # a pure ascii prefix says nothing about the rest of the file, and utf-8 is a superset of ascii
+        if encoding is None or encoding.lower() == "ascii":
+            return "utf-8"
+
+        self._detected_encoding = encoding
+        return encoding
+
+    def decode(self, binary_file):
+        """
+        Wraps a binary file with a text stream that decodes it incrementally.
+
+        :type binary_file: io.BufferedIOBase
+        :rtype: io.TextIOWrapper
+        """
+
+        buffered_file = io.BufferedReader(binary_file, buffer_size=self.sample_size)
+        encoding = self.detect(buffered_file.peek(self.sample_size)[:self.sample_size])
+        return io.TextIOWrapper(buffered_file, encoding=encoding, newline='')
+
+
+def detect_encoding(sample):
+    """
+    :type sample: bytes
+    :rtype: str
+    """
+
+    return EncodingDetector().detect(sample)
+
+
+def decode_stream(binary_file, encoding=None, sample_size=DEFAULT_ENCODING_SAMPLE_SIZE):
+    """
+    Wraps a binary file with a text stream that decodes it incrementally, detecting the encoding only from the first
+    sample_size bytes (a BOM is always honored).
+
+    :type binary_file: io.BufferedIOBase
+    :type encoding: str | EncodingDetector | None
+    :type sample_size: int
+    :rtype: io.TextIOWrapper
+    """
+
+    if not isinstance(encoding, EncodingDetector):
+        encoding = EncodingDetector(encoding, sample_size=sample_size)
+    return encoding.decode(binary_file)
@@ -0,0 +1,191 @@
+import io
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# the size from which the csv text of a member which is formatted by a worker thread is kept in a temporary file
+# instead of in memory
+MAX_IN_MEMORY_PART_SIZE = 16 * 1024 * 1024
+
+
+def open_text_member(zip_file, member_name):
+    """
+    Opens a new text member of a zip file for writing; the member is compressed as it's written.
+
+    :type zip_file: zipfile.ZipFile
+    :type member_name: str
+    :rtype: io.TextIOWrapper
+    """
+
+    # the size of the member is unknown in advance, so it may need the zip64 extension
+    return io.TextIOWrapper(zip_file.open(member_name, "w", force_zip64=True), encoding="utf-8", newline="")
+
+
+def write_member_part(member_name, save):
+    """
+    Formats the csv text of a single member into a temporary file, without compressing it.
+
+    :type member_name: str
+    :param save: writes the content of the member into a text file
+    :type save: callable
+    :return: the temporary file with the utf-8 encoded text, and the seconds it took to write it
+    :rtype: (tempfile.SpooledTemporaryFile, float)
+    """
+
+    start_time = time.perf_counter()
+    part = tempfile.SpooledTemporaryFile(max_size=MAX_IN_MEMORY_PART_SIZE)
+    f = io.TextIOWrapper(part, encoding="utf-8", newline="")
+    save(f)
+    f.flush()
+    f.detach()
+    return part, time.perf_counter() - start_time
+
+
+def copy_member_part(zip_file, member_name, part):
+    """
+    Compresses the text written by write_member_part into a new member of a zip file.
+
+    :type zip_file: zipfile.ZipFile
+    :type member_name: str
+    :type part: tempfile.SpooledTemporaryFile
+    :return: the seconds it took to compress the member
+    :rtype: float
+    """
+
+    start_time = time.perf_counter()
+    part.seek(0)
+    # the size of the member is unknown to the zip file in advance, so it may need the zip64 extension
+    with zip_file.open(member_name, "w", force_zip64=True) as f:
+        data = part.read(1024 * 1024)
+        while data:
+            f.write(data)
+            data = part.read(1024 * 1024)
+    return time.perf_counter() - start_time
+
+
+class _WriteCountingFile(object):
+    """
+    Counts the writes to a text file.
+    """
+
+    def __init__(self, f):
+        self._f = f
+        self.writes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return self._f.write(s)
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+
+class GtfsMemberWriter(object):
+    """
+    Writes the members of a GTFS archive one after another in the current thread.
+    """
+
+    def __init__(self, zip_file, timings=None, stats=None):
+        """
+        :type zip_file: zipfile.ZipFile
+        :param timings: when given, filled with the seconds it took to write each member
+        :type timings: dict[str, float] | None
+        :param stats: when given, collects the write phase and the rows of every member
+        :type stats: gtfspy.load_stats.LoadStats | None
+        """
+
+        self.zip_file = zip_file
+        self._timings = timings
+        self._stats = stats
+        # the rows written to each member, only counted when there are stats
+        self._rows = {}
+
+    def write(self, member_name, save):
+        """
+        :type member_name: str
+        :param save: writes the content of the member into a text file
+        :type save: callable
+        """
+
+        if self._stats is None:
+            start_time = time.perf_counter()
+            with open_text_member(self.zip_file, member_name) as f:
+                save(f)
+            self._add_timing(member_name, time.perf_counter() - start_time)
+            return
+
+        with self._stats.measure(member_name, "write"):
+            start_time = time.perf_counter()
+            with open_text_member(self.zip_file, member_name) as f:
+                self._count_rows(member_name, save)(f)
+            duration = time.perf_counter() - start_time
+        self._stats.add(member_name, "write", 0, self._rows[member_name])
+        self._add_timing(member_name, duration)
+
+    def _count_rows(self, member_name, save):
+        """
+        Wraps a save function so the rows it writes are counted, a csv writer writes every row with a single call.
+
+        :type member_name: str
+        :type save: callable
+        :rtype: callable
+        """
+
+        def save_counted(f):
+            counting_file = _WriteCountingFile(f)
+            save(counting_file)
+            # the header isn't a row
+            self._rows[member_name] = max(counting_file.writes - 1, 0)
+
+        return save_counted
+
+    def _add_timing(self, member_name, duration):
+        if self._timings is not None:
+            self._timings[member_name] = duration
+
+    def close(self):
+        pass
+
+
+class ParallelGtfsMemberWriter(GtfsMemberWriter):
+    """
+    Writes the members of a GTFS archive in a pool of threads.
+
+    The csv text of every member is formatted by a worker thread into a temporary file of its own, and the members are
+    compressed into the archive by the thread which closes the writer, in the order they were written, so the
+    compression of one member (zlib releases the GIL) overlaps the formatting of the members after it.
+    """
+
+    def __init__(self, zip_file, workers, timings=None, stats=None):
+        """
+        :type zip_file: zipfile.ZipFile
+        :type workers: int
+        :type timings: dict[str, float] | None
+        :param stats: see GtfsMemberWriter, the allocated bytes aren't collected since the members are written
+                      concurrently
+        :type stats: gtfspy.load_stats.LoadStats | None
+        """
+
+        GtfsMemberWriter.__init__(self, zip_file, timings, stats)
+
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._futures = []
+
+    def write(self, member_name, save):
+        if self._stats is not None:
+            save = self._count_rows(member_name, save)
+        self._futures.append((member_name, self._executor.submit(write_member_part, member_name, save)))
+
+    def close(self):
+        try:
+            for member_name, future in self._futures:
+                part, duration = future.result()
+                with part:
+                    duration += copy_member_part(self.zip_file, member_name, part)
+                self._add_timing(member_name, duration)
+                if self._stats is not None:
+                    self._stats.add(member_name, "write", duration, self._rows[member_name])
+        finally:
+            for _, future in self._futures:
+                future.cancel()
+            self._executor.shutdown()
@@ -1,4 +1,4 @@
-from datetime import timedelta
+from datetime import time, timedelta
 
 
 def parse_timedelta(time_string):
@@ -19,8 +19,68 @@ def str_timedelta(time_delta):
     """
     if time_delta is None:
         return ''
-    total_seconds = time_delta.total_seconds()
-    hours = total_seconds // (60 * 60)
-    minutes = (total_seconds % (60 * 60)) // 60
-    seconds = total_seconds % 60
-    return "%02d:%02d:%02d" % (hours, minutes, seconds)
+    return format_seconds(int(time_delta.total_seconds()))
+
+
+# two digits strings ("00" - "99") and their values, used by the fast path of parse_seconds and format_seconds
+_TWO_DIGITS_STRINGS = ["%02d" % (i,) for i in range(100)]
+_TWO_DIGITS_VALUES = {string: i for i, string in enumerate(_TWO_DIGITS_STRINGS)}
+
+
+def parse_seconds(time_string):
+    """
+    Parses a GTFS time ("HH:MM:SS", which may exceed 24:00:00) into seconds since the start of the service day
+    (noon minus 12h).
+
+    :type time_string: str | timedelta | int | None
+    :rtype: int | None
+    """
+
+    if isinstance(time_string, int):
+        return time_string
+    if isinstance(time_string, timedelta):
+        return int(time_string.total_seconds())
+
+    if not time_string:
+        return None
+
+    if len(time_string) == 8 and time_string[2] == ':' and time_string[5] == ':':
+        try:
+            return _TWO_DIGITS_VALUES[time_string[0:2]] * 3600 + _TWO_DIGITS_VALUES[time_string[3:5]] * 60 + \
+                   _TWO_DIGITS_VALUES[time_string[6:8]]
+        except KeyError:
+            pass
+
+    hours, minutes, seconds = map(int, time_string.split(':'))
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def format_seconds(seconds):
+    """
+    Formats seconds since the start of the service day as a GTFS time ("HH:MM:SS", which may exceed 24:00:00).
+
+    :type seconds: int | None
+    :rtype: str
+    """
+
+    if seconds is None:
+        return ''
+
+    hours = seconds // 3600
+    if 0 <= hours < 100:
+        return "%s:%s:%s" % (_TWO_DIGITS_STRINGS[hours], _TWO_DIGITS_STRINGS[seconds // 60 % 60],
+                             _TWO_DIGITS_STRINGS[seconds % 60])
+    return "%02d:%02d:%02d" % (hours, seconds // 60 % 60, seconds % 60)
+
+
+def parse_time_of_day(value):
+    """
+    Parses a time of a service day given by a user into seconds since its start.
+
+    :type value: str | timedelta | time | int
+    :rtype: int
+    """
+
+    if isinstance(value, time):
+        return value.hour * 3600 + value.minute * 60 + value.second
+    return parse_seconds(value)
@@ -0,0 +1,812 @@
+"""
+Bulk validation of a TransitData object.
+
+Every rule is checked over whole columns of values instead of object by object: the columns are gathered with C level
+helpers (attrgetter, itemgetter, map), and most rules are first checked on a column as a whole (by its minimum and
+maximum, its set of values or a single pass of map), so the rows of a column are only visited one by one when it has a
+violation. All the violations are collected into a ValidationReport instead of stopping at the first one.
+
+The speedup over checking the stop times one by one applies to columnar stop times: their columns are gathered
+straight from the arrays of a StopTimeTable, and they're validated several times faster than by checking a StopTimeRow
+per row (compare the validate_columnar and the validate_walk_columnar benchmarks). The StopTime objects of a
+TransitData without a StopTimeTable still have to be read one attribute at a time, so they're validated about as fast
+as by checking them one by one (compare the validate and the validate_walk benchmarks).
+"""
+
+import multiprocessing
+import time
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress
+from operator import attrgetter, gt, itemgetter
+
+from .load_stats import measure
+from .utils.validating import PICKUP_DROP_OFF_OPTIONS, TRUE_FALSE_OPTIONS, YES_NO_UNKNOWN_OPTIONS
+
+# a missing time in the time columns of the stop times, like in StopTimeTable
+MISSING_TIME = -1
+
+# the rules whose violations are reported without failing TransitData.validate, since GTFS files which break them
+# were always loaded
+WARNING_RULES = {"decreasing_times"}
+
+# the pickup and drop off types which are valid, a missing type (-1 in a StopTimeTable) is the default type
+_PICKUP_DROP_OFF_VALUES = set(PICKUP_DROP_OFF_OPTIONS) | {None, -1}
+_YES_NO_UNKNOWN_VALUES = set(YES_NO_UNKNOWN_OPTIONS) | {None}
+
+
+class Violation(object):
+    """
+    A single violation of a validation rule.
+    """
+
+    def __init__(self, member_name, rule, row, object_id, message):
+        """
+        :param member_name: the GTFS file of the violating object
+        :type member_name: str
+        :type rule: str
+        :param row: the index of the row of the object in the file written by TransitData.save (not counting the
+                    header), None when only a part of the file was validated
+        :type row: int | None
+        :param object_id: the id of the object, for a stop time the trip id and the stop sequence
+        :type object_id: str | tuple
+        :type message: str
+        """
+
+        self.member_name = member_name
+        self.rule = rule
+        self.row = row
+        self.object_id = object_id
+        self.message = message
+
+    @property
+    def is_error(self):
+        """
+        :rtype: bool
+        """
+
+        return self.rule not in WARNING_RULES
+
+    def __str__(self):
+        location = self.member_name if self.row is None else "%s:%d" % (self.member_name, self.row)
+        return "%s [%s] %s" % (location, self.rule, self.message)
+
+    def __repr__(self):
+        return "<Violation %s>" % (self,)
+
+
+class ValidationReport(object):
+    """
+    The violations found by validating a TransitData object, in the order they were found.
+    """
+
+    def __init__(self):
+        self.violations = []
+
+    def add(self, member_name, rule, row, object_id, message):
+        """
+        :type member_name: str
+        :type rule: str
+        :type row: int | None
+        :type object_id: str | tuple
+        :type message: str
+        """
+
+        self.violations.append(Violation(member_name, rule, row, object_id, message))
+
+    def extend(self, other):
+        """
+        :type other: ValidationReport
+        """
+
+        self.violations.extend(other.violations)
+
+    @property
+    def errors(self):
+        """
+        :rtype: list[Violation]
+        """
+
+        return [violation for violation in self.violations if violation.is_error]
+
+    @property
+    def warnings(self):
+        """
+        :rtype: list[Violation]
+        """
+
+        return [violation for violation in self.violations if not violation.is_error]
+
+    @property
+    def is_valid(self):
+        """
+        :return: whether there are no errors, the warnings are allowed
+        :rtype: bool
+        """
+
+        return all(not violation.is_error for violation in self.violations)
+
+    def count_by_rule(self):
+        """
+        :rtype: dict[str, int]
+        """
+
+        counts = {}
+        for violation in self.violations:
+            counts[violation.rule] = counts.get(violation.rule, 0) + 1
+        return counts
+
+    def __len__(self):
+        return len(self.violations)
+
+    def __iter__(self):
+        return iter(self.violations)
+
+    def __str__(self):
+        return "\n".join(str(violation) for violation in self.violations)
+
+
+class ValidationError(AssertionError):
+    """
+    Raised by TransitData.validate when the data has errors; it's an AssertionError, like the errors of the validate
+    methods of the objects.
+    """
+
+    def __init__(self, report):
+        """
+        :type report: ValidationReport
+        """
+
+        errors = report.errors
+        AssertionError.__init__(self, "%d validation errors, the first is: %s" % (len(errors), errors[0]))
+        self.report = report
+
+
+def _gather(column, rows):
+    """
+    :return: the values of a column in the given rows
+    :rtype: collections.Sequence
+    """
+
+    if not rows:
+        return ()
+    if len(rows) == 1:
+        return column[rows[0]],
+    return itemgetter(*rows)(column)
+
+
+# the names of the objects of each file in the messages of the violations
+_OBJECT_NAMES = {"agency.txt": "agency", "routes.txt": "route", "calendar.txt": "service", "trips.txt": "trip",
+                 "stops.txt": "stop", "fare_attributes.txt": "fare", "fare_rules.txt": "the fare rule of fare"}
+
+
+def describe(member_name, object_id):
+    """
+    :return: the name of an object in the messages of the violations
+    :rtype: str
+    """
+
+    if member_name == "stop_times.txt":
+        return "the stop time %s of trip %s" % (object_id[1], object_id[0])
+    if member_name == "shapes.txt" and isinstance(object_id, tuple):
+        return "the point %s of shape %s" % (object_id[1], object_id[0])
+    return "%s %s" % (_OBJECT_NAMES.get(member_name, "object"), object_id)
+
+
+def _row(first_row, index):
+    return None if first_row is None else first_row + index
+
+
+def _is_registered(collection, obj):
+    """
+    :return: whether the object is the object of its id in the collection
+    :rtype: bool
+    """
+
+    return obj.id in collection and collection[obj.id] is obj
+
+
+def _unregistered(objects, collection):
+    """
+    :param objects: objects and Nones, the objects are unhashable so they're compared by identity
+    :type objects: list
+    :type collection: gtfspy.data_objects.base_object.BaseGtfsObjectCollection
+    :return: the distinct objects which aren't the objects of their ids in the collection
+    :rtype: list
+    """
+
+    distinct_objects = dict(zip(map(id, objects), objects))
+    distinct_objects.pop(id(None), None)
+    # looking up a few objects is cheaper than collecting the identities of the whole collection
+    if len(distinct_objects) * 8 < len(collection):
+        return [obj for obj in distinct_objects.values() if not _is_registered(collection, obj)]
+
+    registered_ids = set(map(id, collection))
+    return [obj for object_id, obj in distinct_objects.items() if object_id not in registered_ids]
+
+
+def _check_coordinates(report, member_name, get_object_id, latitudes, longitudes, first_row):
+    """
+    :param get_object_id: returns the id of the object of a row, only called for the violating rows
+    :type get_object_id: callable
+    """
+
+    for name, values, limit in [("latitude", latitudes, 90.0), ("longitude", longitudes, 180.0)]:
+        # unlike min and max, the comparison finds the NaN values too
+        if not all(map(limit.__ge__, map(abs, values))):
+            for i, value in enumerate(values):
+                if not limit >= value >= -limit:
+                    report.add(member_name, "out_of_range", _row(first_row, i), get_object_id(i),
+                               "the %s %r of %s is out of range" % (name, value,
+                                                                    describe(member_name, get_object_id(i))))
+
+
+def _check_domain(report, member_name, get_object_id, values, valid_values, field_name, first_row):
+    if not set(values) <= valid_values:
+        for i, value in enumerate(values):
+            if value not in valid_values:
+                report.add(member_name, "invalid_value", _row(first_row, i), get_object_id(i),
+                           "the %s %r of %s is invalid" % (field_name, value, describe(member_name, get_object_id(i))))
+
+
+def _check_references(report, member_name, objects, field_name, collection, get_object_id, first_row):
+    """
+    Checks that the objects a field of the objects refers to are in their collection, every distinct object once.
+
+    :type objects: list
+    :type field_name: str
+    :type collection: gtfspy.data_objects.base_object.BaseGtfsObjectCollection
+    """
+
+    get_field = attrgetter(field_name)
+    for obj in _unregistered(list(map(get_field, objects)), collection):
+        for i, referring_object in enumerate(objects):
+            if get_field(referring_object) is obj:
+                report.add(member_name, "unknown_reference", _row(first_row, i), get_object_id(i),
+                           "the %s %s of %s doesn't exist" %
+                           (field_name, obj.id, describe(member_name, get_object_id(i))))
+
+
+def check_agencies(transit_data, agencies, report, first_row=0):
+    """
+    :type transit_data: gtfspy.transit_data_object.TransitData
+    :type agencies: list[gtfspy.data_objects.Agency]
+    :type report: ValidationReport
+    :param first_row: the row of the first object in its file, None when the rows are unknown
+    :type first_row: int | None
+    """
+
+    for i, agency in enumerate(agencies):
+        for line in agency.lines:
+            if not _is_registered(transit_data.agencies, line.agency):
+                report.add("agency.txt", "unknown_reference", _row(first_row, i), agency.id,
+                           "the agency %s of the line %s of agency %s isn't in the agencies" %
+                           (line.agency.id, line.line_number, agency.id))
+
+
+def check_routes(transit_data, routes, report, first_row=0):
+    """
+    :type transit_data: gtfspy.transit_data_object.TransitData
+    :type routes: list[gtfspy.data_objects.Route]
+    :type report: ValidationReport
+    :type first_row: int | None
+    """
+
+    _check_references(report, "routes.txt", routes, "agency", transit_data.agencies,
+                      lambda i: routes[i].id, first_row)
+
+
+def check_shapes(transit_data, shapes, report, first_row=0):
+    """
+    :type transit_data: gtfspy.transit_data_object.TransitData
+    :type shapes: list[gtfspy.data_objects.Shape]
+    :type report: ValidationReport
+    :type first_row: int | None
+    :return: the number of checked shape points
+    :rtype: int
+    """
+
+    # the points of shape i are offsets[i]:offsets[i + 1]
+    offsets = [0]
+    latitudes = []
+    longitudes = []
+    for shape in shapes:
+        if len(shape.shape_points) == 0:
+            report.add("shapes.txt", "empty_shape", _row(first_row, offsets[-1]), shape.id,
+                       "the shape %s has no points" % (shape.id,))
+        latitudes += map(attrgetter("latitude"), shape.shape_points)
+        longitudes += map(attrgetter("longitude"), shape.shape_points)
+        offsets.append(len(latitudes))
+
+    def get_object_id(i):
+        shape_index = bisect_right(offsets, i) - 1
+        return shapes[shape_index].id, shapes[shape_index].shape_points[i - offsets[shape_index]].sequence
+
+    _check_coordinates(report, "shapes.txt", get_object_id, latitudes, longitudes, first_row)
+    return len(latitudes)
+
+
+def check_calendar(transit_data, services, report, first_row=0):
+    """
+    :type transit_data: gtfspy.transit_data_object.TransitData
+    :type services: list[gtfspy.data_objects.Service]
+    :type report: ValidationReport
+    :type first_row: int | None
+    """
+
+    if any(map(gt, map(attrgetter("start_date"), services), map(attrgetter("end_date"), services))):
+        for i, service in enumerate(services):
+            if service.start_date > service.end_date:
+                report.add("calendar.txt", "end_before_start", _row(first_row, i), service.id,
+                           "the service %s ends before it starts" % (service.id,))
+
+
+def check_trips(transit_data, trips, report, first_row=0):
+    """
+    Checks the trips, without their stop times (see check_stop_times).
+
+    :type transit_data: gtfspy.transit_data_object.TransitData
+    :type trips: list[gtfspy.data_objects.Trip]
+    :type report: ValidationReport
+    :type first_row: int | None
+    """
+
+    def get_object_id(i):
+        return trips[i].id
+
+    for field_name, collection in [("route", transit_data.routes), ("service", transit_data.calendar),
+                                   ("shape", transit_data.shapes)]:
+        _check_references(report, "trips.txt", trips, field_name, collection, get_object_id, first_row)
+
+    for field_name in ["bikes_allowed", "wheelchair_accessible"]:
+        values = [trip.attributes.get(field_name) for trip in trips]
+        _check_domain(report, "trips.txt", get_object_id, values, _YES_NO_UNKNOWN_VALUES, field_name, first_row)
+
+
+def check_stops(transit_data, stops, report, first_row=0):
+    """
+    :type transit_data: gtfspy.transit_data_object.TransitData
+    :type stops: list[gtfspy.data_objects.Stop]
+    :type report: ValidationReport
+    :type first_row: int | None
+    """
+
+    def get_object_id(i):
+        return stops[i].id
+
+    _check_coordinates(report, "stops.txt", get_object_id, [stop.stop_lat for stop in stops],
+                       [stop.stop_lon for stop in stops], first_row)
+
+    attributes = [stop.attributes for stop in stops]
+    _check_domain(report, "stops.txt", get_object_id, [a.get("location_type", 0) for a in attributes],
+                  set(TRUE_FALSE_OPTIONS), "location_type", first_row)
+    _check_domain(report, "stops.txt", get_object_id, [a.get("wheelchair_boarding") for a in attributes],
+                  _YES_NO_UNKNOWN_VALUES, "wheelchair_boarding", first_row)
+
+    for i, stop in enumerate(stops):
+        parent_station = attributes[i].get("parent_station")
+        if parent_station is None:
+            continue
+        if stop.location_type == 1:
+            report.add("stops.txt", "parent_station", _row(first_row, i), stop.id,
+                       "the station %s has a parent station" % (stop.id,))
+        elif parent_station not in transit_data.stops or parent_station.location_type != 1:
+            report.add("stops.txt", "parent_station", _row(first_row, i), stop.id,
+                       "the parent station %s of stop %s isn't a station" % (parent_station.id, stop.id))
+
+
+def check_fare_attributes(transit_data, fare_attributes, report, first_row=0):
+    """
+    :type transit_data: gtfspy.transit_data_object.TransitData
+    :type fare_attributes: list[gtfspy.data_objects.FareAttribute]
+    :type report: ValidationReport
+    :type first_row: int | None
+    """
+
+    for i, fare in enumerate(fare_attributes):
+        if fare.price < 0 or fare.payment_method not in range(0, 2) or \
+                (fare.transfers is not None and fare.transfers not in range(0, 3)) or \
+                (fare.transfer_duration is not None and fare.transfer_duration < 0):
+            report.add("fare_attributes.txt", "invalid_value", _row(first_row, i), fare.id,
+                       "the price, payment method, transfers or transfer duration of fare %s is invalid" % (fare.id,))
+
+
+def check_fare_rules(transit_data, fare_rules, report, first_row=0):
+    """
+    :type transit_data: gtfspy.transit_data_object.TransitData
+    :type fare_rules: list[gtfspy.data_objects.FareRule]
+    :type report: ValidationReport
+    :type first_row: int | None
+    """
+
+    def get_object_id(i):
+        return fare_rules[i].fare.id
+
+    _check_references(report, "fare_rules.txt", fare_rules, "fare", transit_data.fare_attributes, get_object_id,
+                      first_row)
+    _check_references(report, "fare_rules.txt", fare_rules, "route", transit_data.routes, get_object_id, first_row)
+
+    for i, fare_rule in enumerate(fare_rules):
+        route = fare_rule.route
+        if route is not None and fare_rule.fare.agency is not None and route.agency is not fare_rule.fare.agency:
+            report.add("fare_rules.txt", "agency_mismatch", _row(first_row, i), get_object_id(i),
+                       "the route %s of %s belongs to another agency" %
+                       (route.id, describe("fare_rules.txt", get_object_id(i))))
+
+
+class StopTimeColumns(object):
+    """
+    The columns of the stop times of some trips which are validated in bulk, the rows of every trip are ordered by
+    their stop sequences and follow the rows of the previous trip.
+    """
+
+    def __init__(self):
+        self.trip_ids = []
+        # the rows of trip i are offsets[i]:offsets[i + 1]
+        self.offsets = [0]
+        self.stop_sequences = []
+        # the times are in seconds, MISSING_TIME when they're missing
+        self.arrivals = []
+        self.departures = []
+        self.pickup_types = []
+        self.drop_off_types = []
+
+    @classmethod
+    def from_trips(cls, transit_data, trips, report):
+        """
+        Gathers the columns of the stop times of the trips, and checks which trips and stops they refer to.
+
+        :type transit_data: gtfspy.transit_data_object.TransitData
+        :type trips: list[gtfspy.data_objects.Trip]
+        :type report: ValidationReport
+        :rtype: StopTimeColumns
+        """
+
+        columns = cls()
+        table = transit_data.stop_time_table
+        if table is not None:
+            rows, ends = table.trips_rows(trips)
+            columns.trip_ids = [trip.id for trip in trips]
+            columns.offsets += ends
+            columns.stop_sequences = _gather(table.stop_sequence, rows)
+            columns.arrivals = _gather(table.arrival_time, rows)
+            columns.departures = _gather(table.departure_time, rows)
+            columns.pickup_types = _gather(table.pickup_type, rows)
+            columns.drop_off_types = _gather(table.drop_off_type, rows)
+            # the rows of a trip always refer to it, so only the distinct stops are checked
+            row_trips = ()
+            row_stops = [table.stops[index] for index in set(_gather(table.stop_index, rows))]
+        else:
+            # a column of tuples would be tracked by the garbage collector, so every field is read in a pass of its own
+            row_trips = []
+            row_stops = []
+            for trip in trips:
+                stop_times = list(trip.stop_times)
+                columns.stop_sequences += map(attrgetter("stop_sequence"), stop_times)
+                columns.arrivals += map(attrgetter("_arrival_seconds"), stop_times)
+                columns.departures += map(attrgetter("_departure_seconds"), stop_times)
+                columns.pickup_types += map(attrgetter("_pickup_type"), stop_times)
+                columns.drop_off_types += map(attrgetter("_drop_off_type"), stop_times)
+                row_trips += map(attrgetter("trip"), stop_times)
+                row_stops += map(attrgetter("stop"), stop_times)
+                columns._add_trip(trip.id, len(columns.stop_sequences))
+            if None in columns.arrivals:
+                columns.arrivals = [MISSING_TIME if seconds is None else seconds for seconds in columns.arrivals]
+            if None in columns.departures:
+                columns.departures = [MISSING_TIME if seconds is None else seconds for seconds in columns.departures]
+
+        for field_name, objects, collection in [("trip", row_trips, transit_data.trips),
+                                                ("stop", row_stops, transit_data.stops)]:
+            for obj in _unregistered(objects, collection):
+                report.add("stop_times.txt", "unknown_reference", None, obj.id,
+                           "the %s %s of stop times doesn't exist" % (field_name, obj.id))
+
+        return columns
+
+    def _add_trip(self, trip_id, end):
+        self.trip_ids.append(trip_id)
+        self.offsets.append(end)
+
+    def __len__(self):
+        return self.offsets[-1]
+
+
+def check_stop_time_columns(columns, report, first_row=0):
+    """
+    Checks the values of the stop times, their times in every stop and along every trip.
+
+    :type columns: StopTimeColumns
+    :type report: ValidationReport
+    :type first_row: int | None
+    """
+
+    offsets = columns.offsets
+    sequences = columns.stop_sequences
+    arrivals = columns.arrivals
+    departures = columns.departures
+
+    def add(rule, i, message):
+        stop_time_id = columns.trip_ids[bisect_right(offsets, i) - 1], sequences[i]
+        report.add("stop_times.txt", rule, _row(first_row, i), stop_time_id,
+                   message % (describe("stop_times.txt", stop_time_id),))
+
+    for name, values in [("pickup_type", columns.pickup_types), ("drop_off_type", columns.drop_off_types)]:
+        if not set(values) <= _PICKUP_DROP_OFF_VALUES:
+            for i, value in enumerate(values):
+                if value not in _PICKUP_DROP_OFF_VALUES:
+                    add("invalid_value", i, "the %s %r of %%s is invalid" % (name, value))
+
+    if MISSING_TIME in arrivals or MISSING_TIME in departures:
+        for i in compress(range(len(sequences)), map((0).__eq__, sequences)):
+            if arrivals[i] == MISSING_TIME or departures[i] == MISSING_TIME:
+                add("missing_times", i, "%s has no arrival or departure time, but it's the first stop")
+
+    for i in compress(range(len(arrivals)), map(gt, arrivals, departures)):
+        if departures[i] != MISSING_TIME:
+            add("arrival_after_departure", i, "%s departs before it arrives")
+
+    # a decrease between the departure from a stop and the arrival at the next stop is found for all the trips at
+    # once; a missing time hides the decreases after it, so the trips of such candidates are scanned one by one
+    trip_ends = set(offsets[1:])
+    candidate_trips = set()
+    for i in compress(range(1, len(arrivals)), map(gt, departures[:-1], arrivals[1:])):
+        if i not in trip_ends:
+            candidate_trips.add(bisect_right(offsets, i) - 1)
+
+    for trip_index in sorted(candidate_trips):
+        last_seconds = MISSING_TIME
+        for i in range(offsets[trip_index], offsets[trip_index + 1]):
+            arrival = arrivals[i]
+            departure = departures[i]
+            seconds = arrival if arrival != MISSING_TIME else departure
+            if seconds != MISSING_TIME and seconds < last_seconds:
+                add("decreasing_times", i, "%s arrives before the previous stop time departs")
+            if arrival > last_seconds:
+                last_seconds = arrival
+            if departure > last_seconds:
+                last_seconds = departure
+
+
+def check_stop_times(transit_data, trips, report, first_row=0):
+    """
+    :type transit_data: gtfspy.transit_data_object.TransitData
+    :param trips: the trips whose stop times are checked
+    :type trips: list[gtfspy.data_objects.Trip]
+    :type report: ValidationReport
+    :type first_row: int | None
+    :return: the number of checked stop times
+    :rtype: int
+    """
+
+    columns = StopTimeColumns.from_trips(transit_data, trips, report)
+    check_stop_time_columns(columns, report, first_row)
+    return len(columns)
+
+
+# the members in the order they're validated, with the collection and the check of each; a check returns the number
+# of rows it checked when they aren't the objects of the collection
+_MEMBER_CHECKS = [
+    ("agency.txt", "agencies", check_agencies),
+    ("routes.txt", "routes", check_routes),
+    ("shapes.txt", "shapes", check_shapes),
+    ("calendar.txt", "calendar", check_calendar),
+    ("trips.txt", "trips", check_trips),
+    ("stop_times.txt", "trips", check_stop_times),
+    ("stops.txt", "stops", check_stops),
+    ("fare_attributes.txt", "fare_attributes", check_fare_attributes),
+    ("fare_rules.txt", "fare_rules", check_fare_rules),
+]
+
+# the collections which validate_dirty validates as a whole, since their objects are few, or are changed through
+# objects which don't refer back to them (the dates of a service, the points of a shape), so they aren't tracked
+FULLY_VALIDATED_COLLECTIONS = ("agencies", "routes", "shapes", "calendar", "fare_attributes", "fare_rules")
+
+# the members which are split into chunks that are validated by the workers, the other members are small
+_PARALLEL_MEMBERS = {"shapes.txt", "trips.txt", "stop_times.txt", "stops.txt"}
+
+# the fewest objects (trips, stops or shapes) which are validated by a single worker
+MIN_CHUNK_SIZE = 1000
+
+# the data which is validated by the worker processes, inherited from the main process when they're forked
+_worker_transit_data = None
+_worker_collections = None
+
+
+def _check_member(transit_data, member_name, check, objects, report, first_row, stats):
+    with measure(stats, member_name, "validate"):
+        rows = check(transit_data, objects, report, first_row)
+    if stats is not None:
+        stats.add(member_name, "validate", 0, len(objects) if rows is None else rows)
+
+
+def validate_transit_data(transit_data, stats=None, workers=None):
+    """
+    Validates all the data, the stop times are validated considerably faster when they're kept in a StopTimeTable
+    (see the docstring of this module).
+
+    :type transit_data: gtfspy.transit_data_object.TransitData
+    :param stats: when given, collects the validate phase of every file; with workers the seconds of the files which
+                  are validated by the workers are the seconds the workers spent on them
+    :type stats: gtfspy.load_stats.LoadStats | None
+    :param workers: the number of worker processes which validate chunks of the trips (with their stop times), the
+                    stops and the shapes concurrently. The workers are forked, so they share the data of this process
+                    without copying it; on platforms which can't fork the data is validated in this process
+    :type workers: int | None
+    :return: all the violations of the data
+    :rtype: ValidationReport
+    """
+
+    collections = {collection_name: list(getattr(transit_data, collection_name))
+                   for _, collection_name, _ in _MEMBER_CHECKS}
+
+    if workers is not None and workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        return _validate_in_workers(transit_data, collections, workers, stats)
+
+    report = ValidationReport()
+    for member_name, collection_name, check in _MEMBER_CHECKS:
+        _check_member(transit_data, member_name, check, collections[collection_name], report, 0, stats)
+    return report
+
+
+def validate_dirty(transit_data, dirty, stats=None):
+    """
+    Validates only the objects which were added, changed or removed since the data was last validated: the added and
+    changed objects, and the objects which refer to the removed objects (and may now refer to objects which don't
+    exist). The objects which refer to an added or changed object aren't validated again, since the checks of an object
+    only check that the objects it refers to exist, except for the children of a changed station, whose checks read its
+    location type. The small collections (see FULLY_VALIDATED_COLLECTIONS) are always validated as a whole.
+
+    :type transit_data: gtfspy.transit_data_object.TransitData
+    :param dirty: the added, changed and removed objects by the names of their collections and by their identities
+    :type dirty: dict[str, dict[int, object]]
+    :param stats: when given, collects the validate phase of every file
+    :type stats: gtfspy.load_stats.LoadStats | None
+    :return: the violations of the validated objects, whose rows are unknown
+    :rtype: ValidationReport
+    """
+
+    candidates = {collection_name: {} for _, collection_name, _ in _MEMBER_CHECKS}
+    for collection_name in FULLY_VALIDATED_COLLECTIONS:
+        candidates[collection_name].update((id(obj), obj) for obj in getattr(transit_data, collection_name))
+    for collection_name, dirty_objects in dirty.items():
+        objects = list(dirty_objects.values())
+        candidates[collection_name].update(dirty_objects)
+        registered_ids = set(map(id, _registered(objects, getattr(transit_data, collection_name))))
+        removed = [obj for obj in objects if id(obj) not in registered_ids]
+        # the children of a changed station are validated again too, since their checks read its location type
+        referred = objects if collection_name == "stops" else removed
+        for referring_collection_name, referring_objects in _referring_objects(transit_data, collection_name, referred):
+            candidates[referring_collection_name].update(zip(map(id, referring_objects), referring_objects))
+
+    report = ValidationReport()
+    for member_name, collection_name, check in _MEMBER_CHECKS:
+        objects = _registered(list(candidates[collection_name].values()), getattr(transit_data, collection_name))
+        if objects:
+            _check_member(transit_data, member_name, check, objects, report, None, stats)
+    return report
+
+
+def _referring_objects(transit_data, collection_name, removed):
+    """
+    :param removed: objects which were removed from a collection (or changed, for the stops)
+    :type removed: list
+    :return: the objects which refer to the removed objects, by the names of their collections
+    :rtype: list[(str, list)]
+    """
+
+    if not removed:
+        return []
+
+    removed_ids = set(map(id, removed))
+    if collection_name == "agencies":
+        return [("routes", [route for agency in removed for line in agency.lines for route in line.routes.values()])]
+    if collection_name == "routes":
+        return [("trips", [trip for route in removed for trip in route.trips]),
+                ("fare_rules", [fare_rule for fare_rule in transit_data.fare_rules
+                                if id(fare_rule.route) in removed_ids])]
+    if collection_name in ("shapes", "calendar"):
+        return [("trips", [trip for obj in removed for trip in obj.trips])]
+    if collection_name == "stops":
+        return [("stops", [stop for stop in transit_data.stops
+                           if id(stop.attributes.get("parent_station")) in removed_ids])]
+    if collection_name == "fare_attributes":
+        return [("fare_rules", [fare_rule for fare in removed for fare_rule in fare.fare_rules])]
+    return []
+
+
+def _registered(objects, collection):
+    """
+    :return: the objects which are in the collection, the fare rules (which have no ids) are found by their identities
+    :rtype: list
+    """
+
+    if not objects:
+        return []
+    if not hasattr(objects[0], "id"):
+        registered_ids = set(map(id, collection))
+        return [obj for obj in objects if id(obj) in registered_ids]
+
+    unregistered_ids = set(map(id, _unregistered(objects, collection)))
+    return [obj for obj in objects if id(obj) not in unregistered_ids]
+
+
+def _validate_in_workers(transit_data, collections, workers, stats):
+    """
+    :type transit_data: gtfspy.transit_data_object.TransitData
+    :type collections: dict[str, list]
+    :type workers: int
+    :type stats: gtfspy.load_stats.LoadStats | None
+    :rtype: ValidationReport
+    """
+
+    if transit_data.stop_time_table is not None:
+        # loads and indexes the stop times once, before the workers are forked
+        transit_data.stop_time_table.trips_rows([])
+
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"),
+                                   initializer=_init_worker, initargs=(transit_data, collections))
+    futures = {}
+    try:
+        for member_name, collection_name, _ in _MEMBER_CHECKS:
+            if member_name in _PARALLEL_MEMBERS:
+                size = len(collections[collection_name])
+                chunk_size = max(MIN_CHUNK_SIZE, -(-size // (workers * 4)))
+                futures[member_name] = [executor.submit(_check_chunk, member_name, start, min(start + chunk_size, size))
+                                        for start in range(0, size, chunk_size)]
+
+        # the small members are validated while the workers validate the chunks
+        report = ValidationReport()
+        for member_name, collection_name, check in _MEMBER_CHECKS:
+            if member_name not in futures:
+                _check_member(transit_data, member_name, check, collections[collection_name], report, 0, stats)
+                continue
+
+            first_row = 0
+            reported = set()
+            for future in futures[member_name]:
+                chunk_report, rows, seconds = future.result()
+                for violation in chunk_report:
+                    if violation.row is not None:
+                        violation.row += first_row
+                    else:
+                        # a violation without a row (a missing stop of some stop times) may be found by every chunk
+                        key = (violation.rule, violation.object_id, violation.message)
+                        if key in reported:
+                            continue
+                        reported.add(key)
+                    report.violations.append(violation)
+                first_row += rows
+                if stats is not None:
+                    stats.add(member_name, "validate", seconds, rows)
+        return report
+    finally:
+        for member_futures in futures.values():
+            for future in member_futures:
+                future.cancel()
+        executor.shutdown()
+
+
+def _init_worker(transit_data, collections):
+    global _worker_transit_data, _worker_collections
+    _worker_transit_data = transit_data
+    _worker_collections = collections
+
+
+def _check_chunk(member_name, start, end):
+    """
+    Validates a chunk of the objects of a member in a worker process.
+
+    :type member_name: str
+    :type start: int
+    :type end: int
+    :return: the violations of the chunk (their rows start from the first row of the chunk), the number of rows
+             which were checked, and the seconds it took
+    :rtype: (ValidationReport, int, float)
+    """
+
+    start_time = time.perf_counter()
+    collection_name, check = next((collection_name, check) for name, collection_name, check in _MEMBER_CHECKS
+                                  if name == member_name)
+    report = ValidationReport()
+    rows = check(_worker_transit_data, _worker_collections[collection_name][start:end], report, 0)
+    return report, end - start if rows is None else rows, time.perf_counter() - start_time
@@ -0,0 +1,217 @@
+"""
+Times the main operations of gtfspy on synthetic GTFS files, and tracks their peak memory.
+
+Run from the tests directory:
+
+    python -m benchmarks.run_benchmarks --scale 4 --output results.json
+    python -m benchmarks.run_benchmarks --scale 4 --compare results.json
+
+With --compare the run fails when a benchmark is slower (or allocates more) than in the given results by more than
+the threshold.
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from gtfspy import TransitData, clone_transit_data, create_partial_transit_data, load_partial_transit_data
+from gtfspy.routing import Timetable
+from test_utils.synthetic_gtfs import write_synthetic_gtfs
+
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 1.25
+# the number of random journeys which are planned by the earliest_arrival benchmark
+ROUTING_QUERIES = 200
+
+
+class BenchmarkContext(object):
+    """
+    The synthetic GTFS file the benchmarks run on, and the transit data loaded from it.
+    """
+
+    def __init__(self, scale=1, seed=0):
+        """
+        :param scale: the number of agencies of the synthetic file, every agency adds 10 routes of 20 trips
+        :type scale: int
+        :type seed: int
+        """
+
+        self._temp_dir = tempfile.mkdtemp()
+        self.gtfs_file = os.path.join(self._temp_dir, "synthetic_gtfs.zip")
+        self.rows = write_synthetic_gtfs(self.gtfs_file, agencies=scale, seed=seed)
+        self.transit_data = TransitData(self.gtfs_file)
+        self.columnar_transit_data = TransitData(self.gtfs_file, columnar_stop_times=True)
+        self.agency_id = next(iter(self.transit_data.agencies)).id
+        # the timetables of the routing benchmarks are built for the first date of the service with the most dates
+        service = max(self.transit_data.calendar,
+                      key=lambda service: len(service.active_dates(service.start_date, service.end_date)))
+        self.service_date = service.active_dates(service.start_date, service.end_date)[0]
+
+    def close(self):
+        shutil.rmtree(self._temp_dir, ignore_errors=True)
+
+
+def _no_setup(context):
+    return None
+
+
+def _clone(context):
+    return clone_transit_data(context.transit_data)
+
+
+def _validate_stop_times_one_by_one(transit_data):
+    # the reference of the validate benchmarks, the stop times are checked by their own validate methods
+    for trip in transit_data.trips:
+        for stop_time in trip.stop_times:
+            stop_time.validate(transit_data)
+
+
+def _timetable_queries(context):
+    timetable = Timetable(context.transit_data, context.service_date, footpath_radius=200)
+    generator = random.Random(0)
+    queries = [tuple(stop.id for stop in generator.sample(timetable.stops, 2)) + (generator.randint(0, 24 * 3600),)
+               for _ in range(ROUTING_QUERIES)]
+    return timetable, queries
+
+
+def _plan_journeys(timetable, queries):
+    for from_stop_id, to_stop_id, departure_seconds in queries:
+        timetable.earliest_arrival(from_stop_id, to_stop_id, departure_seconds)
+
+
+# the benchmarks by their names, each is a setup function (which isn't measured) and the measured function of the
+# context and the value returned by the setup
+BENCHMARKS = [
+    ("load_gtfs_file", _no_setup, lambda context, _: TransitData(context.gtfs_file)),
+    ("load_gtfs_file_columnar", _no_setup,
+     lambda context, _: TransitData(context.gtfs_file, columnar_stop_times=True)),
+    ("save", _no_setup, lambda context, _: context.transit_data.save(io.BytesIO(), validate=False)),
+    ("clone_transit_data", _no_setup, lambda context, _: clone_transit_data(context.transit_data)),
+    ("create_partial_transit_data", _no_setup,
+     lambda context, _: create_partial_transit_data(context.transit_data, {context.agency_id: None})),
+    ("load_partial_transit_data", _no_setup,
+     lambda context, _: load_partial_transit_data(context.gtfs_file, {context.agency_id: None})),
+    ("validate", _no_setup, lambda context, _: context.transit_data.validate(force=True)),
+    ("validate_columnar", _no_setup, lambda context, _: context.columnar_transit_data.validate(force=True)),
+    ("validate_walk", _no_setup,
+     lambda context, _: _validate_stop_times_one_by_one(context.transit_data)),
+    ("validate_walk_columnar", _no_setup,
+     lambda context, _: _validate_stop_times_one_by_one(context.columnar_transit_data)),
+    ("clean", _clone, lambda context, transit_data: transit_data.clean()),
+    ("compact_stop_times", lambda context: TransitData(context.gtfs_file, columnar_stop_times=True),
+     lambda context, transit_data: transit_data.stop_time_table.compact()),
+    ("build_timetable", _no_setup,
+     lambda context, _: Timetable(context.transit_data, context.service_date, footpath_radius=200)),
+    ("earliest_arrival", _timetable_queries, lambda context, timetable_queries: _plan_journeys(*timetable_queries)),
+]
+
+
+def _measure(context, setup, benchmark, repeat):
+    durations = []
+    for _ in range(repeat):
+        value = setup(context)
+        gc.collect()
+        start_time = time.perf_counter()
+        benchmark(context, value)
+        durations.append(time.perf_counter() - start_time)
+
+    # the memory is traced in a separate run, since tracing slows down the measured code
+    value = setup(context)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        benchmark(context, value)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"best_seconds": min(durations), "mean_seconds": sum(durations) / len(durations),
+            "peak_bytes": peak_bytes}
+
+
+def run_benchmarks(scale=1, repeat=DEFAULT_REPEAT, names=None, seed=0):
+    """
+    :param scale: the number of agencies of the synthetic file, see BenchmarkContext
+    :type scale: int
+    :param repeat: the number of timed runs of each benchmark
+    :type repeat: int
+    :param names: the benchmarks to run, all of them when it's None
+    :type names: list[str] | None
+    :type seed: int
+    :return: the best and mean seconds and the peak traced bytes of each benchmark, and the rows of the file
+    :rtype: dict
+    """
+
+    assert repeat > 0
+
+    context = BenchmarkContext(scale=scale, seed=seed)
+    try:
+        results = {}
+        for name, setup, benchmark in BENCHMARKS:
+            if names is None or name in names:
+                results[name] = _measure(context, setup, benchmark, repeat)
+        return {"scale": scale, "rows": context.rows, "benchmarks": results}
+    finally:
+        context.close()
+
+
+def compare_results(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    :return: the descriptions of the benchmarks which regressed from the baseline by more than the threshold
+    :rtype: list[str]
+    """
+
+    regressions = []
+    for name, result in sorted(results["benchmarks"].items()):
+        baseline_result = baseline["benchmarks"].get(name)
+        if baseline_result is None:
+            continue
+        for key in ["best_seconds", "peak_bytes"]:
+            if baseline_result[key] > 0 and result[key] > baseline_result[key] * threshold:
+                regressions.append("%s: %s %.6g -> %.6g (x%.2f)" % (name, key, baseline_result[key], result[key],
+                                                                    result[key] / baseline_result[key]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks gtfspy on synthetic GTFS files")
+    parser.add_argument("-s", "--scale", type=int, default=1, help="the number of agencies of the synthetic file")
+    parser.add_argument("-r", "--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("-b", "--benchmark", action="append", dest="names",
+                        help="a benchmark to run (may be repeated), all of them by default")
+    parser.add_argument("-o", "--output", help="write the results to this json file")
+    parser.add_argument("-c", "--compare", help="fail on regressions from the results in this json file")
+    parser.add_argument("-t", "--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args()
+    results = run_benchmarks(scale=args.scale, repeat=args.repeat, names=args.names)
+
+    print("%d stop times, %d trips" % (results["rows"]["stop_times.txt"], results["rows"]["trips.txt"]))
+    for name, result in results["benchmarks"].items():
+        print("%-30s best %8.4fs  mean %8.4fs  peak %10.1f KiB" %
+              (name, result["best_seconds"], result["mean_seconds"], result["peak_bytes"] / 1024.0))
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        for regression in regressions:
+            print("regression: %s" % (regression,))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
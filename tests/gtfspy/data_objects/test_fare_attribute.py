@@ -185,4 +185,17 @@ class TestFareAttributeCollection(unittest.TestCase):
         td.fare_attributes.clean()
         self.assertNotIn(fare_attribute, td.fare_attributes)
 
+    def test_fare_rules(self):
+        td = create_full_transit_data()
+        fare_attribute = td.fare_attributes['1']
+        self.assertEqual(len(fare_attribute.fare_rules), 3)
+
+        fare_rule = fare_attribute.fare_rules[0]
+        td.fare_rules.remove(fare_rule, clean_after=False)
+        self.assertEqual(len(fare_attribute.fare_rules), 2)
+
+        td.fare_attributes.remove(fare_attribute, recursive=True, clean_after=False)
+        self.assertNotIn(fare_attribute, td.fare_attributes)
+        self.assertEqual(len([fare_rule for fare_rule in td.fare_rules if fare_rule.fare is fare_attribute]), 0)
+
     # TODO: test load from file
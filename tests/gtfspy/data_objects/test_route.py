@@ -1,4 +1,5 @@
 import unittest
+from datetime import timedelta
 
 from test_utils.create_gtfs_object import create_full_transit_data
 from test_utils.test_case_utils import test_property, test_attribute
@@ -131,6 +132,38 @@ class TestRoute(unittest.TestCase):
         edited_route.attributes["test_attribute2"] = "new test data"
         self.assertNotEqual(original_route, edited_route)
 
+    def test_patterns(self):
+        td = create_full_transit_data()
+        route = td.routes["1002"]
+        self.assertEqual(len(route.patterns), 1)
+        pattern = route.patterns[0]
+        self.assertListEqual([trip.id for trip in pattern.trips], ["1002_1", "1002_2", "1002_3", "1002_4"])
+        self.assertListEqual([stop.id for stop in pattern.stops], ["20000", "10001"])
+        self.assertIs(route.first_stop, td.stops["20000"])
+        self.assertIs(route.last_stop, td.stops["10001"])
+
+        # the trips which run at the same pace share their profile
+        self.assertEqual(pattern.trip_profiles[0], pattern.trip_profiles[1])
+        self.assertEqual(len(pattern.profiles), 2)
+        for trip_index, trip in enumerate(pattern.trips):
+            self.assertEqual(pattern.get_trip_seconds(trip_index),
+                             ([stop_time.arrival_seconds for stop_time in trip.stop_times],
+                              [stop_time.departure_seconds for stop_time in trip.stop_times]))
+
+        # the patterns of a route are only built again when its trips change
+        patterns = route.patterns
+        td.trips.remove(td.trips["1001_1"], recursive=True, clean_after=False)
+        self.assertIs(route.patterns, patterns)
+
+        td.trips.add(trip_id="1002_5", route_id="1002", service_id=1)
+        for stop_sequence, stop_id in enumerate(["20000", "30000", "10001"]):
+            td.add_stop_time(trip_id="1002_5", arrival_time=timedelta(hours=10 + stop_sequence),
+                             departure_time=timedelta(hours=10 + stop_sequence), stop_id=stop_id,
+                             stop_sequence=stop_sequence)
+        self.assertListEqual([len(pattern) for pattern in route.patterns], [4, 1])
+        self.assertListEqual([stop.id for stop in route.patterns[1].stops], ["20000", "30000", "10001"])
+        self.assertListEqual(route.stops, list(pattern.stops))
+
 
 class TestRouteCollection(unittest.TestCase):
     def test_add(self):
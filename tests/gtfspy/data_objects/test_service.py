@@ -2,6 +2,7 @@ import unittest
 from datetime import date, timedelta
 
 from gtfspy import TransitData
+from test_utils.create_gtfs_object import create_full_transit_data
 from test_utils.test_case_utils import test_property
 
 TODAY_DATE = date.today()
@@ -145,6 +146,30 @@ class TestService(unittest.TestCase):
         edited_service.attributes["test_attribute2"] = "new test data"
         self.assertNotEqual(original_service, edited_service)
 
+    def test_active_dates(self):
+        td = TransitData()
+        # 2020-01-05 is a sunday
+        service = td.calendar.add(service_id='1', start_date="20200101", end_date="20200131", sunday=1, monday=1)
+        td.add_service_date(service_id='1', date="20200106", exception_type=2)
+        td.add_service_date(service_id='1', date="20200110", exception_type=1)
+        td.add_service_date(service_id='1', date="20200301", exception_type=1)
+
+        expected = [date(2020, 1, 5), date(2020, 1, 10), date(2020, 1, 12), date(2020, 1, 13), date(2020, 1, 19),
+                    date(2020, 1, 20), date(2020, 1, 26), date(2020, 1, 27), date(2020, 3, 1)]
+        self.assertEqual(service.active_dates(date(2019, 12, 1), date(2020, 12, 31)), expected)
+        self.assertEqual(service.active_dates(date(2020, 1, 6), date(2020, 1, 12)),
+                         [date(2020, 1, 10), date(2020, 1, 12)])
+        for day in range(-40, 100):
+            d = date(2020, 1, 1) + timedelta(days=day)
+            self.assertEqual(service.is_active_on(d), d in expected)
+
+        service.tuesday = True
+        self.assertTrue(service.is_active_on(date(2020, 1, 7)))
+        service.end_date = date(2020, 1, 7)
+        self.assertFalse(service.is_active_on(date(2020, 1, 12)))
+        td.add_service_date(service_id='1', date="20200105", exception_type=2)
+        self.assertFalse(service.is_active_on(date(2020, 1, 5)))
+
 
 class TestServiceCollection(unittest.TestCase):
     def test_add(self):
@@ -206,4 +231,15 @@ class TestServiceCollection(unittest.TestCase):
         td.calendar.clean()
         self.assertEqual(len(td.calendar), 0)
 
+    def test_remove_recursive(self):
+        td = create_full_transit_data()
+        service = td.calendar['1']
+        trips = service.trips
+        self.assertGreater(len(trips), 0)
+
+        td.calendar.remove(service, recursive=True)
+        self.assertNotIn(service, td.calendar)
+        for trip in trips:
+            self.assertNotIn(trip, td.trips)
+
     # TODO: test load from file
@@ -1,6 +1,7 @@
 import unittest
 
 from gtfspy import TransitData
+from test_utils.create_gtfs_object import create_full_transit_data
 from test_utils.test_case_utils import test_property
 
 MINI_SHAPE_CSV_ROWS = [dict(shape_id='1', shape_pt_lat=31.789467, shape_pt_lon=35.203715, shape_pt_sequence=0),
@@ -140,7 +141,8 @@ class TestShapeCollection(unittest.TestCase):
                 self.assertEqual(shape_point.shape_dist_traveled, row.get("shape_dist_traveled"))
                 self.assertEqual(shape_point.attributes.get("test_attribute"), row.get("test_attribute"))
 
-                self.assertEqual(len(shape_point.attributes), len(row) - 4)
+                # shape_dist_traveled is a known field, so it is not kept in the extra attributes
+                self.assertEqual(len(shape_point.attributes), len(row) - 4 - ("shape_dist_traveled" in row))
 
                 # self.assertRaises(Exception, td.shapes.add, **row)
                 self.assertEqual(len(td.shapes), 1)
@@ -192,4 +194,16 @@ class TestShapeCollection(unittest.TestCase):
         td.shapes.clean()
         self.assertEqual(len(td.shapes), 0)
 
+    def test_remove_recursive(self):
+        td = create_full_transit_data()
+        shape = td.shapes['1']
+        trips = shape.trips
+        self.assertGreater(len(trips), 0)
+
+        self.assertRaises(AssertionError, td.shapes.remove, shape)
+        td.shapes.remove(shape, recursive=True)
+        self.assertNotIn(shape, td.shapes)
+        for trip in trips:
+            self.assertNotIn(trip, td.trips)
+
     # TODO: test load from file
@@ -1,6 +1,10 @@
 import unittest
+from datetime import date, time, timedelta
 
+import constants
 from gtfspy import TransitData
+from gtfspy.utils.geo import haversine_distance
+from test_utils.create_gtfs_object import create_full_transit_data
 from test_utils.test_case_utils import test_property
 
 MINI_STOP_CSV_ROWS = [dict(stop_id='1', stop_name="stop name", stop_lat=31.789467, stop_lon=35.203715)]
@@ -263,4 +267,93 @@ class TestStopCollection(unittest.TestCase):
         td.stops.clean()
         self.assertEqual(len(td.stops), 0)
 
+    def test_zones(self):
+        td = create_full_transit_data()
+        self.assertEqual(td.stops.zone_ids, {"1", "2", "3"})
+        self.assertEqual({stop.id for stop in td.stops.get_zone_stops("1")}, {"10000", "10001"})
+
+        td.stops["30000"].zone_id = "2"
+        self.assertEqual(td.stops.zone_ids, {"1", "2"})
+        self.assertEqual({stop.id for stop in td.stops.get_zone_stops("2")}, {"20000", "30000"})
+
+        td.stops.remove("30000", recursive=True, clean_after=False)
+        self.assertEqual({stop.id for stop in td.stops.get_zone_stops("2")}, {"20000"})
+
+    def test_spatial_queries(self):
+        td = TransitData(gtfs_file=constants.GTFS_MINI_REAL_FILE)
+        stops = list(td.stops)
+        stop = stops[0]
+        lat, lon = stop.stop_lat + 0.003, stop.stop_lon - 0.002
+
+        def distance(other_stop):
+            return haversine_distance(lat, lon, other_stop.stop_lat, other_stop.stop_lon)
+
+        by_distance = [distance(other_stop) for other_stop in sorted(stops, key=distance)]
+        for k in [0, 1, 5, len(stops) + 1]:
+            self.assertListEqual([distance(other_stop) for other_stop in td.stops.nearest(lat, lon, k)],
+                                 by_distance[:k])
+
+        for meters in [0, 500, 2000]:
+            self.assertSetEqual({other_stop.id for other_stop in td.stops.within_radius(lat, lon, meters)},
+                                {other_stop.id for other_stop in stops if distance(other_stop) <= meters})
+
+        min_lat, min_lon, max_lat, max_lon = lat - 0.01, lon - 0.01, lat + 0.01, lon + 0.01
+        self.assertSetEqual({other_stop.id for other_stop in td.stops.within_bbox(min_lat, min_lon, max_lat, max_lon)},
+                            {other_stop.id for other_stop in stops if min_lat <= other_stop.stop_lat <= max_lat and
+                             min_lon <= other_stop.stop_lon <= max_lon})
+
+        stop.stop_lat, stop.stop_lon = -lat, -lon
+        self.assertIs(td.stops.nearest(-lat, -lon)[0], stop)
+        self.assertNotIn(stop, td.stops.within_radius(stop.stop_lat, stop.stop_lon - 0.01, 100))
+
+        td.stops.remove(stop, recursive=True, clean_after=False)
+        self.assertListEqual(td.stops.within_radius(-lat, -lon, 1000), [])
+
+    def test_nan_coordinates(self):
+        td = create_full_transit_data()
+        stop = td.stops.add(stop_id="nan", stop_name="stop name", stop_lat=float("nan"), stop_lon=35.203715)
+        self.assertIs(td.stops["nan"], stop)
+        self.assertEqual(td.validation_report().count_by_rule(), {"out_of_range": 1})
+        self.assertNotIn(stop, td.stops.nearest(31.789467, 35.203715, len(td.stops)))
+
+        other_stop = td.stops["20000"]
+        other_stop.stop_lat = float("nan")
+        self.assertNotIn(other_stop, td.stops.nearest(31.789467, 35.203715, len(td.stops)))
+        other_stop.stop_lat = 31.789467
+        self.assertIn(other_stop, td.stops.within_radius(31.789467, other_stop.stop_lon, 10))
+
+        td.stops.remove(stop, clean_after=False)
+        self.assertNotIn("nan", td.stops)
+
+    def test_departures(self):
+        td = create_full_transit_data()
+        stop = td.stops["20000"]
+        # a tuesday, so the trips of service 1 of the previous day are active
+        service_date = date.today() + timedelta(days=1)
+        while (service_date - timedelta(days=1)).weekday() != 0:
+            service_date += timedelta(days=1)
+
+        departures = stop.departures(service_date)
+        self.assertEqual(departures[0][0], service_date - timedelta(days=1))
+        self.assertEqual(departures[0][1].trip.id, "1003_1")
+        self.assertEqual(departures[0][1].departure_time, timedelta(hours=24))
+        times = [stop_time.departure_seconds - (24 * 3600 if departure_date != service_date else 0)
+                 for departure_date, stop_time in departures]
+        self.assertListEqual(times, sorted(times))
+        for departure_date, stop_time in departures:
+            self.assertTrue(stop_time.trip.service.is_active_on(departure_date))
+            self.assertNotEqual(stop_time.pickup_type, 1)
+
+        self.assertListEqual(stop.departures(service_date, "00:00:01"), departures[1:])
+        self.assertListEqual(stop.departures(service_date, time(0, 0, 1), limit=1), departures[1:2])
+
+        td.add_stop_time(trip_id="1003_1", arrival_time="24:30:00", departure_time="24:30:00", stop_id="20000",
+                         stop_sequence=3)
+        self.assertEqual(stop.departures(service_date, limit=2)[1][1].departure_time, timedelta(hours=24, minutes=30))
+
+        # the index is built again after a stop time is edited
+        stop_time = stop.departures(service_date, limit=1)[0][1]
+        stop_time.pickup_type = 1
+        self.assertNotIn(stop_time, [departure_stop_time for _, departure_stop_time in stop.departures(service_date)])
+
     # TODO: test load from file
@@ -0,0 +1,185 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import timedelta
+
+import constants
+from gtfspy import TransitData
+from gtfspy.data_objects import StopTimeRow
+from gtfspy.data_objects.base_object import collect_csv_fields
+from test_utils.create_gtfs_object import create_full_transit_data
+from test_utils.gtfs_utils import compare_gtfs_files
+from test_utils.test_case_utils import test_property, test_attribute
+from .test_stop_time import FULL_STOP_TIME_CSV_ROW, MINI_STOP_TIME_CSV_ROW, ALL_CSV_ROWS
+
+
+class TestStopTimeRow(unittest.TestCase):
+    def test_minimum_properties(self):
+        td = create_full_transit_data(columnar_stop_times=True)
+        stop_time = td.add_stop_time(**MINI_STOP_TIME_CSV_ROW)
+        self.assertIsInstance(stop_time, StopTimeRow)
+
+        test_property(self, stop_time, property_name="trip", new_value=td.trips['1001_2'])
+        test_property(self, stop_time, property_name="arrival_time", new_value=timedelta(hours=2))
+        test_property(self, stop_time, property_name="departure_time", new_value=timedelta(hours=3))
+        test_property(self, stop_time, property_name="stop", new_value=td.stops['20000'])
+        test_property(self, stop_time, property_name="stop_sequence", new_value=1)
+        test_property(self, stop_time, property_name="pickup_type", new_value=2)
+        test_property(self, stop_time, property_name="drop_off_type", new_value=2)
+        test_property(self, stop_time, property_name="shape_dist_traveled", new_value=1)
+        test_property(self, stop_time, property_name="stop_headsign", new_value="new headsign")
+        test_property(self, stop_time, property_name="is_exact_time", new_value=not stop_time.is_exact_time)
+
+        self.assertNotIn("test_attribute", stop_time.attributes)
+        test_attribute(self, stop_time, attribute_name="test_attribute", new_value="new test data")
+        self.assertEqual(td.stop_time_table.get_row(stop_time._row).attributes["test_attribute"], "new test data")
+
+    def test_get_csv_line(self):
+        for row in ALL_CSV_ROWS:
+            td = create_full_transit_data(columnar_stop_times=True)
+            stop_time = td.add_stop_time(**row)
+            self.assertDictEqual(stop_time.to_csv_line(), row)
+            self.assertListEqual(sorted(stop_time.get_csv_fields()), sorted(list(row.keys())))
+
+    def test_equal_to_stop_time(self):
+        for row in ALL_CSV_ROWS:
+            td1 = create_full_transit_data()
+            td2 = create_full_transit_data(columnar_stop_times=True)
+            self.assertEqual(td1.add_stop_time(**row), td2.add_stop_time(**row))
+
+
+class TestStopTimeTable(unittest.TestCase):
+    def test_create(self):
+        td1 = create_full_transit_data()
+        td2 = create_full_transit_data(columnar_stop_times=True)
+        self.assertEqual(td1, td2)
+        self.assertEqual(len(td2.stop_time_table), sum(len(trip.stop_times) for trip in td1.trips))
+
+    def test_views(self):
+        td1 = create_full_transit_data()
+        td2 = create_full_transit_data(columnar_stop_times=True)
+        for trip in td1.trips:
+            self.assertListEqual(list(trip.stop_times), list(td2.trips[trip.id].stop_times))
+        for stop in td1.stops:
+            self.assertListEqual(list(stop.stop_times), list(td2.stops[stop.id].stop_times))
+
+    def test_add_keeps_order(self):
+        td = create_full_transit_data(columnar_stop_times=True)
+        trip = td.trips['1003_1']
+        for i in range(3, 2000):
+            td.add_stop_time(trip_id=trip.id, arrival_time="23:00:00", departure_time="23:00:00", stop_id='10001',
+                             stop_sequence=5000 - i)
+        sequences = [stop_time.stop_sequence for stop_time in trip.stop_times]
+        self.assertListEqual(sequences, sorted(sequences))
+        self.assertEqual(len(sequences), 2000)
+        self.assertRaises(Exception, td.add_stop_time, trip_id=trip.id, arrival_time="23:00:00",
+                          departure_time="23:00:00", stop_id='10001', stop_sequence=4000)
+
+    def test_remove(self):
+        td = create_full_transit_data(columnar_stop_times=True)
+        stop = td.stops['30000']
+        stop_times_num = len(stop.stop_times)
+        trip = td.trips['30001_1']
+        td.trips.remove(trip, recursive=True)
+        self.assertNotIn(trip, td.trips)
+        self.assertEqual(len(stop.stop_times), stop_times_num - 1)
+
+    def test_trips_rows(self):
+        td = create_full_transit_data(columnar_stop_times=True)
+        table = td.stop_time_table
+        trips = list(td.trips)[::-1]
+
+        def expected_rows():
+            rows = [table.trip_rows(trip) for trip in trips]
+            return sum(rows, []), [sum(len(trip_rows) for trip_rows in rows[:i + 1]) for i in range(len(rows))]
+
+        self.assertTupleEqual(table.trips_rows(trips), expected_rows())
+
+        trip = td.trips['1003_1']
+        trip.stop_times.remove(trip.stop_times[1])
+        self.assertTupleEqual(table.trips_rows(trips), expected_rows())
+        self.assertEqual(table.trips_rows([trip])[1], [2])
+
+    def test_clean(self):
+        td = create_full_transit_data(columnar_stop_times=True)
+        for trip in td.trips:
+            for stop_time in list(trip.stop_times):
+                stop_time.trip.stop_times.remove(stop_time)
+                stop_time.stop.stop_times.remove(stop_time)
+
+        td.clean()
+
+        self.assertEqual(0, len(td.trips))
+        self.assertEqual(0, len(td.stops))
+
+    def test_get_csv_fields(self):
+        td = create_full_transit_data(columnar_stop_times=True)
+        stop_times = [stop_time for trip in td.trips for stop_time in trip.stop_times]
+        self.assertListEqual(sorted(td.stop_time_table.get_csv_fields()), sorted(collect_csv_fields(stop_times)))
+
+        row = dict(FULL_STOP_TIME_CSV_ROW, stop_sequence=100, other_attribute="other data")
+        stop_time = td.add_stop_time(**row)
+        self.assertIn("other_attribute", td.stop_time_table.get_csv_fields())
+
+        td.trips[row["trip_id"]].stop_times.remove(stop_time)
+        self.assertNotIn("other_attribute", td.stop_time_table.get_csv_fields())
+
+    def test_compact(self):
+        for file_path in constants.GTFS_TEST_FILES:
+            td1 = TransitData(gtfs_file=file_path, columnar_stop_times=True)
+            td2 = TransitData(gtfs_file=file_path, columnar_stop_times=True)
+            table = td2.stop_time_table
+            table.compact()
+            self.assertTrue(table.is_compact)
+            self.assertEqual(td1, td2)
+            for trip in td1.trips:
+                self.assertListEqual([stop_time.to_csv_line() for stop_time in trip.stop_times],
+                                     [stop_time.to_csv_line() for stop_time in td2.trips[trip.id].stop_times])
+            for stop in td1.stops:
+                self.assertListEqual(list(stop.stop_times), list(td2.stops[stop.id].stop_times))
+            td2.validate(force=True)
+
+        # the trips of the real file share a few patterns, so the table takes a fraction of its memory
+        td2 = TransitData(gtfs_file=constants.GTFS_MINI_REAL_FILE, columnar_stop_times=True)
+        table = td2.stop_time_table
+        size = sys.getsizeof(table)
+        table.compact()
+        self.assertLess(sys.getsizeof(table), size / 2)
+        td1 = TransitData(gtfs_file=constants.GTFS_MINI_REAL_FILE)
+
+        # a change expands the table, with the values of all its rows
+        trip = next(iter(td2.trips))
+        stop_time = trip.stop_times[1]
+        stop_time.departure_seconds += 60
+        self.assertFalse(table.is_compact)
+        self.assertEqual(stop_time.departure_seconds, td1.trips[trip.id].stop_times[1].departure_seconds + 60)
+        stop_time.departure_seconds -= 60
+        self.assertEqual(td1, td2)
+
+        # a removed row keeps its values
+        table.compact()
+        stop_time = trip.stop_times[0]
+        expected = stop_time.to_csv_line()
+        trip.stop_times.remove(stop_time)
+        table.compact()
+        self.assertDictEqual(stop_time.to_csv_line(), expected)
+        self.assertEqual(len(trip.stop_times), len(td1.trips[trip.id].stop_times) - 1)
+
+    def test_import_export(self):
+        for file_path in constants.GTFS_TEST_FILES:
+            temp_file_path = tempfile.mktemp() + ".zip"
+            try:
+                td1 = TransitData(gtfs_file=file_path)
+                td2 = TransitData(gtfs_file=file_path, columnar_stop_times=True)
+                self.assertEqual(td1, td2)
+
+                td2.save(temp_file_path)
+                compare_gtfs_files(file_path, temp_file_path, self)
+            finally:
+                if os.path.exists(temp_file_path):
+                    os.remove(temp_file_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -206,4 +206,34 @@ class TestTripCollection(unittest.TestCase):
         td.trips.clean()
         self.assertNotIn(trip, td.trips)
 
+    def test_back_references(self):
+        td = create_full_transit_data()
+        trip = td.trips.add(**FULL_TRIP_CSV_ROW)
+        self.assertIn(trip, trip.service.trips)
+        self.assertIn(trip, trip.shape.trips)
+
+        old_service = trip.service
+        trip.service = td.calendar['2']
+        self.assertNotIn(trip, old_service.trips)
+        self.assertIn(trip, td.calendar['2'].trips)
+
+        old_shape = trip.shape
+        trip.shape = td.shapes['2']
+        self.assertNotIn(trip, old_shape.trips)
+        self.assertIn(trip, td.shapes['2'].trips)
+
+        td.trips.remove(trip, recursive=True, clean_after=False)
+        self.assertNotIn(trip, td.calendar['2'].trips)
+        self.assertNotIn(trip, td.shapes['2'].trips)
+
+    def test_set_shape(self):
+        td = create_full_transit_data()
+        trip = td.trips.add(**MINI_TRIP_CSV_ROW)
+        shape = td.shapes['1']
+        trip.shape = shape
+        self.assertIn(trip, shape.trips)
+
+        td.trips.remove(trip, recursive=True, clean_after=False)
+        self.assertNotIn(trip, shape.trips)
+
     # TODO: test load from file
@@ -0,0 +1,41 @@
+import io
+import unittest
+
+from benchmarks.run_benchmarks import BENCHMARKS, compare_results, run_benchmarks
+from gtfspy import TransitData
+from test_utils.synthetic_gtfs import write_synthetic_gtfs
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_synthetic_gtfs(self):
+        gtfs_file = io.BytesIO()
+        rows = write_synthetic_gtfs(gtfs_file, agencies=2, routes_per_agency=3, trips_per_route=4, stops_per_trip=5)
+        self.assertEqual(rows["trips.txt"], 2 * 3 * 4)
+        self.assertEqual(rows["stop_times.txt"], 2 * 3 * 4 * 5)
+
+        same_gtfs_file = io.BytesIO()
+        write_synthetic_gtfs(same_gtfs_file, agencies=2, routes_per_agency=3, trips_per_route=4, stops_per_trip=5)
+        self.assertEqual(gtfs_file.getvalue(), same_gtfs_file.getvalue())
+
+        td = TransitData(gtfs_file)
+        self.assertEqual(len(td.agencies), 2)
+        self.assertEqual(len(td.routes), 2 * 3)
+        self.assertEqual(len(td.trips), rows["trips.txt"])
+        self.assertEqual(sum(len(trip.stop_times) for trip in td.trips), rows["stop_times.txt"])
+        self.assertEqual(len(td.fare_rules), rows["fare_rules.txt"])
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(scale=1, repeat=1)
+        self.assertSetEqual(set(results["benchmarks"].keys()), {name for name, _, _ in BENCHMARKS})
+        for result in results["benchmarks"].values():
+            self.assertGreater(result["best_seconds"], 0)
+            self.assertGreaterEqual(result["mean_seconds"], result["best_seconds"])
+
+        self.assertListEqual(compare_results(results, results), [])
+        slower_results = {"benchmarks": {name: dict(result, best_seconds=result["best_seconds"] * 2)
+                                         for name, result in results["benchmarks"].items()}}
+        self.assertEqual(len(compare_results(slower_results, results)), len(BENCHMARKS))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from datetime import timedelta
+
+import constants
+from gtfspy import LoadFilter, TransitData, load_partial_transit_data
+
+
+class TestLoadFilter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.full_td = TransitData(gtfs_file=constants.GTFS_MINI_REAL_FILE)
+
+    def load(self, load_filter):
+        td = TransitData()
+        td.load_gtfs_file(constants.GTFS_MINI_REAL_FILE, partial=load_filter)
+        return td
+
+    def assert_trips(self, td, expected_trips):
+        self.assertSetEqual({trip.id for trip in td.trips}, {trip.id for trip in expected_trips})
+        for trip in expected_trips:
+            self.assertListEqual(list(td.trips[trip.id].stop_times), list(trip.stop_times))
+        self.assertSetEqual({stop.id for stop in td.stops},
+                            {stop.id for trip in expected_trips for stop_time in trip.stop_times
+                             for stop in _with_parents(stop_time.stop)})
+        self.assertSetEqual({shape.id for shape in td.shapes},
+                            {trip.shape.id for trip in expected_trips if trip.shape is not None})
+        self.assertSetEqual({route.id for route in td.routes}, {trip.route.id for trip in expected_trips})
+        self.assertSetEqual({service.id for service in td.calendar}, {trip.service.id for trip in expected_trips})
+
+    def test_lines(self):
+        agency = next(iter(self.full_td.agencies))
+        line = next(iter(agency.lines))
+        td = self.load({agency.id: [line.line_number]})
+        self.assert_trips(td, [trip for trip in self.full_td.trips
+                               if trip.route.agency is agency and trip.route.line is line])
+
+    def test_route_types(self):
+        route_type = next(iter(self.full_td.routes)).route_type
+        td = self.load(LoadFilter(route_types=[route_type]))
+        self.assert_trips(td, [trip for trip in self.full_td.trips if trip.route.route_type == route_type])
+
+    def test_bbox(self):
+        stop = next(iter(self.full_td.stops))
+        bbox = (stop.stop_lat - 0.01, stop.stop_lon - 0.01, stop.stop_lat + 0.01, stop.stop_lon + 0.01)
+        td = self.load(LoadFilter(bbox=bbox))
+        expected_trips = [trip for trip in self.full_td.trips
+                          if any(bbox[0] <= stop_time.stop.stop_lat <= bbox[2] and
+                                 bbox[1] <= stop_time.stop.stop_lon <= bbox[3] for stop_time in trip.stop_times)]
+        self.assertNotEqual(len(expected_trips), 0)
+        self.assert_trips(td, expected_trips)
+
+    def test_dates(self):
+        service = next(iter(self.full_td.calendar))
+        from_date = service.start_date + timedelta(days=1)
+        to_date = from_date + timedelta(days=2)
+        td = self.load(LoadFilter(from_date=from_date, to_date=to_date))
+        self.assert_trips(td, [trip for trip in self.full_td.trips if trip.service.active_dates(from_date, to_date)])
+
+    def test_service_window(self):
+        service = next(iter(self.full_td.calendar))
+        service_window = (service.start_date + timedelta(days=1), service.start_date + timedelta(days=3))
+        td = TransitData()
+        td.load_gtfs_file(constants.GTFS_MINI_REAL_FILE, service_window=service_window)
+        self.assert_trips(td, [trip for trip in self.full_td.trips if trip.service.active_dates(*service_window)])
+
+        self.assertEqual(load_partial_transit_data(constants.GTFS_MINI_REAL_FILE, service_window=service_window), td)
+
+        agency = next(iter(self.full_td.agencies))
+        td = load_partial_transit_data(constants.GTFS_MINI_REAL_FILE, {agency.id: None}, service_window=service_window)
+        self.assert_trips(td, [trip for trip in self.full_td.trips
+                               if trip.route.agency is agency and trip.service.active_dates(*service_window)])
+
+    def test_trip_and_stop_ids(self):
+        trips = list(self.full_td.trips)[:5]
+        td = self.load(LoadFilter(trip_ids=[trip.id for trip in trips]))
+        self.assert_trips(td, trips)
+
+        stop = trips[0].stop_times[0].stop
+        td = self.load(LoadFilter(trip_ids=[trip.id for trip in trips], stop_ids=[stop.id]))
+        self.assert_trips(td, [trip for trip in trips if any(stop_time.stop is stop
+                                                             for stop_time in trip.stop_times)])
+
+
+def _with_parents(stop):
+    while stop is not None:
+        yield stop
+        stop = stop.parent_station
+
+
+if __name__ == '__main__':
+    unittest.main()
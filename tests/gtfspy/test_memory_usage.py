@@ -0,0 +1,97 @@
+import csv
+import gc
+import io
+import tracemalloc
+import unittest
+import zipfile
+
+import constants
+from gtfspy import TransitData
+from gtfspy.data_objects import StopTime, ShapePoint
+from gtfspy.utils.time import parse_timedelta
+from gtfspy.utils.validating import not_none_or_empty
+
+
+class _DictStopTime(object):
+    """
+    The StopTime layout before slots were introduced, used as the baseline of the benchmark.
+    """
+
+    def __init__(self, transit_data, trip_id, arrival_time, departure_time, stop_id, stop_sequence, pickup_type=None,
+                 drop_off_type=None, shape_dist_traveled=None, stop_headsign=None, timepoint=None, **kwargs):
+        self.trip = transit_data.trips[str(trip_id)]
+        self.arrival_time = parse_timedelta(arrival_time)
+        self.departure_time = parse_timedelta(departure_time)
+        self.stop = transit_data.stops[str(stop_id)]
+        self.stop_sequence = int(stop_sequence)
+
+        self.attributes = {k: v for k, v in kwargs.items() if not_none_or_empty(v)}
+        if not_none_or_empty(pickup_type):
+            self.attributes["pickup_type"] = int(pickup_type)
+        if not_none_or_empty(drop_off_type):
+            self.attributes["drop_off_type"] = int(drop_off_type)
+        if not_none_or_empty(shape_dist_traveled):
+            self.attributes["shape_dist_traveled"] = float(shape_dist_traveled)
+        if not_none_or_empty(stop_headsign):
+            self.attributes["stop_headsign"] = str(stop_headsign)
+        if not_none_or_empty(timepoint):
+            self.attributes["timepoint"] = int(timepoint)
+
+
+class _DictShapePoint(object):
+    def __init__(self, shape_pt_lat, shape_pt_lon, shape_pt_sequence, shape_dist_traveled=None, **kwargs):
+        self.latitude = float(shape_pt_lat)
+        self.longitude = float(shape_pt_lon)
+        self.sequence = int(shape_pt_sequence)
+
+        self.attributes = {k: v for k, v in kwargs.items() if not_none_or_empty(v)}
+        if not_none_or_empty(shape_dist_traveled):
+            self.attributes["shape_dist_traveled"] = float(shape_dist_traveled)
+
+
+def _read_rows(file_path, file_name):
+    with zipfile.ZipFile(file_path) as zip_file:
+        with zip_file.open(file_name, "r") as f:
+            return list(csv.DictReader(io.TextIOWrapper(f, encoding="utf-8-sig")))
+
+
+def _measure(factory, rows):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        objects = [factory(**row) for row in rows]
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size, objects
+
+
+class TestMemoryUsage(unittest.TestCase):
+    def test_no_instance_dict(self):
+        td = TransitData(constants.GTFS_MINI_REAL_FILE)
+        stop_time = next(iter(td.trips)).stop_times[0]
+        shape_point = next(iter(td.shapes)).shape_points[0]
+        service_date = td.calendar_dates.add(service_id=next(iter(td.calendar)).id, date="20170101", exception_type=1)
+
+        for obj in (stop_time, shape_point, service_date):
+            self.assertFalse(hasattr(obj, "__dict__"))
+
+    def test_stop_time_memory(self):
+        td = TransitData(constants.GTFS_MINI_REAL_FILE)
+        rows = _read_rows(constants.GTFS_MINI_REAL_FILE, "stop_times.txt")
+        self.assertGreater(len(rows), 0)
+
+        dict_size, _ = _measure(lambda **row: _DictStopTime(td, **row), rows)
+        slots_size, _ = _measure(lambda **row: StopTime(td, **row), rows)
+
+        self.assertLess(slots_size / dict_size, 0.8)
+
+    def test_shape_point_memory(self):
+        rows = _read_rows(constants.GTFS_MINI_REAL_FILE, "shapes.txt")
+        for row in rows:
+            del row["shape_id"]
+
+        dict_size, _ = _measure(_DictShapePoint, rows)
+        slots_size, _ = _measure(ShapePoint, rows)
+
+        self.assertLess(slots_size / dict_size, 0.8)
@@ -0,0 +1,110 @@
+import random
+import unittest
+from datetime import date, timedelta
+
+import constants
+from gtfspy import TransitData
+from gtfspy.routing import Timetable
+from test_utils.create_gtfs_object import create_full_transit_data
+
+
+def _scan_connections(timetable, from_stop_id, departure_seconds):
+    """
+    The earliest arrivals with unlimited transfers by scanning all the connections of the timetable in order, used as
+    the baseline of the RAPTOR queries.
+    """
+
+    connections = []
+    for pattern_index, pattern in enumerate(timetable.patterns):
+        for trip_index in range(len(pattern.trips)):
+            for position in range(len(pattern.stops) - 1):
+                connections.append((pattern.departures[position][trip_index],
+                                    pattern.arrivals[position + 1][trip_index], pattern_index, trip_index, position))
+    connections.sort()
+
+    source = timetable._stop_indexes[from_stop_id]
+    arrivals = {source: departure_seconds}
+    for stop_index, duration in timetable.footpaths[source]:
+        arrivals[stop_index] = min(arrivals.get(stop_index, float("inf")), departure_seconds + duration)
+
+    boarded_trips = set()
+    for departure, arrival, pattern_index, trip_index, position in connections:
+        pattern = timetable.patterns[pattern_index]
+        if (pattern_index, trip_index) in boarded_trips or \
+                (pattern.can_board[position] and arrivals.get(pattern.stops[position], float("inf")) <= departure):
+            boarded_trips.add((pattern_index, trip_index))
+            stop_index = pattern.stops[position + 1]
+            if pattern.can_alight[position + 1] and arrival < arrivals.get(stop_index, float("inf")):
+                arrivals[stop_index] = arrival
+                for other_index, duration in timetable.footpaths[stop_index]:
+                    arrivals[other_index] = min(arrivals.get(other_index, float("inf")), arrival + duration)
+
+    return {timetable.stops[stop_index].id: arrival for stop_index, arrival in arrivals.items()}
+
+
+def _busiest_date(td):
+    service = max(td.calendar, key=lambda s: len(s.active_dates(s.start_date, s.end_date)))
+    return service.active_dates(service.start_date, service.end_date)[0]
+
+
+class TestRouting(unittest.TestCase):
+    def test_earliest_arrival(self):
+        td = create_full_transit_data()
+        # a tuesday, so the trips of service 1 of the previous day run after midnight
+        service_date = date.today() + timedelta(days=1)
+        while (service_date - timedelta(days=1)).weekday() != 0:
+            service_date += timedelta(days=1)
+        timetable = Timetable(td, service_date)
+
+        journey = timetable.earliest_arrival("10000", "20000", "05:00:00")
+        self.assertEqual(journey.arrival_seconds, 7 * 3600)
+        self.assertEqual([leg.trip.id if leg.trip is not None else None for leg in journey.legs], [None, "1001_1"])
+        self.assertEqual(journey.transfers, 0)
+
+        journey = timetable.earliest_arrival(td.stops["20000"], td.stops["30000"], 0)
+        self.assertEqual(journey.legs[0].trip.id, "1003_1")
+        self.assertEqual(journey.departure_seconds, 0)
+        self.assertEqual(journey.arrival_seconds, 3600 + 13 * 60)
+
+        journey = timetable.earliest_arrival("20000", "30000", "00:00:01")
+        self.assertNotEqual(journey.legs[0].trip.id, "1003_1")
+
+        journey = timetable.earliest_arrival("20000", td.stops["20000"], "05:00:00")
+        self.assertListEqual(journey.legs, [])
+        self.assertIsNone(journey.arrival_seconds)
+        self.assertEqual(journey.transfers, 0)
+
+    def test_arrival_times(self):
+        for file_path in constants.GTFS_TEST_FILES:
+            td = TransitData(gtfs_file=file_path)
+            timetable = Timetable(td, _busiest_date(td))
+
+            random.seed(0)
+            for _ in range(20):
+                from_stop_id = random.choice(timetable.stops).id
+                departure_seconds = random.randint(0, 24 * 3600)
+                arrivals = timetable.arrival_times(from_stop_id, departure_seconds, max_transfers=len(td.trips))
+                self.assertDictEqual(arrivals, _scan_connections(timetable, from_stop_id, departure_seconds))
+
+                for to_stop_id in arrivals:
+                    if to_stop_id == from_stop_id:
+                        continue
+                    journey = timetable.earliest_arrival(from_stop_id, to_stop_id, departure_seconds,
+                                                         max_transfers=len(td.trips))
+                    self.assertEqual(journey.arrival_seconds, arrivals[to_stop_id])
+                    self.assertEqual(journey.legs[0].from_stop.id, from_stop_id)
+                    self.assertEqual(journey.legs[-1].to_stop.id, to_stop_id)
+                    self.assertGreaterEqual(journey.departure_seconds, departure_seconds)
+                    for leg, next_leg in zip(journey.legs, journey.legs[1:]):
+                        self.assertIs(leg.to_stop, next_leg.from_stop)
+                        self.assertLessEqual(leg.arrival_seconds, next_leg.departure_seconds)
+
+                    if journey.transfers > 0:
+                        fewer_transfers = timetable.earliest_arrival(from_stop_id, to_stop_id, departure_seconds,
+                                                                     max_transfers=journey.transfers - 1)
+                        self.assertTrue(fewer_transfers is None or
+                                        fewer_transfers.arrival_seconds > journey.arrival_seconds)
+
+
+if __name__ == '__main__':
+    unittest.main()
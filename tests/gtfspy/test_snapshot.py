@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import constants
+from gtfspy import ReadOnlyError, TransitData
+from gtfspy.snapshot import SnapshotError, gtfs_checksum, read_snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.snapshot_path = tempfile.mktemp(suffix=".snapshot")
+
+    def tearDown(self):
+        if os.path.exists(self.snapshot_path):
+            os.remove(self.snapshot_path)
+
+    def test_save_load(self):
+        for file_path in constants.GTFS_TEST_FILES:
+            td1 = TransitData(gtfs_file=file_path)
+            td1.save_snapshot(self.snapshot_path)
+
+            td2 = TransitData.load_snapshot(self.snapshot_path)
+            self.assertIsNotNone(td2.stop_time_table)
+            self.assertEqual(td1, td2)
+
+            td3 = TransitData.load_snapshot(self.snapshot_path, columnar_stop_times=False)
+            self.assertIsNone(td3.stop_time_table)
+            self.assertEqual(td1, td3)
+            self.assertEqual(td1.translator._words, td3.translator._words)
+            self.assertEqual(td1.source_checksum, td3.source_checksum)
+
+    def test_mapped(self):
+        for file_path in constants.GTFS_TEST_FILES:
+            td1 = TransitData(gtfs_file=file_path)
+            td1.save_snapshot(self.snapshot_path)
+
+            td2 = TransitData.load_snapshot(self.snapshot_path, columnar_stop_times=False, mapped=True)
+            self.assertTrue(td2.read_only)
+            self.assertIsInstance(td2.stop_time_table.arrival_time, memoryview)
+            for shape in td2.shapes:
+                self.assertIsNone(shape._shape_points)
+            self.assertEqual(td1, td2)
+            for trip in td1.trips:
+                self.assertEqual([stop_time.stop.id for stop_time in trip.stop_times],
+                                 [stop_time.stop.id for stop_time in td2.trips[trip.id].stop_times])
+            for stop in td1.stops:
+                self.assertEqual(len(stop.stop_times), len(td2.stops[stop.id].stop_times))
+
+    def test_mapped_read_only(self):
+        TransitData(gtfs_file=constants.GTFS_SAMPLE_FILE).save_snapshot(self.snapshot_path)
+        td = TransitData.load_snapshot(self.snapshot_path, mapped=True)
+
+        trip = next(iter(td.trips))
+        stop_time = trip.stop_times[0]
+        self.assertRaises(ReadOnlyError, td.add_stop_time, trip_id=trip.id, arrival_time="23:00:00",
+                          departure_time="23:00:00", stop_id=stop_time.stop.id, stop_sequence=1000)
+        self.assertRaises(ReadOnlyError, td.trips.remove, trip)
+        self.assertRaises(ReadOnlyError, trip.stop_times.remove, stop_time)
+        self.assertRaises(ReadOnlyError, td.clean)
+        for field_name, value in [("arrival_seconds", 0), ("departure_seconds", 0), ("stop_sequence", 1000),
+                                  ("pickup_type", 1), ("drop_off_type", 1), ("stop", stop_time.stop),
+                                  ("shape_dist_traveled", 1.0), ("stop_headsign", "head sign")]:
+            self.assertRaises(ReadOnlyError, setattr, stop_time, field_name, value)
+        self.assertIn(trip, td.trips)
+        self.assertTrue(td.save())
+
+    def test_checksum(self):
+        self.assertEqual(gtfs_checksum(constants.GTFS_SAMPLE_FILE), gtfs_checksum(constants.GTFS_SAMPLE_FILE))
+        self.assertNotEqual(gtfs_checksum(constants.GTFS_SAMPLE_FILE), gtfs_checksum(constants.GTFS_MINI_REAL_FILE))
+
+    def test_rebuild_stale_snapshot(self):
+        TransitData(gtfs_file=constants.GTFS_SAMPLE_FILE).save_snapshot(self.snapshot_path)
+        self.assertEqual(read_snapshot(self.snapshot_path).checksum, gtfs_checksum(constants.GTFS_SAMPLE_FILE))
+
+        td = TransitData.load_snapshot(self.snapshot_path, gtfs_file=constants.GTFS_MINI_REAL_FILE)
+        self.assertEqual(td, TransitData(gtfs_file=constants.GTFS_MINI_REAL_FILE))
+        self.assertEqual(read_snapshot(self.snapshot_path).checksum, gtfs_checksum(constants.GTFS_MINI_REAL_FILE))
+
+    def test_missing_snapshot(self):
+        self.assertRaises(IOError, TransitData.load_snapshot, self.snapshot_path)
+
+        td = TransitData.load_snapshot(self.snapshot_path, gtfs_file=constants.GTFS_SAMPLE_FILE)
+        self.assertTrue(os.path.exists(self.snapshot_path))
+        self.assertEqual(td, TransitData.load_snapshot(self.snapshot_path, gtfs_file=constants.GTFS_SAMPLE_FILE))
+
+    def test_corrupted_snapshot(self):
+        shutil.copy(constants.GTFS_SAMPLE_FILE, self.snapshot_path)
+        self.assertRaises(SnapshotError, TransitData.load_snapshot, self.snapshot_path)
+
+        TransitData(gtfs_file=constants.GTFS_SAMPLE_FILE).save_snapshot(self.snapshot_path)
+        with open(self.snapshot_path, "rb") as f:
+            data = f.read()
+        with open(self.snapshot_path, "wb") as f:
+            f.write(data[:len(data) // 2])
+        self.assertRaises(SnapshotError, TransitData.load_snapshot, self.snapshot_path)
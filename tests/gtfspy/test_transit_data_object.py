@@ -1,9 +1,14 @@
+import csv
+import io
 import os
 import tempfile
+import tracemalloc
 import unittest
+import zipfile
 
 import constants
-from gtfspy import TransitData
+from gtfspy import LoadStats, TransitData
+from gtfspy.utils import loading
 from test_utils.create_gtfs_object import create_full_transit_data
 from test_utils.gtfs_utils import compare_gtfs_files
 
@@ -26,6 +31,125 @@ class TestTransitDataLoad(unittest.TestCase):
                 if os.path.exists(temp_file_path):
                     os.remove(temp_file_path)
 
+    def test_export_to_memory(self):
+        td1 = TransitData(gtfs_file=constants.GTFS_SAMPLE_FILE)
+        data = td1.save()
+        self.assertEqual(td1, TransitData(io.BytesIO(data)))
+
+        buffer = io.BytesIO()
+        td1.save(buffer)
+        self.assertEqual(td1, TransitData(buffer))
+
+    def test_parallel_export(self):
+        for file_path in constants.GTFS_TEST_FILES:
+            td1 = TransitData(gtfs_file=file_path)
+            timings = {}
+            data = td1.save(workers=4, timings=timings)
+            self.assertIn("stop_times.txt", timings)
+
+            with zipfile.ZipFile(io.BytesIO(data)) as zip_file:
+                self.assertIsNone(zip_file.testzip())
+                self.assertListEqual(sorted(zip_file.namelist()), sorted(timings.keys()))
+            with zipfile.ZipFile(io.BytesIO(td1.save())) as zip_file1, \
+                    zipfile.ZipFile(io.BytesIO(data)) as zip_file2:
+                for name in zip_file1.namelist():
+                    self.assertEqual(zip_file1.read(name), zip_file2.read(name))
+            self.assertEqual(td1, TransitData(io.BytesIO(data)))
+
+    def test_parallel_load(self):
+        for file_path in constants.GTFS_TEST_FILES:
+            td1 = TransitData(gtfs_file=file_path)
+            td2 = TransitData(gtfs_file=file_path, workers=2)
+            self.assertEqual(td1, td2)
+
+    def test_parallel_load_quoted_line_breaks(self):
+        temp_file_path = tempfile.mktemp() + ".zip"
+        min_chunk_size = loading.MIN_CHUNK_SIZE
+        loading.MIN_CHUNK_SIZE = 1000
+        try:
+            with zipfile.ZipFile(constants.GTFS_MINI_REAL_FILE) as source, \
+                    zipfile.ZipFile(temp_file_path, "w") as target:
+                for name in source.namelist():
+                    data = source.read(name)
+                    if name == "stop_times.txt":
+                        # every third stop time gets a headsign which spans lines
+                        rows = list(csv.reader(io.StringIO(data.decode("utf-8-sig"), newline="")))
+                        rows[0].append("stop_headsign")
+                        for i, row in enumerate(rows[1:]):
+                            row.append("line one\nline two\nline three" if i % 3 == 0 else "")
+                        text = io.StringIO(newline="")
+                        csv.writer(text).writerows(rows)
+                        data = text.getvalue().encode("utf-8")
+                    target.writestr(name, data)
+
+            td1 = TransitData(gtfs_file=temp_file_path)
+            td2 = TransitData(gtfs_file=temp_file_path, workers=4)
+            self.assertEqual(td1, td2)
+            self.assertIn("line one\nline two\nline three",
+                          {stop_time.stop_headsign for trip in td2.trips for stop_time in trip.stop_times})
+        finally:
+            loading.MIN_CHUNK_SIZE = min_chunk_size
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+
+    def test_load_stats(self):
+        for file_path in constants.GTFS_TEST_FILES:
+            stats = LoadStats()
+            td = TransitData()
+            td.load_gtfs_file(file_path, stats=stats)
+
+            stop_times = stats.members["stop_times.txt"]
+            self.assertEqual(stop_times.rows, sum(len(trip.stop_times) for trip in td.trips))
+            self.assertTrue({"decode", "parse", "construct", "link"}.issubset(stop_times.phases))
+            self.assertEqual(stop_times.phases["parse"].rows, stop_times.rows)
+            self.assertGreater(stop_times.phases["link"].seconds, 0)
+            self.assertGreaterEqual(stop_times.phases["construct"].seconds, 0)
+            self.assertIsNone(stop_times.allocated_bytes)
+            self.assertEqual(stats.members["trips.txt"].phases["validate"].rows, len(td.trips))
+            self.assertAlmostEqual(stats.seconds, sum(phase.seconds for phase in stats.get_phase_totals().values()))
+
+            td.save(io.BytesIO(), stats=stats, validate=False)
+            self.assertEqual(stats.members["stops.txt"].phases["write"].rows, len(td.stops))
+            self.assertEqual(stats.members["stop_times.txt"].phases["write"].rows, stop_times.rows)
+            self.assertIn("stop_times.txt", stats.report())
+
+            parallel_stats = LoadStats()
+            td.save(io.BytesIO(), workers=2, stats=parallel_stats, validate=False)
+            self.assertEqual(parallel_stats.members["trips.txt"].rows, len(td.trips))
+
+        stats = LoadStats()
+        tracemalloc.start()
+        try:
+            TransitData().load_gtfs_file(constants.GTFS_SAMPLE_FILE, stats=stats, workers=2)
+        finally:
+            tracemalloc.stop()
+        self.assertGreater(stats.members["stop_times.txt"].allocated_bytes, 0)
+        self.assertGreater(stats.members["stop_times.txt"].rows_per_second, 0)
+
+    def test_lazy_load(self):
+        for file_path in constants.GTFS_TEST_FILES:
+            td1 = TransitData(gtfs_file=file_path, lazy=True)
+            self.assertSetEqual(td1._lazy_collections, {"agencies", "routes", "shapes", "calendar", "calendar_dates",
+                                                        "trips", "stops", "stop_time_table", "translator",
+                                                        "fare_attributes", "fare_rules"})
+
+            trip = next(iter(td1.trips))
+            self.assertNotIn("trips", td1._lazy_collections)
+            self.assertNotIn("routes", td1._lazy_collections)
+            self.assertIn("stop_time_table", td1._lazy_collections)
+
+            self.assertNotEqual(len(trip.stop_times), 0)
+            self.assertNotIn("stop_time_table", td1._lazy_collections)
+
+            self.assertEqual(td1, TransitData(gtfs_file=file_path))
+            self.assertEqual(TransitData(io.BytesIO(td1.save())), TransitData(gtfs_file=file_path))
+
+    def test_explicit_encoding(self):
+        for file_path in constants.GTFS_TEST_FILES:
+            td1 = TransitData(gtfs_file=file_path)
+            td2 = TransitData(gtfs_file=file_path, encoding="utf-8")
+            self.assertEqual(td1, td2)
+
     def test_clean(self):
         td = create_full_transit_data()
         for trip in td.trips:
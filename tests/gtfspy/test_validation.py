@@ -0,0 +1,175 @@
+import unittest
+
+import constants
+from gtfspy import LoadStats, TransitData, ValidationError, validation
+from test_utils.create_gtfs_object import create_full_transit_data
+
+
+class TestValidation(unittest.TestCase):
+    def test_valid_files(self):
+        for file_path in constants.GTFS_TEST_FILES:
+            for columnar_stop_times in [False, True]:
+                td = TransitData(gtfs_file=file_path, validate=False, columnar_stop_times=columnar_stop_times)
+                report = td.validation_report()
+                self.assertTrue(report.is_valid)
+                self.assertListEqual(report.errors, [])
+
+    def test_report(self):
+        reports = []
+        for columnar_stop_times in [False, True]:
+            td = create_full_transit_data(columnar_stop_times=columnar_stop_times)
+            td.validate()
+
+            td.stops["20000"].stop_lat = 100
+            first_stop_time, second_stop_time = td.trips["1001_1"].stop_times
+            second_stop_time.arrival_seconds = first_stop_time.departure_seconds - 60
+            td.trips["1002_1"].stop_times[0].pickup_type = 7
+            td.trips["1002_2"].stop_times[1].departure_seconds = 12 * 3600 + 30 * 60
+            td.shapes._objects.pop("2")
+
+            report = td.validation_report()
+            self.assertFalse(report.is_valid)
+            self.assertDictEqual(report.count_by_rule(), {"out_of_range": 1, "invalid_value": 1,
+                                                          "arrival_after_departure": 1, "decreasing_times": 1,
+                                                          "unknown_reference": 1})
+            self.assertEqual(len(report.warnings), 1)
+
+            violations = {violation.rule: violation for violation in report}
+            self.assertEqual(violations["out_of_range"].member_name, "stops.txt")
+            self.assertEqual(violations["out_of_range"].row, 2)
+            self.assertEqual(violations["out_of_range"].object_id, "20000")
+            self.assertEqual(violations["decreasing_times"].object_id, ("1001_1", second_stop_time.stop_sequence))
+            self.assertEqual(violations["decreasing_times"].row, 1)
+            self.assertEqual(violations["invalid_value"].row, 4)
+            self.assertEqual(violations["arrival_after_departure"].row, 7)
+            self.assertEqual(violations["unknown_reference"].member_name, "trips.txt")
+            self.assertEqual(violations["unknown_reference"].object_id, "1001_2")
+            self.assertIn("stops.txt:2 [out_of_range]", str(report))
+
+            with self.assertRaises(ValidationError) as context:
+                td.validate(force=True)
+            self.assertEqual(len(context.exception.report.errors), 4)
+            self.assertFalse(td.is_validated)
+            reports.append([(violation.rule, violation.row, violation.object_id) for violation in report])
+
+        self.assertListEqual(reports[0], reports[1])
+
+    def test_warnings_only(self):
+        td = create_full_transit_data()
+        first_stop_time, second_stop_time = td.trips["1002_4"].stop_times
+        second_stop_time.arrival_seconds = first_stop_time.departure_seconds - 1
+        td.validate(force=True)
+        self.assertTrue(td.is_validated)
+        self.assertEqual(len(td.validation_report().warnings), 1)
+
+    def test_nan_coordinates(self):
+        td = create_full_transit_data()
+        shape = td.shapes["1"]
+        shape.shape_points[1].latitude = float("nan")
+        report = td.validation_report()
+        self.assertListEqual([(violation.rule, violation.object_id) for violation in report],
+                             [("out_of_range", ("1", shape.shape_points[1].sequence))])
+
+    def test_workers(self):
+        min_chunk_size = validation.MIN_CHUNK_SIZE
+        validation.MIN_CHUNK_SIZE = 1
+        try:
+            for columnar_stop_times in [False, True]:
+                td = create_full_transit_data(columnar_stop_times=columnar_stop_times)
+                td.stops["20000"].stop_lat = 100
+                td.trips["1002_1"].stop_times[0].pickup_type = 7
+                td.trips["1002_2"].stop_times[1].departure_seconds = 12 * 3600 + 30 * 60
+                td.shapes._objects.pop("2")
+
+                report = td.validation_report()
+                workers_report = td.validation_report(workers=2)
+                self.assertListEqual(sorted((violation.rule, violation.row, str(violation.object_id))
+                                            for violation in workers_report),
+                                     sorted((violation.rule, violation.row, str(violation.object_id))
+                                            for violation in report))
+                self.assertRaises(ValidationError, td.validate, force=True, workers=2)
+        finally:
+            validation.MIN_CHUNK_SIZE = min_chunk_size
+
+        for file_path in constants.GTFS_TEST_FILES:
+            td = TransitData(gtfs_file=file_path, workers=2)
+            self.assertTrue(td.is_validated)
+
+    def test_dirty(self):
+        for columnar_stop_times in [False, True]:
+            td = create_full_transit_data(columnar_stop_times=columnar_stop_times)
+            td.validate()
+            route = td.routes["1001"]
+            trip = td.trips.add(trip_id="new", route_id=route.id, service_id=td.trips["1001_1"].service.id)
+            td.add_stop_time(trip_id=trip.id, arrival_time="10:00:00", departure_time="10:05:00", stop_id="20000",
+                             stop_sequence=0)
+            td.add_stop_time(trip_id=trip.id, arrival_time="11:00:00", departure_time="10:30:00", stop_id="20000",
+                             stop_sequence=1)
+            self.assertFalse(td.is_validated)
+
+            stats = LoadStats()
+            with self.assertRaises(ValidationError) as context:
+                td.validate(stats=stats)
+            self.assertListEqual([(violation.rule, violation.row, violation.object_id)
+                                  for violation in context.exception.report],
+                                 [("arrival_after_departure", None, ("new", 1))])
+            self.assertEqual(stats.get_member("trips.txt").rows, 1)
+            self.assertEqual(stats.get_member("stop_times.txt").rows, 2)
+            self.assertNotIn("stops.txt", stats.members)
+
+            td.trips.remove(trip, recursive=True, clean_after=False)
+            td.validate()
+            self.assertTrue(td.is_validated)
+
+            # the child stop of a removed station is validated again
+            td.stops.remove(td.stops["10000"], clean_after=False)
+            with self.assertRaises(ValidationError) as context:
+                td.validate()
+            self.assertListEqual([(violation.rule, violation.object_id) for violation in context.exception.report],
+                                 [("parent_station", "10001")])
+
+    def test_dirty_setters(self):
+        for columnar_stop_times in [False, True]:
+            td = create_full_transit_data(columnar_stop_times=columnar_stop_times)
+            td.validate()
+            stop = td.stops["20000"]
+            stop.stop_lat = 100
+            td.trips.add(trip_id="new", route_id="1001", service_id=td.trips["1001_1"].service.id)
+            with self.assertRaises(ValidationError) as context:
+                td.validate()
+            self.assertListEqual([(violation.rule, violation.object_id) for violation in context.exception.report],
+                                 [("out_of_range", "20000")])
+            stop.stop_lat = 32
+            td.validate()
+
+            stop_time = td.trips["1002_1"].stop_times[0]
+            stop_time.arrival_seconds = stop_time.departure_seconds + 60
+            with self.assertRaises(ValidationError) as context:
+                td.validate()
+            self.assertListEqual([(violation.rule, violation.object_id) for violation in context.exception.report],
+                                 [("arrival_after_departure", ("1002_1", stop_time.stop_sequence))])
+            stop_time.arrival_seconds = stop_time.departure_seconds
+            td.validate()
+
+            # the child stop of a changed station is validated again
+            td.stops["10000"].location_type = 0
+            with self.assertRaises(ValidationError) as context:
+                td.validate()
+            self.assertListEqual([(violation.rule, violation.object_id) for violation in context.exception.report],
+                                 [("parent_station", "10001")])
+            td.stops["10000"].location_type = 1
+            td.validate()
+
+            trip = td.trips["1002_1"]
+            old_route = trip.route
+            patterns = old_route.patterns
+            trip.route = td.routes["1001"]
+            self.assertNotIn(trip, old_route.trips)
+            self.assertIn(trip, td.routes["1001"].trips)
+            self.assertIsNot(old_route.patterns, patterns)
+            self.assertFalse(td.is_validated)
+            td.validate()
+
+
+if __name__ == '__main__':
+    unittest.main()
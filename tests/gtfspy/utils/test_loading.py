@@ -0,0 +1,49 @@
+import codecs
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+
+from gtfspy.utils.loading import parse_member_rows, read_member_rows, split_records
+
+STOP_TIMES_HEADER = "trip_id,arrival_time,departure_time,stop_id,stop_sequence,stop_headsign\r\n"
+
+
+class TestReadMemberRows(unittest.TestCase):
+    def setUp(self):
+        # every third headsign spans lines, and has escaped quotes
+        self.rows = ["%d,%02d:00:00,%02d:01:00,%d,%d,\"head, sign %s\"\r\n" %
+                     (i // 10, i % 30, i % 30, i, i % 10, i if i % 3 else "%d\n\"\"line\"\"\r\nthree" % (i,))
+                     for i in range(500)]
+        self.data = codecs.BOM_UTF8 + (STOP_TIMES_HEADER + "".join(self.rows)).encode("utf-8")
+
+        self.file_path = tempfile.mktemp(suffix=".zip")
+        with zipfile.ZipFile(self.file_path, "w") as zip_file:
+            zip_file.writestr("stop_times.txt", self.data)
+
+    def tearDown(self):
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+    def test_read_all(self):
+        fieldnames, rows = read_member_rows(self.file_path, "stop_times.txt", "utf-8-sig")
+        self.assertEqual(fieldnames, ["trip_id", "arrival_time", "departure_time", "stop_id", "stop_sequence",
+                                      "stop_headsign"])
+        self.assertEqual(len(rows), len(self.rows))
+        self.assertEqual(rows[31], ("3", 3600, 3660, "31", 1, "head, sign 31"))
+
+    def test_chunks(self):
+        _, all_rows = read_member_rows(self.file_path, "stop_times.txt", "utf-8-sig")
+        self.assertEqual(all_rows[30][5], "head, sign 30\n\"line\"\r\nthree")
+        header = (codecs.BOM_UTF8 + STOP_TIMES_HEADER.encode("utf-8"))
+        for chunk_size in (7, 100, 1000, len(self.data) // 3, len(self.data) * 2):
+            chunks = list(split_records(io.BytesIO(self.data), chunk_size))
+            self.assertEqual(b"".join(chunks), self.data)
+            rows = []
+            for i, chunk in enumerate(chunks):
+                fieldnames, chunk_rows = parse_member_rows(chunk, "stop_times.txt", "utf-8-sig",
+                                                           None if i == 0 else header)
+                self.assertEqual(fieldnames[0], "trip_id")
+                rows += chunk_rows
+            self.assertEqual(rows, all_rows)
@@ -1,3 +1,5 @@
+import codecs
+import io
 import sys
 import unittest
 
@@ -42,3 +44,46 @@ class TestYesNoUnknownParser(unittest.TestCase):
         self.assertIn(yes_no_unknown_to_int(None), [None, 0])
         self.assertEqual(yes_no_unknown_to_int(True), 1)
         self.assertEqual(yes_no_unknown_to_int(False), 2)
+
+
+class TestDetectEncoding(unittest.TestCase):
+    def test_bom(self):
+        self.assertEqual(detect_encoding(codecs.BOM_UTF8 + b"stop_id"), "utf-8-sig")
+        self.assertEqual(detect_encoding("stop_id".encode("utf-16")), "utf-16")
+
+    def test_ascii_is_utf8(self):
+        self.assertEqual(detect_encoding(b"trip_id,arrival_time\n1,10:00:00\n"), "utf-8")
+
+
+class TestEncodingDetector(unittest.TestCase):
+    def test_explicit_encoding(self):
+        detector = EncodingDetector("iso-8859-8")
+        self.assertEqual(detector.detect("שלום".encode("utf-8")), "iso-8859-8")
+
+    def test_explicit_utf8_with_bom(self):
+        detector = EncodingDetector("utf-8")
+        self.assertEqual(detector.detect(codecs.BOM_UTF8 + b"stop_id"), "utf-8-sig")
+        self.assertEqual(detector.detect(b"stop_id"), "utf-8")
+
+    def test_detection_is_cached(self):
+        detector = EncodingDetector()
+        first_encoding = detector.detect(("stop_id,stop_name\n1,%s\n" % ("תחנה מרכזית " * 20,)).encode("utf-8"))
+        self.assertEqual(first_encoding.lower(), "utf-8")
+        self.assertEqual(detector.detect(b"\xe0\xe1\xe2"), first_encoding)
+
+    def test_ascii_is_not_cached(self):
+        detector = EncodingDetector()
+        self.assertEqual(detector.detect(b"stop_id"), "utf-8")
+        self.assertIsNone(detector._detected_encoding)
+
+
+class TestDecodeStream(unittest.TestCase):
+    def test_decode_with_bom(self):
+        content = "stop_id,stop_name\n1,תחנה\n"
+        stream = decode_stream(io.BytesIO(codecs.BOM_UTF8 + content.encode("utf-8")))
+        self.assertEqual(stream.read(), content)
+
+    def test_decode_beyond_sample(self):
+        content = "stop_id,stop_name\n" + "1,a\n" * 100 + "2,תחנה\n"
+        stream = decode_stream(io.BytesIO(content.encode("utf-8")), sample_size=16)
+        self.assertEqual(stream.read(), content)
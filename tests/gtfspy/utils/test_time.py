@@ -0,0 +1,43 @@
+import unittest
+from datetime import timedelta
+
+from gtfspy.utils.time import *
+
+
+class TestParseSeconds(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(parse_seconds("00:00:00"), 0)
+        self.assertEqual(parse_seconds("12:34:56"), 12 * 3600 + 34 * 60 + 56)
+        self.assertEqual(parse_seconds("6:05:00"), 6 * 3600 + 5 * 60)
+        self.assertEqual(parse_seconds(" 6:05:00"), 6 * 3600 + 5 * 60)
+
+    def test_parse_after_midnight(self):
+        self.assertEqual(parse_seconds("25:01:00"), 25 * 3600 + 60)
+        self.assertEqual(parse_seconds("125:00:00"), 125 * 3600)
+
+    def test_parse_other_types(self):
+        self.assertEqual(parse_seconds(3600), 3600)
+        self.assertEqual(parse_seconds(timedelta(hours=25, minutes=13)), 25 * 3600 + 13 * 60)
+        self.assertIsNone(parse_seconds(None))
+        self.assertIsNone(parse_seconds(""))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, parse_seconds, "aa:bb:cc")
+        self.assertRaises(ValueError, parse_seconds, "12:00")
+
+
+class TestFormatSeconds(unittest.TestCase):
+    def test_format(self):
+        self.assertEqual(format_seconds(0), "00:00:00")
+        self.assertEqual(format_seconds(12 * 3600 + 34 * 60 + 56), "12:34:56")
+        self.assertEqual(format_seconds(25 * 3600 + 60), "25:01:00")
+        self.assertEqual(format_seconds(125 * 3600), "125:00:00")
+        self.assertEqual(format_seconds(None), "")
+
+    def test_round_trip(self):
+        for seconds in range(0, 48 * 3600, 37):
+            self.assertEqual(parse_seconds(format_seconds(seconds)), seconds)
+
+    def test_str_timedelta(self):
+        self.assertEqual(str_timedelta(timedelta(hours=25, minutes=1)), "25:01:00")
+        self.assertEqual(str_timedelta(None), "")
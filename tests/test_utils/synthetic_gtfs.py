@@ -0,0 +1,130 @@
+import csv
+import io
+import random
+from datetime import date, timedelta
+from zipfile import ZipFile, ZIP_DEFLATED
+
+# the distance between two neighbouring stops of the synthetic grid, in degrees
+_STOPS_GRID_STEP = 0.005
+_SERVICE_DAYS = 60
+
+
+def _write_csv(zip_file, file_name, fields, rows):
+    with io.TextIOWrapper(zip_file.open(file_name, "w"), encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        writer.writerows(rows)
+
+
+def _format_time(seconds):
+    return "%02d:%02d:%02d" % (seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+def write_synthetic_gtfs(gtfs_file, agencies=1, routes_per_agency=10, trips_per_route=20, stops_per_trip=20,
+                         services=3, seed=0):
+    """
+    Writes a deterministic GTFS file whose size scales with its parameters. The stops are laid on a square grid, and
+    every route runs back and forth along a random walk on it, so the routes share stops.
+
+    :param gtfs_file: the path or the writable binary file to write the GTFS file to
+    :type gtfs_file: str | io.BufferedIOBase
+    :type agencies: int
+    :type routes_per_agency: int
+    :param trips_per_route: the trips of every route, in both directions
+    :type trips_per_route: int
+    :type stops_per_trip: int
+    :type services: int
+    :param seed: the seed of the random generator, the same parameters and seed always write the same file
+    :type seed: int
+    :return: the number of rows written to each file
+    :rtype: dict[str, int]
+    """
+
+    assert agencies > 0 and routes_per_agency > 0 and trips_per_route > 0 and stops_per_trip > 1 and services > 0
+
+    generator = random.Random(seed)
+    routes_count = agencies * routes_per_agency
+    grid_size = max(int((routes_count * stops_per_trip) ** 0.5), 2)
+    start_date = date(2020, 1, 1)
+
+    stops = [("%d" % (row * grid_size + column,), "stop %d-%d" % (row, column), "%.6f" % (32 + row * _STOPS_GRID_STEP),
+              "%.6f" % (34.7 + column * _STOPS_GRID_STEP), "%d" % (row // 10 * 10 + column // 10,))
+             for row in range(grid_size) for column in range(grid_size)]
+
+    calendar = [("%d" % (service,), start_date.strftime("%Y%m%d"),
+                 (start_date + timedelta(days=_SERVICE_DAYS)).strftime("%Y%m%d"))
+                + tuple("1" if (day + service) % services != 0 or services == 1 else "0" for day in range(7))
+                for service in range(services)]
+    calendar_dates = [("%d" % (service,), (start_date + timedelta(days=day)).strftime("%Y%m%d"), "2")
+                      for service in range(services) for day in range(5, _SERVICE_DAYS, 20)]
+
+    agency_rows = []
+    route_rows = []
+    trip_rows = []
+    stop_time_rows = []
+    shape_rows = []
+    fare_rows = []
+    fare_rule_rows = []
+    for agency in range(agencies):
+        agency_id = "%d" % (agency,)
+        agency_rows.append((agency_id, "agency %d" % (agency,), "http://agency%d.example.com/" % (agency,),
+                            "Asia/Jerusalem"))
+        fare_id = "fare_%d" % (agency,)
+        fare_rows.append((fare_id, "%.2f" % (5 + agency,), "ILS", "0", "", agency_id))
+
+        for route in range(routes_per_agency):
+            route_id = "%d_%d" % (agency, route)
+            route_rows.append((route_id, agency_id, "%d" % (route,), "route %s" % (route_id,), "3"))
+            fare_rule_rows.append((fare_id, route_id))
+
+            # a random walk over the grid, which rarely revisits a stop
+            row, column = generator.randrange(grid_size), generator.randrange(grid_size)
+            walk = [(row, column)]
+            while len(walk) < stops_per_trip:
+                row, column = generator.choice([(min(row + 1, grid_size - 1), column), (max(row - 1, 0), column),
+                                                (row, min(column + 1, grid_size - 1)), (row, max(column - 1, 0))])
+                if (row, column) not in walk or generator.random() < 0.1:
+                    walk.append((row, column))
+            walk_stops = [stops[row * grid_size + column] for row, column in walk]
+
+            for direction in range(2):
+                shape_id = "%s_%d" % (route_id, direction)
+                direction_stops = walk_stops if direction == 0 else walk_stops[::-1]
+                shape_rows.extend((shape_id, stop[2], stop[3], "%d" % (sequence,))
+                                  for sequence, stop in enumerate(direction_stops))
+
+                for trip in range(direction, trips_per_route, 2):
+                    trip_id = "%s_%d" % (route_id, trip)
+                    service_id = "%d" % (generator.randrange(services),)
+                    trip_rows.append((route_id, service_id, trip_id, "%d" % (direction,), shape_id))
+
+                    seconds = 5 * 3600 + trip * 20 * 60 + generator.randrange(300)
+                    for sequence, stop in enumerate(direction_stops):
+                        arrival = seconds
+                        seconds += generator.choice([0, 0, 30, 60])
+                        stop_time_rows.append((trip_id, _format_time(arrival), _format_time(seconds), stop[0],
+                                               "%d" % (sequence,)))
+                        seconds += 60 + generator.randrange(120)
+
+    with ZipFile(gtfs_file, mode="w", compression=ZIP_DEFLATED) as zip_file:
+        _write_csv(zip_file, "agency.txt", ["agency_id", "agency_name", "agency_url", "agency_timezone"], agency_rows)
+        _write_csv(zip_file, "routes.txt",
+                   ["route_id", "agency_id", "route_short_name", "route_long_name", "route_type"], route_rows)
+        _write_csv(zip_file, "stops.txt", ["stop_id", "stop_name", "stop_lat", "stop_lon", "zone_id"], stops)
+        _write_csv(zip_file, "calendar.txt", ["service_id", "start_date", "end_date", "sunday", "monday", "tuesday",
+                                              "wednesday", "thursday", "friday", "saturday"], calendar)
+        _write_csv(zip_file, "calendar_dates.txt", ["service_id", "date", "exception_type"], calendar_dates)
+        _write_csv(zip_file, "shapes.txt", ["shape_id", "shape_pt_lat", "shape_pt_lon", "shape_pt_sequence"],
+                   shape_rows)
+        _write_csv(zip_file, "trips.txt", ["route_id", "service_id", "trip_id", "direction_id", "shape_id"],
+                   trip_rows)
+        _write_csv(zip_file, "stop_times.txt",
+                   ["trip_id", "arrival_time", "departure_time", "stop_id", "stop_sequence"], stop_time_rows)
+        _write_csv(zip_file, "fare_attributes.txt",
+                   ["fare_id", "price", "currency_type", "payment_method", "transfers", "agency_id"], fare_rows)
+        _write_csv(zip_file, "fare_rules.txt", ["fare_id", "route_id"], fare_rule_rows)
+
+    return {"agency.txt": len(agency_rows), "routes.txt": len(route_rows), "stops.txt": len(stops),
+            "calendar.txt": len(calendar), "calendar_dates.txt": len(calendar_dates), "shapes.txt": len(shape_rows),
+            "trips.txt": len(trip_rows), "stop_times.txt": len(stop_time_rows),
+            "fare_attributes.txt": len(fare_rows), "fare_rules.txt": len(fare_rule_rows)}